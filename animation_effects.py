@@ -4,13 +4,56 @@
 """
 
 import os
-from moviepy.editor import ImageClip, CompositeVideoClip
-import math
-from moviepy.video.fx import resize
+import multiprocessing
+import shutil
+import subprocess
+import tempfile
+from collections import OrderedDict
+from functools import lru_cache, partial
 import numpy as np
 
+try:
+    import cv2
+except ImportError:  # OpenCV为可选依赖，缺失时回退到PIL
+    cv2 = None
 
-def create_animated_clip(image_path, duration, effect_name, intensity=1.0, resolution=None):
+try:
+    import psutil
+except ImportError:
+    psutil = None
+
+# 系统内存使用率(%)超过该值时清空图片数组缓存
+_FRAME_CACHE_MEMORY_LIMIT = 90
+
+# 解码缩放后的图片数组LRU缓存（每个进程各自一份）：键 -> 只读数组，按数组总字节数限制大小
+_FRAME_CACHE = OrderedDict()
+_FRAME_CACHE_MAX_BYTES = 512 * 1024 * 1024
+_frame_cache_bytes = 0
+
+# 中间文件导出时还会再编码一次，预渲染的片段使用视觉无损的CRF，减少画质二次损失且文件不至于过大
+_INTERMEDIATE_X264_PARAMS = ['-crf', '15']
+
+# 未指定帧率时用于预计算动画参数的默认帧率
+_DEFAULT_FPS = 24
+
+# 淡入淡出效果对应的ffmpeg fade方向
+_FADE_DIRECTIONS = {'Fade In': 'in', 'Fade Out': 'out'}
+
+# 平移方向：(x方向, y方向)，+1为向右/向下，-1为向左/向上
+_PAN_DIRS = {
+    'Pan Left to Right': (1, 0),
+    'Pan Right to Left': (-1, 0),
+    'Pan Up to Down': (0, 1),
+    'Pan Down to Up': (0, -1),
+    'Pan Diagonal Up Right': (1, -1),
+    'Pan Diagonal Up Left': (-1, -1),
+    'Pan Diagonal Down Right': (1, 1),
+    'Pan Diagonal Down Left': (-1, 1),
+}
+
+
+def create_animated_clip(image_path, duration, effect_name, intensity=1.0, resolution=None, fps=_DEFAULT_FPS,
+                         backend='moviepy', defer_fade=False):
     """
     根据效果名称创建动态的ImageClip
     
@@ -19,6 +62,12 @@ def create_animated_clip(image_path, duration, effect_name, intensity=1.0, resol
         duration (float): 持续时间（秒）
         effect_name (str): 效果名称
         intensity (float): 动画强度 (0.1-3.0)，默认1.0
+        resolution (tuple): 目标分辨率 (宽, 高)，为None时保持原图尺寸
+        fps (float): 导出帧率，用于预计算逐帧的动画参数
+        backend (str): 'moviepy'（默认）或'ffmpeg'；'ffmpeg'时缩放/平移效果由ffmpeg滤镜预渲染为
+            临时MP4并以VideoFileClip返回（clip.filename为临时文件，由调用方删除），失败时回退到MoviePy
+        defer_fade (bool): 为True时淡入淡出效果返回静止片段并记录clip.deferred_fade，
+            由导出阶段通过build_fade_filters生成ffmpeg fade滤镜完成淡入淡出
         
     Returns:
         ImageClip: 动态图片片段
@@ -35,44 +84,516 @@ def create_animated_clip(image_path, duration, effect_name, intensity=1.0, resol
         target_size = (int(resolution[0]), int(resolution[1]))
     
     # 根据效果名称选择对应的动画函数
-    effect_functions = {
-        'Slow Zoom In': _create_slow_zoom_in,
-        'Slow Zoom Out': _create_slow_zoom_out,
-        'Pan Left to Right': _create_pan_left_to_right,
-        'Pan Right to Left': _create_pan_right_to_left,
-        'Pan Diagonal Up Right': _create_pan_diagonal_up_right,
-        'Pan Diagonal Up Left': _create_pan_diagonal_up_left,
-        'Pan Diagonal Down Right': _create_pan_diagonal_down_right,
-        'Pan Diagonal Down Left': _create_pan_diagonal_down_left,
-        'Fade In': _create_fade_in,
-        'Fade Out': _create_fade_out,
-        'No Animation': _create_no_animation
-    }
+    effect_function = _EFFECT_FUNCTIONS.get(effect_name)
+    if effect_function is None:
+        raise ValueError(f"不支持的效果: {effect_name}. 支持的效果: {list(_EFFECT_FUNCTIONS)}")
+    
+    if defer_fade and effect_name in _FADE_DIRECTIONS:
+        return _create_deferred_fade(image_path, duration, _FADE_DIRECTIONS[effect_name], target_size)
     
-    if effect_name not in effect_functions:
-        raise ValueError(f"不支持的效果: {effect_name}. 支持的效果: {list(effect_functions.keys())}")
+    if backend == 'ffmpeg' and target_size and effect_name in _FFMPEG_EFFECTS:
+        try:
+            return _create_ffmpeg_clip(image_path, duration, effect_name, intensity, target_size, fps)
+        except (OSError, subprocess.CalledProcessError) as e:
+            print(f"ffmpeg渲染动画失败，回退到MoviePy: {e}")
     
     # 调用对应的效果函数，传递强度参数及目标分辨率
-    return effect_functions[effect_name](image_path, duration, intensity, target_size)
+    return effect_function(image_path, duration, intensity, target_size, fps=fps)
+
+
+def build_fade_filters(clips):
+    """
+    根据片段上记录的deferred_fade生成ffmpeg fade滤镜列表
+    
+    片段按顺序首尾相接，起始时间为之前片段时长之和；每个滤镜通过enable限定在所属片段的时间范围内，
+    范围为左闭右开的[start, end)，不会作用到下一片段的第一帧。
+    
+    Args:
+        clips (list): 最终拼接顺序的片段列表
+        
+    Returns:
+        list: fade滤镜字符串列表，可用','连接后作为-vf参数
+    """
+    filters = []
+    start = 0.0
+    for clip in clips:
+        fade = getattr(clip, 'deferred_fade', None)
+        if fade:
+            direction, fade_time = fade
+            end = start + clip.duration
+            fade_start = start if direction == 'in' else end - fade_time
+            filters.append(f"fade=t={direction}:st={fade_start:.3f}:d={fade_time:.3f}"
+                           f":enable='gte(t,{start:.3f})*lt(t,{end:.3f})'")
+        start += clip.duration
+    return filters
+
+
+def create_animated_clips_batch(specs, processes=None, fps=_DEFAULT_FPS, backend='moviepy', defer_fade=False):
+    """
+    使用多进程并行创建多个动画片段
+    
+    每个子进程创建片段并以视觉无损的质量渲染为临时MP4（MoviePy片段包含闭包，无法跨进程传递），
+    主进程再按输入顺序包装为VideoFileClip。临时文件都位于同一个临时目录中，
+    路径为clip.filename，由调用方删除文件及其所在目录；失败时整个目录在这里删除。
+    
+    Args:
+        specs (list): (image_path, duration, effect_name, intensity, resolution) 元组列表
+        processes (int): 进程数，默认为CPU核心数
+        fps (float): 导出帧率
+        backend (str): 传递给create_animated_clip的渲染后端
+        defer_fade (bool): 传递给create_animated_clip，延后的淡入淡出记录在返回片段的deferred_fade上
+        
+    Returns:
+        list: 与specs顺序一致的VideoFileClip列表，单张图片创建失败时对应位置为None
+    """
+    from moviepy.editor import VideoFileClip
+    
+    if not specs:
+        return []
+    work_dir = tempfile.mkdtemp(prefix='anim_batch_')
+    jobs = [(i, tuple(spec), fps, backend, defer_fade, work_dir) for i, spec in enumerate(specs)]
+    results = [None] * len(jobs)
+    succeeded = False
+    try:
+        with multiprocessing.Pool(processes or os.cpu_count()) as pool:
+            for index, path, fade in pool.imap_unordered(_render_clip_to_file, jobs):
+                results[index] = (path, fade)
+        clips = []
+        for path, fade in results:
+            if path is None:
+                clips.append(None)
+                continue
+            clip = VideoFileClip(path, audio=False)
+            # 先关闭读取进程，取帧时会自动重新打开，避免同时保留成百上千个ffmpeg进程
+            clip.reader.close()
+            if fade:
+                clip.deferred_fade = fade
+            clips.append(clip)
+        succeeded = any(clip is not None for clip in clips)
+        return clips
+    finally:
+        if not succeeded:
+            # 出错时进程池会终止仍在渲染的子进程，它们的临时文件也在该目录中，一并删除
+            shutil.rmtree(work_dir, ignore_errors=True)
+
+
+def _render_clip_to_file(job):
+    """
+    子进程：创建动画片段并渲染为work_dir中的临时MP4，返回(序号, 文件路径, 延后的淡入淡出)
+    
+    单张图片失败时返回(序号, None, None)，不影响其他图片
+    """
+    index, spec, fps, backend, defer_fade, work_dir = job
+    try:
+        return _render_clip_job(index, spec, fps, backend, defer_fade, work_dir)
+    except Exception as e:
+        print(f"创建动画片段失败 {os.path.basename(spec[0])}: {e}")
+        return index, None, None
+
+
+def _render_clip_job(index, spec, fps, backend, defer_fade, work_dir):
+    clip = create_animated_clip(*spec, fps=fps, backend=backend, defer_fade=defer_fade)
+    fade = getattr(clip, 'deferred_fade', None)
+    out_mp4 = os.path.join(work_dir, f"anim_{index:05d}.mp4")
+    # ffmpeg后端已经输出了临时MP4，移动到批量目录后直接复用
+    if getattr(clip, 'filename', None):
+        clip.close()
+        shutil.move(clip.filename, out_mp4)
+        return index, out_mp4, fade
+    try:
+        clip.write_videofile(out_mp4, fps=fps, codec='libx264', preset='ultrafast',
+                             ffmpeg_params=_INTERMEDIATE_X264_PARAMS, audio=False, logger=None)
+    except Exception:
+        if os.path.exists(out_mp4):
+            os.remove(out_mp4)
+        raise
+    finally:
+        clip.close()
+    return index, out_mp4, fade
+
+
+# 工具函数：一次性缩放整帧数组（优先OpenCV，缺失时使用PIL）
+def resize_frame(frame, new_size):
+    """缩放uint8帧数组到new_size=(宽, 高)，全程保持uint8，不做浮点转换"""
+    new_w, new_h = new_size
+    h, w = frame.shape[:2]
+    if (w, h) == (new_w, new_h):
+        return frame
+    if cv2 is not None:
+        interpolation = cv2.INTER_AREA if new_w < w else cv2.INTER_LINEAR
+        return cv2.resize(frame, (new_w, new_h), interpolation=interpolation)
+    from PIL import Image
+    return np.asarray(Image.fromarray(frame).resize((new_w, new_h), Image.BILINEAR))
+
+
+def scale_to_canvas(frame_size, canvas_size, scale, offset):
+    """
+    返回帧变换函数：把frame_size的帧缩放scale倍后左上角放在canvas_size画布的offset处
+    
+    offset为负时相当于居中裁剪，为正时四周补黑边。有OpenCV且缩小不超过一半时
+    一次warpAffine完成缩放和裁剪/补边，并复用输出缓冲区；否则缩放后再切片/填充。
+    """
+    cw, ch = canvas_size
+    x_offset, y_offset = offset
+    
+    if cv2 is not None and scale >= 0.5:
+        # 双线性采样在缩小一半以内不会明显混叠
+        out = np.zeros((ch, cw, 3), dtype=np.uint8)
+        M = np.float32([[scale, 0, x_offset], [0, scale, y_offset]])
+        
+        def warp_frame(frame):
+            return cv2.warpAffine(frame[:, :, :3], M, (cw, ch), dst=out, flags=cv2.INTER_LINEAR,
+                                  borderMode=cv2.BORDER_CONSTANT, borderValue=0)
+        
+        return warp_frame
+    
+    new_w = int(frame_size[0] * scale)
+    new_h = int(frame_size[1] * scale)
+    if x_offset <= 0 and y_offset <= 0:
+        x1, y1 = -x_offset, -y_offset
+        return lambda frame: resize_frame(frame, (new_w, new_h))[y1:y1 + ch, x1:x1 + cw]
+    
+    # 复用同一块黑色画布：黑边不变，每帧只覆盖中间区域
+    canvas = np.zeros((ch, cw, 3), dtype=np.uint8)
+    
+    def pad_frame(frame):
+        canvas[y_offset:y_offset + new_h, x_offset:x_offset + new_w] = resize_frame(frame, (new_w, new_h))[:, :, :3]
+        return canvas
+    
+    return pad_frame
+
+
+def _decode_image(image_path, min_size=None):
+    """
+    解码图片为RGB uint8数组，带透明通道的图片合成到黑色背景上
+    
+    有OpenCV时用cv2.imdecode解码（libjpeg-turbo），给出min_size=(宽, 高)时
+    JPEG直接在解码阶段按1/2、1/4、1/8缩小，只要结果不小于min_size。
+    """
+    from PIL import Image
+    with Image.open(image_path) as img:
+        has_alpha = img.mode in ('RGBA', 'LA') or (img.mode == 'P' and 'transparency' in img.info)
+        if cv2 is not None and not has_alpha:
+            # 与PIL路径一致，不按EXIF方向旋转
+            flags = cv2.IMREAD_COLOR | cv2.IMREAD_IGNORE_ORIENTATION
+            if min_size and img.format == 'JPEG':
+                w, h = img.size
+                for factor, reduced in ((8, cv2.IMREAD_REDUCED_COLOR_8), (4, cv2.IMREAD_REDUCED_COLOR_4),
+                                        (2, cv2.IMREAD_REDUCED_COLOR_2)):
+                    if w // factor >= min_size[0] and h // factor >= min_size[1]:
+                        flags = reduced | cv2.IMREAD_IGNORE_ORIENTATION
+                        break
+            # np.fromfile + imdecode可以读取非ASCII路径
+            bgr = cv2.imdecode(np.fromfile(image_path, dtype=np.uint8), flags)
+            if bgr is not None:
+                return cv2.cvtColor(bgr, cv2.COLOR_BGR2RGB)
+        if has_alpha:
+            rgba = np.array(img.convert('RGBA'))
+            alpha = rgba[:, :, 3:4].astype(np.uint16)
+            return (rgba[:, :, :3] * alpha // 255).astype(np.uint8)
+        return np.array(img.convert('RGB'))
+
+
+def _decode_cover_array(path, tw, th, cover_margin_q):
+    """
+    解码并缩放图片，返回连续的uint8数组
+
+    tw/th为None时返回原图；cover_margin_q为None时直接拉伸到(tw, th)，
+    否则按cover方式等比放大后再乘以覆盖系数。
+    """
+    if tw is None:
+        return np.ascontiguousarray(_decode_image(path), dtype=np.uint8)
+    
+    from PIL import Image
+    with Image.open(path) as img:
+        w, h = img.size
+    if cover_margin_q is None:
+        new_size = (tw, th)
+    else:
+        scale = max(tw / w, th / h) * cover_margin_q
+        new_size = (int(w * scale), int(h * scale))
+    frame = resize_frame(_decode_image(path, min_size=new_size), new_size)
+    return np.ascontiguousarray(frame, dtype=np.uint8)
+
+
+def _load_cover_array(path, mtime, tw, th, cover_margin_q):
+    """
+    获取解码缩放后的只读数组（按总字节数限制的LRU缓存）
+
+    mtime只用于缓存键，文件修改后自动失效；超出字节上限时从最久未用的开始淘汰，
+    至少保留刚加入的一项。
+    """
+    global _frame_cache_bytes
+    key = (path, mtime, tw, th, cover_margin_q)
+    frame = _FRAME_CACHE.get(key)
+    if frame is not None:
+        _FRAME_CACHE.move_to_end(key)
+        return frame
+    frame = _decode_cover_array(path, tw, th, cover_margin_q)
+    frame.flags.writeable = False
+    _FRAME_CACHE[key] = frame
+    _frame_cache_bytes += frame.nbytes
+    while _frame_cache_bytes > _FRAME_CACHE_MAX_BYTES and len(_FRAME_CACHE) > 1:
+        _frame_cache_bytes -= _FRAME_CACHE.popitem(last=False)[1].nbytes
+    return frame
+
+
+def _clear_frame_cache():
+    global _frame_cache_bytes
+    _FRAME_CACHE.clear()
+    _frame_cache_bytes = 0
+
+
+def _get_frame_array(image_path, target_size=None, cover_margin=None):
+    """获取（可能已缓存的）图片数组，内存紧张时清空缓存"""
+    tw, th = target_size if target_size else (None, None)
+    # 覆盖系数量化到两位小数以提高缓存命中率
+    margin_q = round(cover_margin, 2) if cover_margin is not None else None
+    frame = _load_cover_array(os.path.abspath(image_path), os.stat(image_path).st_mtime_ns, tw, th, margin_q)
+    if psutil is not None and psutil.virtual_memory().percent > _FRAME_CACHE_MEMORY_LIMIT:
+        _clear_frame_cache()
+    return frame
+
+
+# 工具函数：cover放大系数
+def _cover_margin(intensity):
+    # 增加较大的放大量，确保平移过程中也不出现黑边
+    # 覆盖系数随强度略增：最低1.18，强度1时约1.4
+    strength = max(0.1, min(1.0, float(intensity)))
+    return 1.18 + 0.22 * strength
 
 
 # 工具函数：根据目标分辨率进行等比例放大（cover），确保无黑边
 def _prepare_cover_clip(image_path, duration, target_size, intensity: float = 1.0):
-    base = ImageClip(image_path, duration=duration)
+    from moviepy.editor import ImageClip
     if not target_size:
+        base = ImageClip(_get_frame_array(image_path), duration=duration)
         return base, base.w, base.h
-    tw, th = target_size
-    scale = max(tw / base.w, th / base.h)
-    # 增加较大的放大量，确保平移过程中也不出现黑边
-    # 覆盖系数随强度略增：最低1.18，强度1时约1.4
-    strength = max(0.1, min(1.0, float(intensity)))
-    cover_margin = 1.18 + 0.22 * strength
-    scale *= cover_margin
-    resized = base.resize(scale)
+    cover_margin = _cover_margin(intensity)
+    # 缩放只在解码时做一次，得到静态数组，避免MoviePy在渲染时逐帧resize
+    resized = ImageClip(_get_frame_array(image_path, target_size, cover_margin), duration=duration)
     return resized, resized.w, resized.h
 
 
-def _create_slow_zoom_in(image_path, duration, intensity=1.0, target_size=None):
+# 工具函数：预先计算每一帧的线性进度（0..1）
+def _progress_table(duration, fps):
+    n = max(1, int(round(duration * fps)))
+    return np.arange(n) / max(n - 1, 1)
+
+
+# 工具函数：预先计算每一帧的缓动值，-cos曲线从-1平滑过渡到+1
+def _ease_table(duration, fps):
+    return -np.cos(np.pi * _progress_table(duration, fps))
+
+
+def _frame_index(t, fps, n):
+    return min(int(t * fps), n - 1)
+
+
+# 工具函数：按平移位置直接从cover图中取出目标画布，替代CompositeVideoClip的逐帧合成
+# xs/ys为逐帧的图片左上角相对画布的位置（<=0）
+def _crop_to_canvas(clip, xs, ys, fps, target_size):
+    tw, th = target_size
+    max_x = max(0, clip.w - tw)
+    max_y = max(0, clip.h - th)
+    
+    if cv2 is not None:
+        # 有OpenCV时用warpAffine做亚像素平移，慢速平移不会出现逐像素跳动
+        txs = np.clip(xs, -max_x, 0).astype(np.float32)
+        tys = np.clip(ys, -max_y, 0).astype(np.float32)
+        src = clip.get_frame(0)
+        # 输出帧和变换矩阵都预先分配，逐帧原地写入，避免每帧分配新的整帧数组
+        out = np.empty((th, tw, 3), dtype=np.uint8)
+        M = np.float32([[1, 0, 0], [0, 1, 0]])
+        
+        def warp_frame(get_frame, t):
+            i = _frame_index(t, fps, len(txs))
+            M[0, 2] = txs[i]
+            M[1, 2] = tys[i]
+            return cv2.warpAffine(src, M, (tw, th), dst=out, flags=cv2.INTER_LINEAR,
+                                  borderMode=cv2.BORDER_REPLICATE)
+        
+        return clip.fl(warp_frame)
+    
+    # 否则取整后直接切片：裁剪起点一次性取整并限制在有效范围内，逐帧只需查表和切片
+    x1s = np.clip(np.rint(-xs), 0, max_x).astype(np.intp)
+    y1s = np.clip(np.rint(-ys), 0, max_y).astype(np.intp)
+
+    def crop_frame(get_frame, t):
+        i = _frame_index(t, fps, len(x1s))
+        x1, y1 = x1s[i], y1s[i]
+        return get_frame(t)[y1:y1 + th, x1:x1 + tw]
+
+    return clip.fl(crop_frame)
+
+
+# 工具函数：缩放效果的源图片片段
+# 有目标分辨率时按cover方式一次性缩放到最大倍数（保持比例），之后每帧只需缩小并居中裁剪；
+# 返回(片段, 源图相对cover尺寸的倍数)
+def _zoom_source(image_path, duration, target_size, max_scale):
+    from moviepy.editor import ImageClip
+    
+    if not target_size:
+        return ImageClip(_get_frame_array(image_path), duration=duration), 1.0
+    base_scale = round(max_scale, 2)
+    return ImageClip(_get_frame_array(image_path, target_size, base_scale), duration=duration), base_scale
+
+
+# 工具函数：按缩放表生成缩放动画（居中裁剪到目标画布），scales为相对源图的逐帧缩放比例
+def _zoom_clip(clip, scales, fps, target_size):
+    frame = clip.get_frame(0)
+    h, w = frame.shape[:2]
+    
+    if target_size and cv2 is not None:
+        # 有OpenCV时用warpAffine直接从源图采样出目标画布，一次缩放+裁剪，且缩放比例连续无跳变
+        tw, th = target_size
+        out = np.empty((th, tw, 3), dtype=np.uint8)
+        M = np.zeros((2, 3), dtype=np.float32)
+        
+        def warp_frame(get_frame, t):
+            r = scales[_frame_index(t, fps, len(scales))]
+            M[0, 0] = M[1, 1] = r
+            M[0, 2] = tw / 2 - r * w / 2
+            M[1, 2] = th / 2 - r * h / 2
+            return cv2.warpAffine(frame, M, (tw, th), dst=out, flags=cv2.INTER_LINEAR,
+                                  borderMode=cv2.BORDER_REPLICATE)
+        
+        return clip.fl(warp_frame)
+
+    # 否则帧尺寸取整到像素，相邻帧尺寸相同时直接复用上一次的缩放结果
+    @lru_cache(maxsize=4)
+    def resized(new_w, new_h):
+        out = resize_frame(frame, (new_w, new_h))
+        if target_size:
+            tw, th = target_size
+            x1 = max(0, (new_w - tw) // 2)
+            y1 = max(0, (new_h - th) // 2)
+            out = out[y1:y1 + th, x1:x1 + tw]
+        return out
+
+    def zoom_frame(get_frame, t):
+        scale = scales[_frame_index(t, fps, len(scales))]
+        new_w, new_h = int(round(w * scale)), int(round(h * scale))
+        if target_size:
+            # 取整误差不能让缩放后的图片小于画布
+            new_w, new_h = max(new_w, target_size[0]), max(new_h, target_size[1])
+        return resized(new_w, new_h)
+
+    return clip.fl(zoom_frame)
+
+
+# ffmpeg后端：缩放效果使用zoompan，平移效果使用scale+crop，均由ffmpeg在C代码中逐帧完成
+_FFMPEG_EFFECTS = {'Slow Zoom In', 'Slow Zoom Out'} | set(_PAN_DIRS)
+
+# zoompan的x/y取整到输入像素，先放大输入可减轻缩放抖动
+_ZOOMPAN_OVERSAMPLE = 2
+
+
+def _zoompan_exprs(effect_name, intensity, n_frames):
+    """返回zoompan的(z, x, y)表达式，缩放比例与MoviePy实现一致（强度1时1.0~1.2倍）"""
+    max_scale = 1.0 + 0.2 * intensity
+    progress = f"on/{max(n_frames - 1, 1)}"
+    if effect_name == 'Slow Zoom In':
+        z_expr = f"1+{max_scale - 1.0:.6f}*{progress}"
+    else:
+        z_expr = f"{max_scale:.6f}-{max_scale - 1.0:.6f}*{progress}"
+    return z_expr, "iw/2-(iw/zoom/2)", "ih/2-(ih/zoom/2)"
+
+
+def _pan_crop_exprs(effect_name, intensity, duration, cover_size, target_size):
+    """返回crop的(x, y)表达式：cos缓动从一侧平移到另一侧，与MoviePy实现一致"""
+    sx, sy = _PAN_DIRS[effect_name]
+    rw, rh = cover_size
+    tw, th = target_size
+    move_ratio = 0.4 * min(1.0, intensity)
+    cos_t = f"cos(PI*t/{duration:.6f})"
+    x_expr = f"{(rw - tw) / 2:.3f}*(1+{sx * move_ratio:.6f}*{cos_t})"
+    y_expr = f"{(rh - th) / 2:.3f}*(1+{sy * move_ratio:.6f}*{cos_t})"
+    return x_expr, y_expr
+
+
+def _zoompan_filter(W, H, fps, n_frames, z_expr, zx_expr, zy_expr):
+    """zoompan缩放滤镜链：保持比例cover到画布后居中裁剪（与MoviePy实现一致），再逐帧缩放"""
+    ow, oh = W * _ZOOMPAN_OVERSAMPLE, H * _ZOOMPAN_OVERSAMPLE
+    return (f"scale={ow}:{oh}:force_original_aspect_ratio=increase,crop={ow}:{oh},"
+            f"zoompan=z='{z_expr}':x='{zx_expr}':y='{zy_expr}':d={n_frames}:s={W}x{H}:fps={fps}")
+
+
+def _pan_filter(cover_size, W, H, x_expr, y_expr):
+    """scale+crop平移滤镜链"""
+    rw, rh = cover_size
+    return f"scale={rw}:{rh},crop={W}:{H}:x='{x_expr}':y='{y_expr}'"
+
+
+def ffmpeg_effect_input(image_path, duration, effect_name, intensity, target_size, fps):
+    """
+    返回用ffmpeg渲染单张图片动画所需的(输入参数, 滤镜链, 帧数)
+    
+    滤镜链输出target_size分辨率、n帧、yuv420p的画面，可直接用于-vf，
+    也可作为filter_complex中该输入的一段。效果参数与MoviePy实现一致。
+    """
+    from PIL import Image
+    
+    W, H = target_size
+    n_frames = max(1, int(round(duration * fps)))
+    # 静止图循环输入，帧数由trim精确截断
+    loop_input = ['-loop', '1', '-framerate', str(fps), '-t', f"{duration:.3f}", '-i', image_path]
+    if effect_name in _PAN_DIRS:
+        with Image.open(image_path) as img:
+            w, h = img.size
+        scale = max(W / w, H / h) * _cover_margin(intensity)
+        # yuv420p要求偶数尺寸，同时保证不小于画布
+        cover_size = (max(W, int(w * scale) // 2 * 2), max(H, int(h * scale) // 2 * 2))
+        x_expr, y_expr = _pan_crop_exprs(effect_name, intensity, duration, cover_size, target_size)
+        input_args = loop_input
+        vf = _pan_filter(cover_size, W, H, x_expr, y_expr) + f",trim=end_frame={n_frames}"
+    elif effect_name in ('Slow Zoom In', 'Slow Zoom Out'):
+        # zoompan由单帧输入生成d帧输出
+        z_expr, zx_expr, zy_expr = _zoompan_exprs(effect_name, intensity, n_frames)
+        input_args = ['-i', image_path]
+        vf = _zoompan_filter(W, H, fps, n_frames, z_expr, zx_expr, zy_expr)
+    else:
+        # 淡入淡出/无动画：拉伸到画布
+        input_args = loop_input
+        vf = f"scale={W}:{H},trim=end_frame={n_frames}"
+        direction = _FADE_DIRECTIONS.get(effect_name)
+        if direction:
+            fade_time = _fade_time(duration)
+            fade_start = 0.0 if direction == 'in' else duration - fade_time
+            vf += f",fade=t={direction}:st={fade_start:.3f}:d={fade_time:.3f}"
+    return input_args, vf + ",setsar=1,format=yuv420p", n_frames
+
+
+def _run_ffmpeg_render(input_args, vf, n_frames, out_mp4):
+    cmd = ['ffmpeg', '-y', '-loglevel', 'error', *input_args,
+           '-vf', vf, '-frames:v', str(n_frames), '-an',
+           '-c:v', 'libx264', '-preset', 'ultrafast', *_INTERMEDIATE_X264_PARAMS,
+           out_mp4]
+    subprocess.run(cmd, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, check=True)
+
+
+def _create_ffmpeg_clip(image_path, duration, effect_name, intensity, target_size, fps):
+    """用ffmpeg预渲染动画到临时MP4并返回VideoFileClip"""
+    from moviepy.editor import VideoFileClip
+    
+    fd, out_mp4 = tempfile.mkstemp(prefix='anim_', suffix='.mp4')
+    os.close(fd)
+    try:
+        input_args, vf, n_frames = ffmpeg_effect_input(image_path, duration, effect_name, intensity,
+                                                       target_size, fps)
+        _run_ffmpeg_render(input_args, vf, n_frames, out_mp4)
+        clip = VideoFileClip(out_mp4, audio=False)
+        # 先关闭读取进程，取帧时会自动重新打开
+        clip.reader.close()
+        # 帧数取整后时长可能略有偏差，统一为请求的时长
+        return clip.set_duration(min(duration, clip.duration)) if clip.duration else clip
+    except Exception:
+        if os.path.exists(out_mp4):
+            os.remove(out_mp4)
+        raise
+
+
+def _create_slow_zoom_in(image_path, duration, intensity=1.0, target_size=None, fps=_DEFAULT_FPS):
     """
     慢速放大效果：在duration时间内，图片从原始大小均匀放大
     
@@ -87,26 +608,17 @@ def _create_slow_zoom_in(image_path, duration, intensity=1.0, target_size=None):
     # 根据强度计算最大缩放比例
     max_scale = 1.0 + (0.2 * intensity)  # 强度1.0时放大到1.2倍，强度3.0时放大到1.6倍
     
-    # 创建基础图片片段并拉伸至目标分辨率
-    base = ImageClip(image_path, duration=duration)
-    if target_size:
-        clip = base.resize(newsize=target_size)
-    else:
-        clip = base
+    # 源图只缩放一次（cover到最大倍数），每帧从源图缩小采样，不再先拉伸到目标分辨率
+    clip, base_scale = _zoom_source(image_path, duration, target_size, max_scale)
     
-    # 使用resize方法创建缩放动画
-    def resize_func(t):
-        scale = 1.0 + ((max_scale - 1.0) * t / duration)
-        return scale
-    
-    # 应用缩放效果（以目标分辨率为画布进行合成，避免尺寸差异）
-    zoomed = clip.resize(resize_func)
-    if target_size:
-        return CompositeVideoClip([zoomed.set_position('center')], size=target_size)
-    return zoomed
+    # 预先计算每帧的缩放比例，渲染时按帧序号查表
+    scales = (1.0 + (max_scale - 1.0) * _progress_table(duration, fps)) / base_scale
 
+    # 应用缩放效果（居中裁剪到目标分辨率，避免尺寸差异）
+    return _zoom_clip(clip, scales, fps, target_size)
 
-def _create_slow_zoom_out(image_path, duration, intensity=1.0, target_size=None):
+
+def _create_slow_zoom_out(image_path, duration, intensity=1.0, target_size=None, fps=_DEFAULT_FPS):
     """
     慢速缩小效果：在duration时间内，图片从放大状态缩小到原始大小
     
@@ -121,33 +633,26 @@ def _create_slow_zoom_out(image_path, duration, intensity=1.0, target_size=None)
     # 根据强度计算初始缩放比例
     initial_scale = 1.0 + (0.2 * intensity)
     
-    # 创建基础图片片段并拉伸至目标分辨率
-    base = ImageClip(image_path, duration=duration)
-    if target_size:
-        clip = base.resize(newsize=target_size)
-    else:
-        clip = base
-    
-    # 使用resize方法创建缩放动画
-    def resize_func(t):
-        scale = initial_scale - ((initial_scale - 1.0) * t / duration)
-        return scale
+    # 源图只缩放一次（cover到最大倍数），每帧从源图缩小采样，不再先拉伸到目标分辨率
+    clip, base_scale = _zoom_source(image_path, duration, target_size, initial_scale)
     
+    # 预先计算每帧的缩放比例，渲染时按帧序号查表
+    scales = (initial_scale - (initial_scale - 1.0) * _progress_table(duration, fps)) / base_scale
+
     # 应用缩放效果
-    zoomed = clip.resize(resize_func)
-    if target_size:
-        return CompositeVideoClip([zoomed.set_position('center')], size=target_size)
-    return zoomed
+    return _zoom_clip(clip, scales, fps, target_size)
 
 
-def _create_pan_left_to_right(image_path, duration, intensity=1.0, target_size=None):
+def _create_pan(image_path, duration, intensity=1.0, target_size=None, fps=_DEFAULT_FPS, dx=1, dy=0):
     """
-    从左到右平移效果
+    平移效果：水平/垂直/斜向平移共用的实现
     
     Args:
         image_path (str): 图片文件路径
         duration (float): 持续时间（秒）
         intensity (float): 动画强度，控制平移幅度
+        dx (int): x方向，+1向右，-1向左，0不移动
+        dy (int): y方向，+1向下，-1向上，0不移动
         
     Returns:
         ImageClip: 动态图片片段
@@ -159,255 +664,103 @@ def _create_pan_left_to_right(image_path, duration, intensity=1.0, target_size=N
     if target_size:
         tw, th = target_size
         max_offset_x = max(0, (rw - tw) / 2)
+        max_offset_y = max(0, (rh - th) / 2)
         base_x = -(rw - tw) / 2
         base_y = -(rh - th) / 2
     else:
         max_offset_x = clip.w * 0.15
+        max_offset_y = clip.h * 0.15
         base_x = 0
         base_y = 0
     # 减小实际位移比例以“更慢”，并使用缓动曲线
     move_ratio = 0.4 * min(1.0, intensity)
     
-    # 使用set_position方法创建平移动画
-    def position_func(t):
-        # 缓动：从-1到+1的平滑过渡
-        ease = (math.cos(math.pi * (t / duration)) * -1.0)  # 0..1..0 映射为 -1..+1
-        offset_x = base_x + ease * max_offset_x * move_ratio
-        offset_y = base_y
-        return (offset_x, offset_y)
-    
-    moved = clip.set_position(position_func)
-    if target_size:
-        return CompositeVideoClip([moved], size=target_size)
-    return moved
-
+    # 预先计算每帧的平移位置，渲染时按帧序号查表
+    ease = _ease_table(duration, fps)  # -1..+1
+    xs = base_x + dx * ease * max_offset_x * move_ratio
+    ys = base_y + dy * ease * max_offset_y * move_ratio
 
-def _create_pan_right_to_left(image_path, duration, intensity=1.0, target_size=None):
-    """
-    从右到左平移效果
-    """
-    clip, rw, rh = _prepare_cover_clip(image_path, duration, target_size, intensity)
-    
-    # 计算平移范围
     if target_size:
-        tw, th = target_size
-        max_offset_x = max(0, (rw - tw) / 2)
-        base_x = -(rw - tw) / 2
-        base_y = -(rh - th) / 2
-    else:
-        max_offset_x = clip.w * 0.15
-        base_x = 0
-        base_y = 0
-    move_ratio = 0.4 * min(1.0, intensity)
+        return _crop_to_canvas(clip, xs, ys, fps, target_size)
     
-    # 使用set_position方法创建平移动画
     def position_func(t):
-        ease = (math.cos(math.pi * (t / duration)) * -1.0)  # -1..+1
-        offset_x = base_x - ease * max_offset_x * move_ratio
-        offset_y = base_y
-        return (offset_x, offset_y)
+        i = _frame_index(t, fps, len(xs))
+        return (xs[i], ys[i])
     
-    moved = clip.set_position(position_func)
-    if target_size:
-        return CompositeVideoClip([moved], size=target_size)
-    return moved
+    return clip.set_position(position_func)
 
 
-def _create_pan_up_to_down(image_path, duration, intensity=1.0):
+def _create_no_animation(image_path, duration, intensity=1.0, target_size=None, fps=_DEFAULT_FPS):
     """
-    从上到下平移效果
+    无动画效果
     """
-    clip = ImageClip(image_path, duration=duration)
-    
-    def make_frame(t):
-        pan_range = 0.3 * intensity
-        offset_x = 0
-        offset_y = (t / duration - 0.5) * clip.h * pan_range
-        panned_clip = clip.set_position((offset_x, offset_y))
-        return panned_clip.get_frame(t)
+    from moviepy.editor import ImageClip
     
-    animated_clip = clip.fl(lambda gf, t: make_frame(t))
-    return animated_clip
+    # 图片已拉伸到目标分辨率，无需再合成到画布上
+    return ImageClip(_get_frame_array(image_path, target_size), duration=duration)
 
 
-def _create_pan_down_to_up(image_path, duration, intensity=1.0):
-    """
-    从下到上平移效果
-    """
-    clip = ImageClip(image_path, duration=duration)
-    
-    def make_frame(t):
-        pan_range = 0.3 * intensity
-        offset_x = 0
-        offset_y = (0.5 - t / duration) * clip.h * pan_range
-        panned_clip = clip.set_position((offset_x, offset_y))
-        return panned_clip.get_frame(t)
-    
-    animated_clip = clip.fl(lambda gf, t: make_frame(t))
-    return animated_clip
+def _fade_time(duration):
+    return max(0.2, min(duration, duration * 0.6))  # 淡入淡出时间占比0.2~0.6
 
 
-def _create_pan_diagonal_up_right(image_path, duration, intensity=1.0, target_size=None):
+def _create_deferred_fade(image_path, duration, direction, target_size=None):
     """
-    斜向右上平移效果
+    淡入淡出交给导出阶段的ffmpeg fade滤镜：返回静止片段并记录方向和淡化时长
     """
-    clip, rw, rh = _prepare_cover_clip(image_path, duration, target_size, intensity)
-    
-    if target_size:
-        tw, th = target_size
-        max_offset_x = max(0, (rw - tw) / 2)
-        max_offset_y = max(0, (rh - th) / 2)
-        base_x = -(rw - tw) / 2
-        base_y = -(rh - th) / 2
-    else:
-        max_offset_x = clip.w * 0.15
-        max_offset_y = clip.h * 0.15
-        base_x = 0
-        base_y = 0
-    move_ratio = 0.4 * min(1.0, intensity)
-    
-    # 使用set_position方法创建平移动画
-    def position_func(t):
-        ease = (math.cos(math.pi * (t / duration)) * -1.0)
-        offset_x = base_x + ease * max_offset_x * move_ratio  # 向右
-        offset_y = base_y - ease * max_offset_y * move_ratio  # 向上
-        return (offset_x, offset_y)
-    
-    moved = clip.set_position(position_func)
-    if target_size:
-        return CompositeVideoClip([moved], size=target_size)
-    return moved
+    clip = _create_no_animation(image_path, duration, target_size=target_size)
+    clip.deferred_fade = (direction, _fade_time(duration))
+    return clip
 
 
-def _create_pan_diagonal_up_left(image_path, duration, intensity=1.0, target_size=None):
-    """
-    斜向左上平移效果
-    """
-    clip, rw, rh = _prepare_cover_clip(image_path, duration, target_size, intensity)
-    
-    if target_size:
-        tw, th = target_size
-        max_offset_x = max(0, (rw - tw) / 2)
-        max_offset_y = max(0, (rh - th) / 2)
-        base_x = -(rw - tw) / 2
-        base_y = -(rh - th) / 2
-    else:
-        max_offset_x = clip.w * 0.15
-        max_offset_y = clip.h * 0.15
-        base_x = 0
-        base_y = 0
-    move_ratio = 0.4 * min(1.0, intensity)
-    
-    # 使用set_position方法创建平移动画
-    def position_func(t):
-        ease = (math.cos(math.pi * (t / duration)) * -1.0)
-        offset_x = base_x - ease * max_offset_x * move_ratio  # 向左
-        offset_y = base_y - ease * max_offset_y * move_ratio  # 向上
-        return (offset_x, offset_y)
-    
-    moved = clip.set_position(position_func)
-    if target_size:
-        return CompositeVideoClip([moved], size=target_size)
-    return moved
+# 工具函数：按预先计算的逐帧透明度表做淡入淡出（与黑色混合），整数乘法+移位代替浮点运算
+def _fade_clip(base, alphas, fps):
+    # 透明度量化为0..256，256表示原图
+    alpha_lut = (np.clip(alphas, 0.0, 1.0) * 256).astype(np.uint16)
 
+    def fade(get_frame, t):
+        frame = get_frame(t)
+        a = alpha_lut[_frame_index(t, fps, len(alpha_lut))]
+        if a >= 256:
+            return frame
+        return ((frame.astype(np.uint16) * a) >> 8).astype(np.uint8)
 
-def _create_pan_diagonal_down_right(image_path, duration, intensity=1.0, target_size=None):
-    """
-    斜向右下平移效果
-    """
-    clip, rw, rh = _prepare_cover_clip(image_path, duration, target_size, intensity)
-    
-    if target_size:
-        tw, th = target_size
-        max_offset_x = max(0, (rw - tw) / 2)
-        max_offset_y = max(0, (rh - th) / 2)
-        base_x = -(rw - tw) / 2
-        base_y = -(rh - th) / 2
-    else:
-        max_offset_x = clip.w * 0.15
-        max_offset_y = clip.h * 0.15
-        base_x = 0
-        base_y = 0
-    move_ratio = 0.4 * min(1.0, intensity)
-    
-    # 使用set_position方法创建平移动画
-    def position_func(t):
-        ease = (math.cos(math.pi * (t / duration)) * -1.0)
-        offset_x = base_x + ease * max_offset_x * move_ratio  # 向右
-        offset_y = base_y + ease * max_offset_y * move_ratio  # 向下
-        return (offset_x, offset_y)
-    
-    moved = clip.set_position(position_func)
-    if target_size:
-        return CompositeVideoClip([moved], size=target_size)
-    return moved
+    return base.fl(fade, apply_to=[])
 
 
-def _create_pan_diagonal_down_left(image_path, duration, intensity=1.0, target_size=None):
+def _create_fade_in(image_path, duration, intensity=1.0, target_size=None, fps=_DEFAULT_FPS):
     """
-    斜向左下平移效果
+    淡入：静止图，整个时长做淡入
     """
-    clip, rw, rh = _prepare_cover_clip(image_path, duration, target_size)
-    
-    if target_size:
-        tw, th = target_size
-        max_offset_x = max(0, (rw - tw) / 2)
-        max_offset_y = max(0, (rh - th) / 2)
-        base_x = -(rw - tw) / 2
-        base_y = -(rh - th) / 2
-    else:
-        max_offset_x = clip.w * 0.15
-        max_offset_y = clip.h * 0.15
-        base_x = 0
-        base_y = 0
-    move_ratio = 0.4 * min(1.0, intensity)
-    
-    # 使用set_position方法创建平移动画
-    def position_func(t):
-        ease = (math.cos(math.pi * (t / duration)) * -1.0)
-        offset_x = base_x - ease * max_offset_x * move_ratio  # 向左
-        offset_y = base_y + ease * max_offset_y * move_ratio   # 向下
-        return (offset_x, offset_y)
+    from moviepy.editor import ImageClip
     
-    moved = clip.set_position(position_func)
-    if target_size:
-        return CompositeVideoClip([moved], size=target_size)
-    return moved
+    base = ImageClip(_get_frame_array(image_path, target_size), duration=duration)
+    fade_time = _fade_time(duration)
+    times = np.arange(max(1, int(round(duration * fps)))) / fps
+    return _fade_clip(base, times / fade_time, fps)
 
 
-def _create_no_animation(image_path, duration, intensity=1.0, target_size=None):
-    """
-    无动画效果
+def _create_fade_out(image_path, duration, intensity=1.0, target_size=None, fps=_DEFAULT_FPS):
     """
-    base = ImageClip(image_path, duration=duration)
-    if target_size:
-        base = base.resize(newsize=target_size)
-        return CompositeVideoClip([base.set_position('center')], size=target_size)
-    return base
-
-
-def _create_fade_in(image_path, duration, intensity=1.0, target_size=None):
-    """
-    淡入：静止图，整个时长做淡入
+    淡出：静止图，整个时长做淡出
     """
-    base = ImageClip(image_path, duration=duration)
-    if target_size:
-        base = base.resize(newsize=target_size)
-    clip = CompositeVideoClip([base.set_position('center')], size=target_size) if target_size else base
-    fade_time = max(0.2, min(duration, duration * 0.6))  # 淡入时间占比0.2~0.6
-    return clip.fadein(fade_time)
+    from moviepy.editor import ImageClip
+    
+    base = ImageClip(_get_frame_array(image_path, target_size), duration=duration)
+    fade_time = _fade_time(duration)
+    times = np.arange(max(1, int(round(duration * fps)))) / fps
+    return _fade_clip(base, (duration - times) / fade_time, fps)
 
 
-def _create_fade_out(image_path, duration, intensity=1.0, target_size=None):
-    """
-    淡出：静止图，整个时长做淡出
-    """
-    base = ImageClip(image_path, duration=duration)
-    if target_size:
-        base = base.resize(newsize=target_size)
-    clip = CompositeVideoClip([base.set_position('center')], size=target_size) if target_size else base
-    fade_time = max(0.2, min(duration, duration * 0.6))
-    return clip.fadeout(fade_time)
+# 效果名称 -> 动画函数，顺序即get_supported_effects返回的顺序
+_EFFECT_FUNCTIONS = {
+    'Slow Zoom In': _create_slow_zoom_in,
+    'Slow Zoom Out': _create_slow_zoom_out,
+    **{name: partial(_create_pan, dx=dx, dy=dy) for name, (dx, dy) in _PAN_DIRS.items()},
+    'Fade In': _create_fade_in,
+    'Fade Out': _create_fade_out,
+    'No Animation': _create_no_animation
+}
 
 
 # 获取所有支持的效果列表
@@ -418,19 +771,7 @@ def get_supported_effects():
     Returns:
         list: 效果名称列表
     """
-    return [
-        'Slow Zoom In',
-        'Slow Zoom Out', 
-        'Pan Left to Right',
-        'Pan Right to Left',
-        'Pan Diagonal Up Right',
-        'Pan Diagonal Up Left',
-        'Pan Diagonal Down Right',
-        'Pan Diagonal Down Left',
-        'Fade In',
-        'Fade Out',
-        'No Animation'
-    ]
+    return list(_EFFECT_FUNCTIONS)
 
 
 # 效果描述
@@ -449,6 +790,8 @@ def get_effect_description(effect_name):
         'Slow Zoom Out': '慢速缩小：图片从放大状态缩小到原始大小',
         'Pan Left to Right': '从左到右平移',
         'Pan Right to Left': '从右到左平移',
+        'Pan Up to Down': '从上到下平移',
+        'Pan Down to Up': '从下到上平移',
         'Pan Diagonal Up Right': '斜向右上平移',
         'Pan Diagonal Up Left': '斜向左上平移',
         'Pan Diagonal Down Right': '斜向右下平移',
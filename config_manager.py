@@ -2,14 +2,25 @@
 配置文件管理器
 用于保存和加载应用程序的设置
 """
+import atexit
 import json
 import os
+import tempfile
+import threading
 from typing import Dict, Any, Optional
 
+try:
+    import orjson
+except ImportError:  # orjson为可选依赖，缺失时使用标准库json
+    orjson = None
+
 
 class ConfigManager:
     """配置文件管理器"""
     
+    # update_config延迟写盘的时间（秒）
+    SAVE_DELAY = 0.25
+    
     def __init__(self, config_file: str = "app_config.json"):
         self.config_file = config_file
         self.default_config = {
@@ -28,13 +39,27 @@ class ConfigManager:
             "crf": 23,
             "threads": 0
         }
+        # 内存中的合并后配置；update_config只修改缓存，延迟合并写盘
+        self._cache: Optional[Dict[str, Any]] = None
+        self._dirty = False
+        self._save_timer: Optional[threading.Timer] = None
+        self._lock = threading.RLock()
+        atexit.register(self.flush)
     
     def load_config(self) -> Dict[str, Any]:
-        """加载配置文件"""
+        """加载配置（首次从文件读取，之后返回内存缓存的副本）"""
+        with self._lock:
+            if self._cache is None:
+                self._cache = self._read_config()
+            return self._cache.copy()
+    
+    def _read_config(self) -> Dict[str, Any]:
+        """从文件读取配置并与默认配置合并"""
         try:
             if os.path.exists(self.config_file):
-                with open(self.config_file, 'r', encoding='utf-8') as f:
-                    config = json.load(f)
+                with open(self.config_file, 'rb') as f:
+                    data = f.read()
+                    config = orjson.loads(data) if orjson is not None else json.loads(data.decode('utf-8'))
                     # 合并默认配置，确保所有键都存在
                     merged_config = self.default_config.copy()
                     merged_config.update(config)
@@ -46,20 +71,64 @@ class ConfigManager:
             return self.default_config.copy()
     
     def save_config(self, config: Dict[str, Any]) -> bool:
-        """保存配置文件"""
+        """立即保存配置文件"""
+        with self._lock:
+            self._cancel_pending_save()
+            self._cache = self.default_config.copy()
+            self._cache.update(config)
+            self._dirty = False
+            return self._write_config(config)
+    
+    def _write_config(self, config: Dict[str, Any]) -> bool:
         try:
-            with open(self.config_file, 'w', encoding='utf-8') as f:
-                json.dump(config, f, ensure_ascii=False, indent=2)
+            if orjson is not None:
+                data = orjson.dumps(config, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS)
+            else:
+                data = json.dumps(config, ensure_ascii=False, indent=2).encode('utf-8')
+            # 先写临时文件再原子替换，写入中途崩溃不会损坏原配置（配置非关键数据，不做fsync）
+            config_dir = os.path.dirname(os.path.abspath(self.config_file))
+            with tempfile.NamedTemporaryFile('wb', dir=config_dir, prefix='.config_', suffix='.tmp',
+                                             delete=False) as f:
+                f.write(data)
+            try:
+                os.replace(f.name, self.config_file)
+            except OSError:
+                os.remove(f.name)
+                raise
             return True
         except Exception as e:
             print(f"保存配置文件失败: {e}")
             return False
     
     def update_config(self, **kwargs) -> bool:
-        """更新配置并保存"""
-        config = self.load_config()
-        config.update(kwargs)
-        return self.save_config(config)
+        """更新配置，短时间内的多次更新合并为一次写盘"""
+        with self._lock:
+            if self._cache is None:
+                self._cache = self._read_config()
+            # 值没有变化时（如重复选择同一文件夹）不重新安排写盘
+            if all(key in self._cache and self._cache[key] == value for key, value in kwargs.items()):
+                return True
+            self._cache.update(kwargs)
+            self._dirty = True
+            self._cancel_pending_save()
+            self._save_timer = threading.Timer(self.SAVE_DELAY, self.flush)
+            self._save_timer.daemon = True
+            self._save_timer.start()
+        return True
+    
+    def flush(self) -> bool:
+        """把尚未写盘的配置立即保存"""
+        with self._lock:
+            self._cancel_pending_save()
+            if not self._dirty:
+                return True
+            self._dirty = False
+            return self._write_config(self._cache)
+    
+    def _cancel_pending_save(self):
+        if self._save_timer is not None:
+            self._save_timer.cancel()
+            self._save_timer = None
     
     def reset_config(self) -> bool:
         """重置为默认配置"""
@@ -11,10 +11,11 @@ import os
 current_dir = os.path.dirname(os.path.abspath(__file__))
 sys.path.insert(0, current_dir)
 
-# 导入并运行主程序
-try:
-    from main import main
-    main()
-except Exception as e:
-    print(f"启动失败: {e}")
-    input("按回车键退出...")
+# 导入并运行主程序（需放在__main__保护内，避免进程池子进程重复启动界面）
+if __name__ == "__main__":
+    try:
+        from main import main
+        main()
+    except Exception as e:
+        print(f"启动失败: {e}")
+        input("按回车键退出...")
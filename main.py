@@ -4,20 +4,26 @@ Audio-Driven Photo Slideshow Generator
 """
 
 import sys
+import math
 import os
+import atexit
+import json
+import multiprocessing
 import random
 import time
 import shutil
 import subprocess
+import threading
+from functools import lru_cache, partial
 from typing import List, Optional
 from PyQt5.QtWidgets import (QApplication, QMainWindow, QWidget, QVBoxLayout, 
                              QHBoxLayout, QLabel, QPushButton, QFileDialog, 
-                             QMessageBox, QDoubleSpinBox, QComboBox, QProgressBar, QCheckBox,
+                             QMessageBox, QDoubleSpinBox, QSpinBox, QComboBox, QProgressBar, QCheckBox,
                              QGroupBox, QFrame, QTextEdit, QSplitter)
 from PyQt5.QtCore import Qt, QThread, pyqtSignal, QTimer
-from PyQt5.QtGui import QFont
-from moviepy.editor import ImageClip, AudioFileClip, concatenate_videoclips
-from animation_effects import create_animated_clip, get_supported_effects
+from PyQt5.QtGui import QFont, QTextCursor
+from animation_effects import (create_animated_clip, create_animated_clips_batch, get_supported_effects,
+                               build_fade_filters, resize_frame, scale_to_canvas)
 from config_manager import ConfigManager
 import psutil
 
@@ -33,22 +39,128 @@ class SilentLogger:
         return lambda *args, **kwargs: None
 
 
-def safe_write_videofile(video_clip, output_path, fps=24, preset='ultrafast', crf=23, threads=1, audio_codec='aac'):
+# 输出为分片MP4：moov写在文件开头，无需+faststart在结束时整体重写一遍文件
+MP4_MOVFLAGS = '+frag_keyframe+empty_moov+default_base_moof'
+
+# 批量模式支持的音频扩展名（元组，可直接传给str.endswith）
+AUDIO_EXTENSIONS = ('.mp3', '.wav', '.flac', '.aac', '.ogg', '.m4a', '.wma')
+
+# "随机效果"的候选效果，排除"随机效果"本身和"No Animation"
+_RANDOM_EFFECT_CHOICES = tuple(e for e in get_supported_effects() if e not in ("随机效果", "No Animation"))
+
+
+def x264_slideshow_params(fps, preset):
+    """幻灯片内容的libx264调优参数：静态画面为主，使用stillimage调优和较长的关键帧间隔"""
+    fps = int(round(fps))
+    # -x264-params在预设和-bf/-refs之后生效，参考帧和B帧数量必须都写在这里
+    # ultrafast追求速度，完全关闭B帧并只用一个参考帧
+    frame_refs = "ref=1:bframes=0" if preset == 'ultrafast' else "ref=2:bframes=2"
+    return ['-tune', 'stillimage',
+            '-x264-params', f"keyint={fps * 10}:min-keyint={fps * 5}:scenecut=40:{frame_refs}"]
+
+
+def tpad_filter(duration):
+    """复制最后一帧把视频延长duration秒的ffmpeg滤镜"""
+    return f"tpad=stop_mode=clone:stop_duration={duration:.3f}"
+
+
+# ffprobe结果的磁盘缓存，键为"绝对路径|修改时间"，跨运行复用
+_PROBE_CACHE_FILE = os.path.join(os.path.expanduser('~'), '.cache', 'adps', 'probe.json')
+_probe_disk_cache = None
+_probe_disk_dirty = False
+
+
+def _load_probe_cache():
+    global _probe_disk_cache
+    if _probe_disk_cache is None:
+        try:
+            with open(_PROBE_CACHE_FILE, 'rb') as f:
+                _probe_disk_cache = json.loads(f.read())
+        except (OSError, ValueError):
+            _probe_disk_cache = {}
+    return _probe_disk_cache
+
+
+def _save_probe_cache():
+    """退出时把新的探测结果写回磁盘（先写临时文件再替换）"""
+    if not _probe_disk_dirty:
+        return
+    try:
+        os.makedirs(os.path.dirname(_PROBE_CACHE_FILE), exist_ok=True)
+        temp_path = _PROBE_CACHE_FILE + '.tmp'
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json.dump(_probe_disk_cache, f)
+        os.replace(temp_path, _PROBE_CACHE_FILE)
+    except OSError:
+        pass
+
+
+atexit.register(_save_probe_cache)
+
+
+@lru_cache(maxsize=256)
+def _probe(path, mtime_ns):
+    global _probe_disk_dirty
+    disk_cache = _load_probe_cache()
+    key = f"{path}|{mtime_ns}"
+    if key in disk_cache:
+        return tuple(disk_cache[key])
+    
+    output = subprocess.check_output(
+        ['ffprobe', '-v', 'quiet', '-print_format', 'json', '-show_streams', '-show_format', path],
+        stderr=subprocess.DEVNULL
+    )
+    info = json.loads(output)
+    streams = info.get('streams', [])
+    video = next((st for st in streams if st.get('codec_type') == 'video'), {})
+    duration = info.get('format', {}).get('duration') or video.get('duration')
+    if duration is None:
+        raise ValueError(f"无法获取媒体时长: {path}")
+    result = (float(duration), int(video.get('width', 0)), int(video.get('height', 0)))
+    disk_cache[key] = list(result)
+    _probe_disk_dirty = True
+    return result
+
+
+def probe_media(path):
+    """用ffprobe获取媒体文件的(时长, 宽, 高)，纯音频宽高为0；文件修改后自动重新探测"""
+    path = os.path.abspath(path)
+    return _probe(path, os.stat(path).st_mtime_ns)
+
+
+def _replace_file(src, dst):
+    """把src移动为dst：同一文件系统时只重命名，跨设备失败时回退为复制"""
+    try:
+        os.replace(src, dst)
+    except OSError:
+        shutil.copy2(src, dst)
+
+
+def safe_write_videofile(video_clip, output_path, fps=24, preset='ultrafast', crf=23, threads=1, audio_codec='aac',
+                         video_filters=None, progress_callback=None, audio_path=None, release_clips=None):
     """使用GPU加速 + 多线程帧预取的超高速导出
     
-    使用线程池并行获取帧，配合NVIDIA NVENC硬件编码器
+    生成帧、写入编码管道、读取编码进度分别在独立线程中进行，配合NVIDIA NVENC硬件编码器
+    crf: NVENC以恒定比特率编码，不使用该参数，保留以兼容调用方
+    video_filters: 编码时附加的ffmpeg视频滤镜列表（如淡入淡出），在编码管线中完成
+    progress_callback: 编码进度回调 (已编码帧数, 总帧数)
+    audio_path: 原始音频文件，给出时编码时直接混流，不再经过MoviePy导出音频和二次合并
+    release_clips: 按顺序拼接成video_clip的片段列表，某个片段的帧全部生成后立即关闭并从列表中移除
     """
     import tempfile
     import uuid
     import numpy as np
     from concurrent.futures import ThreadPoolExecutor, as_completed
+    from itertools import islice
     from queue import Queue
     import threading
     
     temp_dir = tempfile.gettempdir()
     unique_id = uuid.uuid4().hex[:8]
     temp_audio = os.path.join(temp_dir, f"temp_a_{unique_id}.wav")
-    temp_video_no_audio = os.path.join(temp_dir, f"temp_v_{unique_id}.mp4")
+    filter_script = os.path.join(temp_dir, f"temp_f_{unique_id}.txt")
+    # 无音频视频写在输出目录，与输出文件同一文件系统，最后只需重命名
+    temp_video_no_audio = os.path.join(os.path.dirname(os.path.abspath(output_path)), f"temp_v_{unique_id}.mp4")
     
     try:
         # 获取视频尺寸和时长
@@ -56,6 +168,11 @@ def safe_write_videofile(video_clip, output_path, fps=24, preset='ultrafast', cr
         height, width = video_clip.size[1], video_clip.size[0]
         total_frames = int(duration * fps)
         
+        # 滤镜数量随淡入淡出片段增长，写入脚本文件避免超出命令行长度限制（Windows约32K）
+        if video_filters:
+            with open(filter_script, 'w', encoding='utf-8') as f:
+                f.write(f"[0:v]{','.join(video_filters)}[v]")
+        
         # 步骤1: 使用NVENC GPU编码器通过管道流式编码视频
         ffmpeg_cmd = [
             'ffmpeg',
@@ -65,51 +182,112 @@ def safe_write_videofile(video_clip, output_path, fps=24, preset='ultrafast', cr
             '-s', f'{width}x{height}',
             '-pix_fmt', 'rgb24',
             '-r', str(fps),
+            # 原始帧格式已完整指定，无需探测；输入队列以帧为单位，取适中的值避免占用过多内存
+            '-thread_queue_size', '64',
+            '-probesize', '32',
+            '-analyzeduration', '0',
+            '-fflags', '+nobuffer',
             '-i', '-',  # 从stdin读取
+            *(['-i', audio_path] if audio_path else []),
+            *(['-filter_complex_script', filter_script, '-map', '[v]'] if video_filters else ['-map', '0:v']),
+            *(['-map', '1:a'] if audio_path else []),
             '-c:v', 'h264_nvenc',  # NVIDIA GPU编码器
             '-preset', 'p1',  # p1是最快的预设
-            '-tune', 'hq',  # 高质量调优
-            '-rc', 'vbr',  # 可变比特率
-            '-cq', str(crf),
-            '-b:v', '8M',  # 提高比特率以提升质量
-            '-maxrate', '15M',
-            '-bufsize', '15M',
+            '-tune', 'll',  # 低延迟调优，不启用前瞻
+            '-rc', 'cbr',  # 恒定比特率，省去VBR的码率调整
+            '-b:v', '8M',
+            '-bf', '0',  # 不使用B帧
+            '-g', str(int(fps * 2)),  # 关键帧间隔2秒
             '-pix_fmt', 'yuv420p',
             '-loglevel', 'error',
-            temp_video_no_audio
+            '-progress', 'pipe:1', '-nostats',
+            *(['-c:a', audio_codec, '-b:a', '192k', '-shortest', '-movflags', MP4_MOVFLAGS, output_path]
+              if audio_path else [temp_video_no_audio])
         ]
         
         # 启动ffmpeg进程
         process = subprocess.Popen(
             ffmpeg_cmd,
             stdin=subprocess.PIPE,
-            stdout=subprocess.DEVNULL,
+            stdout=subprocess.PIPE,
             stderr=subprocess.DEVNULL
         )
         
-        # 使用批量渲染模式 - 一次性渲染多帧
-        batch_size = 60  # 每批处理60帧（约2.5秒）
+        # 生产者线程逐帧生成画面（持有GIL），主线程写入管道时释放GIL，两者与编码器并行
+        # 预取帧数按内存上限（约256MB）计算，限制在8~60帧之间，高分辨率时不占用过多内存
+        prefetch = max(8, min(60, (256 << 20) // (width * height * 3)))
+        frame_queue = Queue(maxsize=prefetch)
+        stop_event = threading.Event()
+        producer_errors = []
         
-        for batch_start in range(0, total_frames, batch_size):
-            batch_end = min(batch_start + batch_size, total_frames)
-            
-            # 批量获取时间点
-            times = [frame_idx / fps for frame_idx in range(batch_start, batch_end)]
-            
-            # 批量渲染帧（这比逐帧调用get_frame快很多）
-            for t in times:
-                if t >= duration:
-                    break
-                    
-                frame = video_clip.get_frame(t)
-                try:
-                    process.stdin.write(frame.astype('uint8').tobytes())
-                except BrokenPipeError:
-                    break
+        # 各片段的结束时间；最后一个片段可能被延长视频时复用，不提前释放
+        release_ends = np.cumsum([clip.duration for clip in release_clips]) if release_clips else []
+        
+        # 循环复用的帧缓冲：队列中最多prefetch帧，再加写入中和生成中各一帧，不会覆盖未写出的帧
+        frame_buffers = [np.empty((height, width, 3), dtype=np.uint8) for _ in range(prefetch + 2)]
+        
+        def produce_frames():
+            next_release = 0
+            try:
+                # 按时间顺序一次遍历整条时间线
+                frames = video_clip.iter_frames(fps=fps, with_times=True, dtype='uint8', logger=None)
+                for frame_idx, (t, frame) in enumerate(islice(frames, total_frames)):
+                    if stop_event.is_set():
+                        break
+                    while next_release < len(release_ends) - 1 and t >= release_ends[next_release]:
+                        release_clips[next_release].close()
+                        release_clips[next_release] = None
+                        next_release += 1
+                    # 部分效果复用输出缓冲区，入队前必须复制到独立的缓冲中
+                    buffer = frame_buffers[frame_idx % len(frame_buffers)]
+                    np.copyto(buffer, frame)
+                    frame_queue.put(buffer)
+            except Exception as e:
+                producer_errors.append(e)
+            finally:
+                frame_queue.put(None)
+        
+        def read_progress():
+            # -progress输出形如 frame=123 的键值行
+            for line in process.stdout:
+                if progress_callback and line.startswith(b'frame='):
+                    try:
+                        progress_callback(int(line[6:]), total_frames)
+                    except ValueError:
+                        pass
+        
+        producer = threading.Thread(target=produce_frames, daemon=True)
+        progress_reader = threading.Thread(target=read_progress, daemon=True)
+        producer.start()
+        progress_reader.start()
+        
+        while True:
+            frame = frame_queue.get()
+            if frame is None:
+                break
+            if stop_event.is_set():
+                # 编码器已退出，继续取出剩余帧让生产者结束
+                continue
+            try:
+                process.stdin.write(frame)
+            except BrokenPipeError:
+                stop_event.set()
         
         # 关闭stdin并等待完成
-        process.stdin.close()
+        producer.join()
+        try:
+            process.stdin.close()
+        except BrokenPipeError:
+            pass
         process.wait()
+        progress_reader.join()
+        if producer_errors:
+            raise producer_errors[0]
+        
+        if audio_path:
+            if process.returncode != 0 or not os.path.exists(output_path):
+                raise Exception(f"ffmpeg编码失败，返回码: {process.returncode}")
+            return
         
         # 步骤2: 处理音频 - 完全使用ffmpeg处理，避免moviepy音频对象的兼容性问题
         if video_clip.audio is not None:
@@ -147,7 +325,7 @@ def safe_write_videofile(video_clip, output_path, fps=24, preset='ultrafast', cr
                         '-c:a', 'aac',   # 音频编码为AAC
                         '-b:a', '192k',  # 音频比特率
                         '-shortest',     # 使用最短的流长度
-                        '-movflags', '+faststart',
+                        '-movflags', MP4_MOVFLAGS,
                         output_path
                     ]
                 else:
@@ -160,7 +338,7 @@ def safe_write_videofile(video_clip, output_path, fps=24, preset='ultrafast', cr
                         '-c:v', 'copy',
                         '-c:a', 'aac',
                         '-b:a', '192k',
-                        '-movflags', '+faststart',
+                        '-movflags', MP4_MOVFLAGS,
                         output_path
                     ]
                 
@@ -191,17 +369,17 @@ def safe_write_videofile(video_clip, output_path, fps=24, preset='ultrafast', cr
                 
                 # 保存无音频版本
                 if os.path.exists(temp_video_no_audio):
-                    shutil.copy2(temp_video_no_audio, output_path)
+                    _replace_file(temp_video_no_audio, output_path)
                     raise Exception(f"音频处理失败，已保存无音频版本: {str(e)}")
                 else:
                     raise
         else:
-            # 没有音频，直接复制
-            shutil.copy2(temp_video_no_audio, output_path)
+            # 没有音频，直接作为输出文件
+            _replace_file(temp_video_no_audio, output_path)
             
     finally:
         # 清理临时文件
-        for f in [temp_audio, temp_video_no_audio]:
+        for f in [temp_audio, temp_video_no_audio, filter_script]:
             if os.path.exists(f):
                 try:
                     os.remove(f)
@@ -216,7 +394,9 @@ class VideoGenerationWorker(QThread):
     progress_updated = pyqtSignal(int)  # 进度更新 (0-100)
     status_updated = pyqtSignal(str)    # 状态更新
     log_updated = pyqtSignal(str)       # 日志更新
-    generation_finished = pyqtSignal(bool, str)  # 生成完成 (成功/失败, 消息)
+    generation_finished = pyqtSignal(bool, str)  # 生成完成 (成功/失败, 消息)，批量模式下每个音频发送一次
+    batch_item_started = pyqtSignal(int)         # 批量模式开始处理第几个音频 (从0开始)
+    batch_finished = pyqtSignal()                # 批量模式全部结束（完成或被停止）
     
     def __init__(self, image_folder: str, audio_file: str, image_duration: float | tuple, 
                  animation_effect: str, output_path: str, animation_intensity: float = 1.0,
@@ -224,7 +404,8 @@ class VideoGenerationWorker(QThread):
                  crf: int = 23, threads: int | None = None, processed_folder: str | None = None,
                  video_clip_folder: str | None = None, enable_video_clips: bool = False, 
                  video_clip_count: int = 3, video_clip_scale_mode: str = "crop",
-                 processed_video_folder: str | None = None, enable_segmented_processing: bool = True):
+                 processed_video_folder: str | None = None, enable_segmented_processing: bool = True,
+                 use_ffmpeg_filtergraph: bool = False, batch_jobs: list | None = None):
         super().__init__()
         self.image_folder = image_folder
         self.audio_file = audio_file
@@ -244,6 +425,10 @@ class VideoGenerationWorker(QThread):
         self.video_clip_scale_mode = video_clip_scale_mode
         self.processed_video_folder = processed_video_folder
         self.enable_segmented_processing = enable_segmented_processing
+        # 纯图片幻灯片直接用一条ffmpeg滤镜图渲染，False时始终使用MoviePy路径
+        self.use_ffmpeg_filtergraph = use_ffmpeg_filtergraph
+        # 批量模式的 [(音频文件, 输出路径), ...]，在同一线程内依次处理；为None时只处理audio_file
+        self.batch_jobs = batch_jobs
         
         # 支持的图片格式
         self.image_extensions = {'.jpg', '.jpeg', '.png', '.bmp', '.gif', '.tiff', '.webp'}
@@ -260,11 +445,77 @@ class VideoGenerationWorker(QThread):
         # 分段导出产生的临时文件
         self.temp_segment_files = []
         
+        # 淡入淡出是否延迟到导出阶段由ffmpeg完成（仅非分段模式）
+        self.defer_fades = False
+        
+        # 上次发送的进度，值不变时不重复发送
+        self._last_progress = -1
+        
+        # 日志缓冲：合并多条日志后一次性发送，减少跨线程信号
+        self._log_buffer = []
+        self._log_last_flush = time.monotonic()
+        
         # 线程控制
         self._is_running = True
+        # 批量模式下某个音频失败后，等待界面决定是否继续
+        self._last_succeeded = False
+        self._continue_event = threading.Event()
+    
+    def _log(self, message):
+        """记录日志，累计32条或距上次发送超过0.1秒时合并发送"""
+        self._log_buffer.append(message)
+        if len(self._log_buffer) >= 32 or time.monotonic() - self._log_last_flush > 0.1:
+            self._flush_log()
+    
+    def _set_progress(self, value):
+        """更新进度，只在整数百分比变化时发送信号"""
+        value = int(value)
+        if value != self._last_progress:
+            self._last_progress = value
+            self.progress_updated.emit(value)
+    
+    def _flush_log(self):
+        """立即发送缓冲中的日志"""
+        if self._log_buffer:
+            self.log_updated.emit('\n'.join(self._log_buffer))
+            self._log_buffer.clear()
+        self._log_last_flush = time.monotonic()
     
     def run(self):
-        """执行视频生成"""
+        """执行视频生成；批量模式下在同一线程内依次处理所有音频"""
+        if not self.batch_jobs:
+            self._generate()
+            return
+        
+        for index, (audio_file, output_path) in enumerate(self.batch_jobs):
+            if not self._is_running:
+                break
+            self.reset(audio_file, output_path)
+            self.batch_item_started.emit(index)
+            self._generate()
+            if not self._last_succeeded and self._is_running:
+                self._continue_event.wait()
+                self._continue_event.clear()
+        self.batch_finished.emit()
+    
+    def reset(self, audio_file: str, output_path: str):
+        """切换到下一个音频，清空上一个音频的处理状态"""
+        self.audio_file = audio_file
+        self.output_path = output_path
+        self.actually_processed_images = []
+        self.actually_processed_videos = []
+        self.temp_segment_files = []
+        self._last_progress = -1
+    
+    def continue_batch(self, proceed: bool):
+        """批量模式下某个音频失败后，由界面决定继续处理剩余音频还是停止"""
+        if not proceed:
+            self._is_running = False
+        self._continue_event.set()
+    
+    def _generate(self):
+        """生成当前audio_file对应的视频"""
+        self._last_succeeded = False
         # 全局设置stdout/stderr保护，避免moviepy任何地方访问None的stdout
         original_stdout = sys.stdout
         original_stderr = sys.stderr
@@ -298,25 +549,25 @@ class VideoGenerationWorker(QThread):
             step_times = {}  # 记录各步骤耗时
             
             # 步骤1: 输入验证
-            self.log_updated.emit("=== 开始视频生成 ===")
-            self.log_updated.emit(f"开始时间: {time_module.strftime('%Y-%m-%d %H:%M:%S')}")
-            self.log_updated.emit(f"图片文件夹: {self.image_folder}")
-            self.log_updated.emit(f"音频文件: {self.audio_file}")
+            self._log("=== 开始视频生成 ===")
+            self._log(f"开始时间: {time_module.strftime('%Y-%m-%d %H:%M:%S')}")
+            self._log(f"图片文件夹: {self.image_folder}")
+            self._log(f"音频文件: {self.audio_file}")
             if isinstance(self.image_duration, tuple):
-                self.log_updated.emit(f"图片时长范围: {self.image_duration[0]} - {self.image_duration[1]} 秒")
+                self._log(f"图片时长范围: {self.image_duration[0]} - {self.image_duration[1]} 秒")
             else:
-                self.log_updated.emit(f"图片时长: {self.image_duration}秒")
-            self.log_updated.emit(f"动画效果: {self.animation_effect}")
-            self.log_updated.emit(f"动画强度: {self.animation_intensity}x")
-            self.log_updated.emit(f"输出路径: {self.output_path}")
+                self._log(f"图片时长: {self.image_duration}秒")
+            self._log(f"动画效果: {self.animation_effect}")
+            self._log(f"动画强度: {self.animation_intensity}x")
+            self._log(f"输出路径: {self.output_path}")
             if self.resolution:
-                self.log_updated.emit(f"目标分辨率: {self.resolution[0]}x{self.resolution[1]}")
-            self.log_updated.emit(f"导出FPS: {self.fps}")
-            self.log_updated.emit(f"编码预设: {self.preset} | CRF: {self.crf} | 线程: {self.threads}")
+                self._log(f"目标分辨率: {self.resolution[0]}x{self.resolution[1]}")
+            self._log(f"导出FPS: {self.fps}")
+            self._log(f"编码预设: {self.preset} | CRF: {self.crf} | 线程: {self.threads}")
             
             self.status_updated.emit("验证输入文件...")
-            self.log_updated.emit("步骤1: 验证输入文件...")
-            self.progress_updated.emit(5)
+            self._log("步骤1: 验证输入文件...")
+            self._set_progress(5)
             
             if not os.path.exists(self.image_folder):
                 raise FileNotFoundError(f"图片文件夹不存在: {self.image_folder}")
@@ -324,29 +575,36 @@ class VideoGenerationWorker(QThread):
             if not os.path.exists(self.audio_file):
                 raise FileNotFoundError(f"音频文件不存在: {self.audio_file}")
             
-            self.log_updated.emit("✓ 输入文件验证通过")
+            self._log("✓ 输入文件验证通过")
             
             # 步骤2: 加载音频文件
             step_start = time_module.time()
             self.status_updated.emit("加载音频文件...")
-            self.log_updated.emit("步骤2: 加载音频文件...")
-            self.progress_updated.emit(10)
+            self._log("步骤2: 加载音频文件...")
+            self._set_progress(10)
             
-            audio_clip = AudioFileClip(self.audio_file)
-            audio_duration = audio_clip.duration
+            from moviepy.editor import AudioFileClip
+            # 优先用缓存的ffprobe结果获取时长，真正需要音频数据时再解码
+            audio_clip = None
+            try:
+                audio_duration = probe_media(self.audio_file)[0]
+            except (OSError, subprocess.CalledProcessError, ValueError):
+                audio_clip = AudioFileClip(self.audio_file)
+                audio_duration = audio_clip.duration
             step_times['加载音频'] = time_module.time() - step_start
-            self.log_updated.emit(f"✓ 音频加载完成，时长: {audio_duration:.2f}秒 ({audio_duration/60:.1f}分钟) [耗时: {step_times['加载音频']:.1f}秒]")
+            self._log(f"✓ 音频加载完成，时长: {audio_duration:.2f}秒 ({audio_duration/60:.1f}分钟) [耗时: {step_times['加载音频']:.1f}秒]")
             
             # 步骤3: 读取图片文件夹
             step_start = time_module.time()
             self.status_updated.emit("扫描图片文件...")
-            self.log_updated.emit("步骤3: 扫描图片文件...")
-            self.progress_updated.emit(15)
+            self._log("步骤3: 扫描图片文件...")
+            self._set_progress(15)
             
-            image_files = []
-            for file in os.listdir(self.image_folder):
-                if any(file.lower().endswith(ext) for ext in self.image_extensions):
-                    image_files.append(os.path.join(self.image_folder, file))
+            # scandir直接给出完整路径，扩展名只做一次集合查找
+            with os.scandir(self.image_folder) as entries:
+                image_files = [entry.path for entry in entries
+                               if os.path.splitext(entry.name)[1].lower() in self.image_extensions
+                               and entry.is_file()]
             
             if not image_files:
                 raise ValueError("图片文件夹中没有找到支持的图片文件")
@@ -354,15 +612,15 @@ class VideoGenerationWorker(QThread):
             # 按文件名排序
             image_files.sort()
             step_times['扫描图片'] = time_module.time() - step_start
-            self.log_updated.emit(f"✓ 找到 {len(image_files)} 张图片 [耗时: {step_times['扫描图片']:.1f}秒]")
-            self.log_updated.emit(f"图片列表: {[os.path.basename(f) for f in image_files[:5]]}{'...' if len(image_files) > 5 else ''}")
+            self._log(f"✓ 找到 {len(image_files)} 张图片 [耗时: {step_times['扫描图片']:.1f}秒]")
+            self._log(f"图片列表: {[os.path.basename(f) for f in image_files[:5]]}{'...' if len(image_files) > 5 else ''}")
 
             # 步骤4: 创建视频片段
             step_start = time_module.time()
             self.status_updated.emit("创建视频片段...")
-            self.log_updated.emit("步骤4: 创建视频片段...")
-            self.log_updated.emit(f"预计处理 {len(image_files)} 张图片，每张 {self.image_duration} 秒")
-            self.progress_updated.emit(20)
+            self._log("步骤4: 创建视频片段...")
+            self._log(f"预计处理 {len(image_files)} 张图片，每张 {self.image_duration} 秒")
+            self._set_progress(20)
             
             # 如果启用了视频片段插入，需要预留时间
             available_duration = audio_duration
@@ -370,266 +628,472 @@ class VideoGenerationWorker(QThread):
                 # 估算视频片段需要的总时长（假设每个视频片段平均8秒）
                 estimated_video_clips_duration = self.video_clip_count * 8.0
                 available_duration = audio_duration - estimated_video_clips_duration
-                self.log_updated.emit(f"为视频片段预留时间: {estimated_video_clips_duration:.1f}s, 图片可用时长: {available_duration:.1f}s")
-            
+                self._log(f"为视频片段预留时间: {estimated_video_clips_duration:.1f}s, 图片可用时长: {available_duration:.1f}s")
+            
+            # 非分段模式下淡入淡出交给导出阶段的ffmpeg fade滤镜完成
+            use_segmented = self.enable_segmented_processing and audio_duration > 300  # 超过5分钟启用分段处理
+            self.defer_fades = not use_segmented
+            
+            # 先一次性规划每张图片的时长和效果（随机时长预算在创建片段前算完），再统一创建片段
+            # 时长上限使用可用时长而不是音频时长
+            desired_durations, durations = self._plan_durations(len(image_files), available_duration)
+            if len(durations) < len(image_files):
+                self._log(f"已达到图片可用时长上限，停止处理剩余图片")
+            
+            effects = self._plan_effects(len(durations), _RANDOM_EFFECT_CHOICES)
+            
+            plan = []
+            for i, (image_path, desired, clip_duration, effect) in enumerate(
+                    zip(image_files, desired_durations, durations, effects)):
+                self._log(f"处理图片 {i+1}: {os.path.basename(image_path)} (目标: {desired:.1f}s, 实际: {clip_duration:.1f}s, 效果: {effect}, 强度: {self.animation_intensity}x)")
+                plan.append((i, image_path, clip_duration, effect))
+            
+            # 纯图片幻灯片：一条ffmpeg命令完成渲染、拼接和编码，失败时回退到MoviePy路径
+            if (self.use_ffmpeg_filtergraph and self.resolution and not self.enable_video_clips
+                    and not use_segmented and plan):
+                self._log("使用ffmpeg滤镜图直接渲染视频...")
+                self._set_progress(30)
+                if self.render_plan_with_ffmpeg(plan, audio_duration):
+                    self.actually_processed_images.extend(image_path for _, image_path, _, _ in plan)
+                    step_times['渲染导出视频'] = time_module.time() - step_start
+                    self._log(f"✓ 视频导出完成 [耗时: {step_times['渲染导出视频']:.1f}秒]")
+                    if audio_clip is not None:
+                        audio_clip.close()
+                    self._finish_generation(start_time, step_times, audio_duration)
+                    return
+                self._log("ffmpeg滤镜图渲染失败，改用MoviePy渲染")
+            
+            if audio_clip is None:
+                audio_clip = AudioFileClip(self.audio_file)
+            
+            # 创建动画片段
             clips = []
             current_video_duration = 0.0
-            total_images = len(image_files)
-            processed_count = 0
-            
-            for i, image_path in enumerate(image_files):
-                # 检查时长上限（使用可用时长而不是音频时长）
-                if current_video_duration >= available_duration:
-                    self.log_updated.emit(f"已达到图片可用时长上限，停止处理剩余图片")
-                    break
-                
-                # 计算当前片段时长（范围内随机）
-                remaining_time = available_duration - current_video_duration
-                if isinstance(self.image_duration, tuple):
-                    dmin, dmax = self.image_duration
-                    rnd = random.random()
-                    desired = dmin + (dmax - dmin) * rnd
-                else:
-                    desired = float(self.image_duration)
-                clip_duration = min(desired, remaining_time)
-                
-                if clip_duration <= 0:
-                    self.log_updated.emit(f"剩余时间不足，停止处理")
-                    break
-                
-                # 更新状态
-                self.status_updated.emit(f"正在处理第 {i+1} / {total_images} 张图片...")
-                progress = 20 + (i / total_images) * 60  # 20% 到 80%
-                self.progress_updated.emit(int(progress))
-                
-                try:
-                    # 选择动画效果
-                    effect = self.animation_effect
-                    if effect == "随机效果":
-                        # 随机选择一个效果（排除"随机效果"和"No Animation"）
-                        available_effects = [e for e in get_supported_effects() 
-                                           if e not in ["随机效果", "No Animation"]]
-                        effect = random.choice(available_effects)
-                    
-                    self.log_updated.emit(f"处理图片 {i+1}: {os.path.basename(image_path)} (目标: {desired:.1f}s, 实际: {clip_duration:.1f}s, 效果: {effect}, 强度: {self.animation_intensity}x)")
-                    
-                    # 创建动画片段
-                    clip = create_animated_clip(
-                        image_path,
-                        clip_duration,
-                        effect,
-                        self.animation_intensity,
-                        self.resolution
-                    )
-                    clips.append(clip)
-                    
-                    # 记录实际处理的图片
-                    self.actually_processed_images.append(image_path)
-                    
-                    current_video_duration += clip_duration
-                    processed_count += 1
-                    
-                    self.log_updated.emit(f"✓ 图片 {i+1} 处理完成，当前视频时长: {current_video_duration:.1f}s")
-                    
-                except Exception as e:
-                    self.log_updated.emit(f"✗ 处理图片 {i+1} 失败: {str(e)}")
+            # 读取失败的图片，其时长顺延给下一张成功的图片（末尾失败时给最后一张），保持总时长不变
+            carry_duration = 0.0
+            last_entry = None
+            for entry, clip in zip(plan, self.build_image_clips(plan, progress_range=(20, 80))):
+                i, image_path, clip_duration, effect = entry
+                if clip is None:
+                    carry_duration += clip_duration
                     continue
+                if carry_duration:
+                    clip_duration += carry_duration
+                    clip = self._rebuild_clip(clip, (i, image_path, clip_duration, effect))
+                    carry_duration = 0.0
+                clips.append(clip)
+                last_entry = (i, image_path, clip_duration, effect)
+                
+                # 记录实际处理的图片
+                self.actually_processed_images.append(image_path)
+                current_video_duration += clip_duration
+                self._log(f"✓ 图片 {i+1} 处理完成，当前视频时长: {current_video_duration:.1f}s")
+            if carry_duration and clips:
+                i, image_path, clip_duration, effect = last_entry
+                clips[-1] = self._rebuild_clip(clips[-1], (i, image_path, clip_duration + carry_duration, effect))
+                current_video_duration += carry_duration
+            processed_count = len(clips)
             
             if not clips:
                 raise ValueError("没有成功创建任何视频片段")
             
             step_times['创建视频片段'] = time_module.time() - step_start
-            self.log_updated.emit(f"✓ 视频片段创建完成，共处理 {processed_count} 张图片 [耗时: {step_times['创建视频片段']:.1f}秒]")
-            self.log_updated.emit(f"总视频时长: {current_video_duration:.1f}s")
+            self._log(f"✓ 视频片段创建完成，共处理 {processed_count} 张图片 [耗时: {step_times['创建视频片段']:.1f}秒]")
+            self._log(f"总视频时长: {current_video_duration:.1f}s")
             
             # 步骤5: 插入视频片段
             if self.enable_video_clips:
                 step_start = time_module.time()
                 self.status_updated.emit("插入视频片段...")
-                self.log_updated.emit("步骤5: 插入视频片段...")
-                self.progress_updated.emit(80)
+                self._log("步骤5: 插入视频片段...")
+                self._set_progress(80)
                 clips = self.insert_video_clips(clips, audio_duration, image_files)
                 
                 # 重新计算视频总时长
                 new_video_duration = sum(clip.duration for clip in clips)
                 step_times['插入视频片段'] = time_module.time() - step_start
-                self.log_updated.emit(f"插入视频片段后，总时长: {new_video_duration:.2f}s [耗时: {step_times['插入视频片段']:.1f}秒]")
+                self._log(f"插入视频片段后，总时长: {new_video_duration:.2f}s [耗时: {step_times['插入视频片段']:.1f}秒]")
                 
                 # 如果视频时长超过音频时长，给出警告
                 if new_video_duration > audio_duration:
-                    self.log_updated.emit(f"警告: 插入视频片段后，视频时长({new_video_duration:.2f}s)超过音频时长({audio_duration:.2f}s)")
-                    self.log_updated.emit("系统将循环播放音频以匹配视频长度")
+                    self._log(f"警告: 插入视频片段后，视频时长({new_video_duration:.2f}s)超过音频时长({audio_duration:.2f}s)")
+                    self._log("合成时将把视频截断到音频长度")
                 
-                self.log_updated.emit("✓ 视频片段插入完成")
+                self._log("✓ 视频片段插入完成")
             
             # 步骤6: 分段处理或最终视频合成
             step_start = time_module.time()
-            if self.enable_segmented_processing and audio_duration > 300:  # 超过5分钟启用分段处理
+            video_filters = []
+            if use_segmented:
                 self.status_updated.emit("分段处理视频...")
-                self.log_updated.emit("步骤6: 分段处理视频...")
-                self.progress_updated.emit(85)
-                final_video = self.process_segmented_video(clips, audio_clip, audio_duration, image_files)
+                self._log("步骤6: 分段处理视频...")
+                self._set_progress(85)
+                final_video = self.process_segmented_video(clips, audio_duration, image_files)
             else:
                 self.status_updated.emit("合成视频...")
-                self.log_updated.emit("步骤6: 合成视频...")
-                self.progress_updated.emit(85)
-                final_video = self.process_single_video(clips, audio_clip, audio_duration)
-            
-            # 设置音频
-            final_video = final_video.set_audio(audio_clip)
-            self.log_updated.emit(f"✓ 视频音频同步完成，最终时长: {final_video.duration:.2f}s")
-            
-            # 步骤8: 导出视频
-            self.status_updated.emit("导出视频中...")
-            self.log_updated.emit("步骤8: 导出视频...")
-            self.log_updated.emit(f"正在导出到: {self.output_path}")
-            self.log_updated.emit("注意: 导出过程可能需要较长时间，请耐心等待...")
-            self.progress_updated.emit(95)
-            
-            # 根据视频长度调整导出参数
-            self.log_updated.emit("开始编码导出...")
-            
-            # 使用安全的导出函数
-            safe_write_videofile(
-                final_video,
-                self.output_path,
-                fps=self.fps,
-                preset=self.preset,
-                crf=self.crf,
-                threads=self.threads,
-                audio_codec='aac'
-            )
+                self._log("步骤6: 合成视频...")
+                self._set_progress(85)
+                video_filters = build_fade_filters(clips)
+                final_video = self.process_single_video(clips, audio_clip, audio_duration, video_filters)
+            
+            # 分段结果已由ffmpeg直接拼接到输出文件时，无需再导出
+            if final_video is not None:
+                # 音频不经过MoviePy，导出时由ffmpeg直接混入原始音频文件
+                final_video = final_video.without_audio()
+                self._log(f"✓ 视频音频同步完成，最终时长: {final_video.duration:.2f}s")
+                
+                # 步骤8: 导出视频
+                self.status_updated.emit("导出视频中...")
+                self._log("步骤8: 导出视频...")
+                self._log(f"正在导出到: {self.output_path}")
+                self._log("注意: 导出过程可能需要较长时间，请耐心等待...")
+                self._set_progress(95)
+                
+                # 根据视频长度调整导出参数
+                self._log("开始编码导出...")
+                
+                # 使用安全的导出函数
+                self._flush_log()  # 耗时操作前先把日志发出去
+                safe_write_videofile(
+                    final_video,
+                    self.output_path,
+                    fps=self.fps,
+                    preset=self.preset,
+                    crf=self.crf,
+                    threads=self.threads,
+                    audio_codec='aac',
+                    video_filters=video_filters,
+                    audio_path=self.audio_file,
+                    release_clips=None if use_segmented else clips,
+                    progress_callback=lambda done, total: self._set_progress(95 + 4 * done // max(1, total))
+                )
             
             step_times['导出视频'] = time_module.time() - step_start
-            self.log_updated.emit(f"✓ 视频导出完成 [耗时: {step_times['导出视频']:.1f}秒]")
+            self._log(f"✓ 视频导出完成 [耗时: {step_times['导出视频']:.1f}秒]")
             
             # 清理资源
-            self.log_updated.emit("正在清理资源...")
+            self._log("正在清理资源...")
             audio_clip.close()
-            final_video.close()
-            # 删除分段临时文件
+            if final_video is not None:
+                final_video.close()
+            # 关闭剩余片段，释放临时视频文件的读取进程，之后才能删除这些文件
+            for clip in clips:
+                if clip is not None:
+                    clip.close()
+            # 删除分段临时文件和并行渲染的临时目录
             if hasattr(self, 'temp_segment_files') and self.temp_segment_files:
                 for fp in self.temp_segment_files:
                     try:
-                        if os.path.exists(fp):
+                        if os.path.isdir(fp):
+                            shutil.rmtree(fp, ignore_errors=True)
+                        elif os.path.exists(fp):
                             os.remove(fp)
                     except Exception:
                         pass
-            self.log_updated.emit("✓ 资源清理完成")
-            
-            # 移动已处理的图片到指定文件夹
-            if self.processed_folder and os.path.exists(self.processed_folder):
-                self.move_processed_images()
-            
-            # 移动已处理的视频片段到指定文件夹
-            if self.processed_video_folder and os.path.exists(self.processed_video_folder):
-                self.move_processed_videos()
-            
-            # 计算总耗时
-            total_time = time_module.time() - start_time
-            
-            self.status_updated.emit("完成！")
-            self.progress_updated.emit(100)
-            self.log_updated.emit("=== 视频生成完成 ===")
-            self.log_updated.emit(f"完成时间: {time_module.strftime('%Y-%m-%d %H:%M:%S')}")
-            self.log_updated.emit(f"")
-            self.log_updated.emit(f"📊 耗时统计:")
-            for step_name, step_time in step_times.items():
-                percentage = (step_time / total_time) * 100 if total_time > 0 else 0
-                self.log_updated.emit(f"  • {step_name}: {step_time:.1f}秒 ({percentage:.1f}%)")
-            self.log_updated.emit(f"")
-            self.log_updated.emit(f"⏱️ 总耗时: {total_time:.1f}秒 ({total_time/60:.1f}分钟)")
-            if audio_duration > 0:
-                speed_ratio = audio_duration / total_time
-                self.log_updated.emit(f"⚡ 处理速度: {speed_ratio:.2f}x 实时速度")
-            self.generation_finished.emit(True, f"视频已成功保存到: {self.output_path}")
+            self._log("✓ 资源清理完成")
+            
+            self._finish_generation(start_time, step_times, audio_duration)
             
         except Exception as e:
-            self.log_updated.emit(f"✗ 生成失败: {str(e)}")
+            self._log(f"✗ 生成失败: {str(e)}")
             self.status_updated.emit("生成失败")
+            self._flush_log()
             self.generation_finished.emit(False, f"生成失败: {str(e)}")
         finally:
             # 恢复原始的stdout/stderr/stdin
             sys.stdout = original_stdout
             sys.stderr = original_stderr
             sys.stdin = original_stdin
+            # 发送剩余的日志
+            self._flush_log()
     
-    def process_single_video(self, clips, audio_clip, audio_duration):
-        """处理单个视频（非分段模式）"""
-        # 拼接视频片段
-        self.log_updated.emit("正在拼接视频片段...")
-        # 已统一分辨率时使用更快的 chain 方式
-        if self.resolution:
-            final_video = concatenate_videoclips(clips, method="chain")
+    def _finish_generation(self, start_time, step_times, audio_duration):
+        """移动已处理的素材并输出耗时统计"""
+        # 移动已处理的图片到指定文件夹
+        if self.processed_folder and os.path.exists(self.processed_folder):
+            self.move_processed_images()
+        
+        # 移动已处理的视频片段到指定文件夹
+        if self.processed_video_folder and os.path.exists(self.processed_video_folder):
+            self.move_processed_videos()
+        
+        # 计算总耗时
+        total_time = time.time() - start_time
+        
+        self.status_updated.emit("完成！")
+        self._set_progress(100)
+        self._log("=== 视频生成完成 ===")
+        self._log(f"完成时间: {time.strftime('%Y-%m-%d %H:%M:%S')}")
+        self._log(f"")
+        self._log(f"📊 耗时统计:")
+        for step_name, step_time in step_times.items():
+            percentage = (step_time / total_time) * 100 if total_time > 0 else 0
+            self._log(f"  • {step_name}: {step_time:.1f}秒 ({percentage:.1f}%)")
+        self._log(f"")
+        self._log(f"⏱️ 总耗时: {total_time:.1f}秒 ({total_time/60:.1f}分钟)")
+        if audio_duration > 0:
+            speed_ratio = audio_duration / total_time
+            self._log(f"⚡ 处理速度: {speed_ratio:.2f}x 实时速度")
+        self._flush_log()
+        self._last_succeeded = True
+        self.generation_finished.emit(True, f"视频已成功保存到: {self.output_path}")
+    
+    def render_plan_with_ffmpeg(self, plan, audio_duration):
+        """
+        用一条ffmpeg命令按规划渲染整个视频
+        
+        每张图片作为一个输入，经各自的缩放/平移/淡入淡出滤镜链后concat拼接，
+        与原音频一起直接编码为最终视频，不经过Python逐帧处理。成功返回True。
+        """
+        import tempfile
+        from animation_effects import ffmpeg_effect_input
+        
+        input_args = []
+        chains = []
+        labels = []
+        for n, (_, image_path, clip_duration, effect) in enumerate(plan):
+            try:
+                args, vf, _ = ffmpeg_effect_input(image_path, clip_duration, effect, self.animation_intensity,
+                                                  self.resolution, self.fps)
+            except Exception as e:
+                self._log(f"✗ 无法读取图片 {os.path.basename(image_path)}: {str(e)}")
+                return False
+            input_args.extend(args)
+            chains.append(f"[{n}:v]{vf}[v{n}]")
+            labels.append(f"[v{n}]")
+        # 末尾用最后一帧补足到音频长度（多留1秒余量），再由-t截断
+        pad_duration = max(0.0, audio_duration - sum(clip_duration for _, _, clip_duration, _ in plan)) + 1
+        chains.append(f"{''.join(labels)}concat=n={len(plan)}:v=1:a=0,{tpad_filter(pad_duration)}[v]")
+        
+        # 滤镜图可能很长，写入脚本文件避免超出命令行长度限制
+        fd, script_path = tempfile.mkstemp(prefix='filtergraph_', suffix='.txt')
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            f.write(';\n'.join(chains))
+        cmd = [
+            'ffmpeg', '-y', '-loglevel', 'error',
+            *input_args,
+            '-i', self.audio_file,
+            '-filter_complex_script', script_path,
+            '-map', '[v]', '-map', f'{len(plan)}:a',
+            '-c:v', 'libx264', '-preset', str(self.preset), '-crf', str(self.crf),
+            *x264_slideshow_params(self.fps, self.preset),
+            '-threads', str(int(self.threads)), '-pix_fmt', 'yuv420p', '-r', str(self.fps),
+            '-c:a', 'aac', '-b:a', '192k',
+            '-t', f"{audio_duration:.3f}",
+            '-movflags', MP4_MOVFLAGS,
+            '-progress', 'pipe:1', '-nostats',
+            self.output_path
+        ]
+        total_frames = max(1, int(audio_duration * self.fps))
+        
+        def read_progress():
+            # -progress输出形如 frame=123 的键值行，进度映射到30~99
+            for line in process.stdout:
+                if line.startswith(b'frame='):
+                    try:
+                        self._set_progress(30 + 69 * min(int(line[6:]), total_frames) // total_frames)
+                    except ValueError:
+                        pass
+        
+        try:
+            self.status_updated.emit("ffmpeg渲染导出视频中...")
+            self._flush_log()
+            process = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+            progress_reader = threading.Thread(target=read_progress, daemon=True)
+            progress_reader.start()
+            stderr = process.stderr.read()
+            process.wait()
+            progress_reader.join()
+        except OSError as e:
+            self._log(f"无法启动ffmpeg: {str(e)}")
+            return False
+        finally:
+            os.remove(script_path)
+        if process.returncode != 0:
+            self._log(f"ffmpeg错误: {stderr.decode('utf-8', errors='ignore')[-500:]}")
+            return False
+        return True
+    
+    def _plan_durations(self, count, budget):
+        """
+        一次性规划count张图片的时长，返回(期望时长列表, 实际时长列表)
+        
+        以整数帧为单位按顺序累加，直到总帧数达到budget对应的帧数为止，最后一张截断到剩余帧数；
+        实际时长都落在导出帧率的帧网格上，不会有浮点累加误差。
+        """
+        import numpy as np
+        
+        budget_frames = int(round(budget * self.fps))
+        if count <= 0 or budget_frames <= 0:
+            return [], []
+        if isinstance(self.image_duration, tuple):
+            desired = np.random.uniform(*self.image_duration, size=count)
         else:
-            final_video = concatenate_videoclips(clips)
+            desired = np.full(count, float(self.image_duration))
+        frames = np.rint(desired * self.fps).astype(np.int64)
+        if frames.min() <= 0:
+            # 不足一帧的时长之后的图片不再规划
+            frames = frames[:int(np.argmax(frames <= 0))]
+        if len(frames) == 0:
+            return [], []
+        
+        cumulative = np.cumsum(frames)
+        cutoff = int(np.searchsorted(cumulative, budget_frames))
+        frames = frames[:cutoff + 1]
+        if cutoff < len(cumulative):
+            frames[-1] = budget_frames - (cumulative[cutoff - 1] if cutoff else 0)
+        return desired[:len(frames)].tolist(), (frames / self.fps).tolist()
+    
+    def _plan_effects(self, count, candidates):
+        """一次性为count张图片选择动画效果，"随机效果"时从candidates中批量随机抽取"""
+        if self.animation_effect == "随机效果":
+            return random.choices(candidates, k=count)
+        return [self.animation_effect] * count
+    
+    def build_image_clips(self, plan, progress_range=None):
+        """
+        按规划创建图片片段
+        
+        plan为(序号, 图片路径, 时长, 效果)列表，返回与plan一一对应的片段列表（失败的为None）。
+        多张图片时使用进程池并行渲染为临时MP4（记录在temp_segment_files中，导出后删除），
+        并行失败时回退为逐张创建。
+        """
+        workers = min(len(plan), int(self.threads) if self.threads > 0 else (os.cpu_count() or 1))
+        if workers > 1:
+            specs = [(image_path, clip_duration, effect, self.animation_intensity, self.resolution)
+                     for _, image_path, clip_duration, effect in plan]
+            self.status_updated.emit(f"正在使用 {workers} 个进程并行处理 {len(plan)} 张图片...")
+            self._log(f"使用 {workers} 个进程并行创建 {len(plan)} 个图片片段")
+            try:
+                self._flush_log()
+                clips = create_animated_clips_batch(specs, processes=workers, fps=self.fps,
+                                                    defer_fade=self.defer_fades)
+            except Exception as e:
+                self._log(f"并行创建图片片段失败，改为逐张创建: {str(e)}")
+            else:
+                filenames = [clip.filename for clip in clips if clip is not None]
+                self.temp_segment_files.extend(filenames)
+                if filenames:
+                    # 临时文件所在的批量目录最后删除
+                    self.temp_segment_files.append(os.path.dirname(filenames[0]))
+                for (i, _, _, _), clip in zip(plan, clips):
+                    if clip is None:
+                        self._log(f"✗ 处理图片 {i+1} 失败")
+                if progress_range:
+                    self._set_progress(int(progress_range[1]))
+                return clips
+        
+        clips = []
+        if progress_range:
+            progress_start, progress_end = progress_range
+            progress_step = (progress_end - progress_start) / len(plan)
+        for n, (i, image_path, clip_duration, effect) in enumerate(plan):
+            # 更新状态：有进度范围时只在百分比变化时刷新状态文字
+            if progress_range:
+                progress = int(progress_start + n * progress_step)
+                if progress != self._last_progress or n == 0:
+                    self.status_updated.emit(f"正在处理第 {n+1} / {len(plan)} 张图片...")
+                self._set_progress(progress)
+            else:
+                self.status_updated.emit(f"正在处理第 {n+1} / {len(plan)} 张图片...")
+            try:
+                clips.append(create_animated_clip(
+                    image_path,
+                    clip_duration,
+                    effect,
+                    self.animation_intensity,
+                    self.resolution,
+                    fps=self.fps,
+                    defer_fade=self.defer_fades
+                ))
+            except Exception as e:
+                self._log(f"✗ 处理图片 {i+1} 失败: {str(e)}")
+                clips.append(None)
+        return clips
+    
+    def _rebuild_clip(self, clip, entry):
+        """按entry（序号, 图片路径, 时长, 效果）中的新时长重新创建图片片段，失败时保留原片段"""
+        i, _, duration, _ = entry
+        self._log(f"图片 {i+1} 接收失败图片的时长，重新创建为 {duration:.1f}s")
+        new_clip = self.build_image_clips([entry])[0]
+        if new_clip is None:
+            return clip
+        clip.close()
+        return new_clip
+    
+    def _concatenate(self, clips):
+        """
+        用chain方式拼接片段，避免逐帧合成
+        
+        片段尺寸不一致时（未指定分辨率），以最常见的尺寸为画布，其余片段保持比例缩放并补黑边。
+        """
+        from collections import Counter
+        from moviepy.editor import concatenate_videoclips
+        
+        sizes = Counter(tuple(clip.size) for clip in clips)
+        if len(sizes) > 1:
+            canvas_w, canvas_h = sizes.most_common(1)[0][0]
+            uniform = []
+            for clip in clips:
+                w, h = clip.size
+                if (w, h) != (canvas_w, canvas_h):
+                    scale = min(canvas_w / w, canvas_h / h)
+                    offset = ((canvas_w - int(w * scale)) // 2, (canvas_h - int(h * scale)) // 2)
+                    clip = clip.fl_image(scale_to_canvas((w, h), (canvas_w, canvas_h), scale, offset))
+                uniform.append(clip)
+            clips = uniform
+        return concatenate_videoclips(clips, method="chain")
+    
+    def process_single_video(self, clips, audio_clip, audio_duration, video_filters):
+        """处理单个视频（非分段模式），需要延长时把tpad滤镜追加到video_filters，由编码时完成"""
+        # 拼接视频片段
+        self._log("正在拼接视频片段...")
+        final_video = self._concatenate(clips)
         final_video_duration = final_video.duration
-        self.log_updated.emit(f"✓ 视频拼接完成，最终时长: {final_video_duration:.1f}s")
+        self._log(f"✓ 视频拼接完成，最终时长: {final_video_duration:.1f}s")
         
         # 精确同步视频到音频长度
         self.status_updated.emit("同步视频到音频长度...")
-        self.log_updated.emit("步骤7: 同步视频到音频长度...")
-        self.progress_updated.emit(90)
+        self._log("步骤7: 同步视频到音频长度...")
+        self._set_progress(90)
         
         # 将视频调整到与音频相同的长度
-        self.log_updated.emit("正在同步视频到音频长度...")
-        self.log_updated.emit(f"音频时长: {audio_clip.duration:.2f}s, 视频时长: {final_video_duration:.2f}s")
+        self._log("正在同步视频到音频长度...")
+        self._log(f"音频时长: {audio_clip.duration:.2f}s, 视频时长: {final_video_duration:.2f}s")
         
         # 处理音频和视频时长不匹配的情况
         if final_video_duration < audio_clip.duration:
             # 视频比音频短，需要延长视频
-            self.log_updated.emit(f"视频时长({final_video_duration:.2f}s)短于音频时长({audio_clip.duration:.2f}s)，将延长视频")
+            self._log(f"视频时长({final_video_duration:.2f}s)短于音频时长({audio_clip.duration:.2f}s)，将延长视频")
             
             # 计算需要延长的时长
             extend_duration = audio_clip.duration - final_video_duration
-            self.log_updated.emit(f"需要延长视频 {extend_duration:.2f}s")
-            
-            # 使用最后一帧延长视频
-            last_frame = final_video.subclip(final_video_duration - 0.1, final_video_duration)
-            extended_clip = last_frame.loop(duration=extend_duration)
+            self._log(f"需要延长视频 {extend_duration:.2f}s")
             
-            # 拼接原视频和延长部分
-            final_video = concatenate_videoclips([final_video, extended_clip])
-            final_video_duration = audio_clip.duration
-            self.log_updated.emit(f"✓ 视频延长完成，最终时长: {final_video_duration:.2f}s")
+            # 编码时由ffmpeg的tpad滤镜复制最后一帧延长，不在Python中逐帧生成
+            video_filters.append(tpad_filter(extend_duration))
+            self._log(f"✓ 将在编码时用最后一帧延长 {extend_duration:.2f}s")
             
         elif final_video_duration > audio_clip.duration:
             # 视频比音频长，需要缩短视频
-            self.log_updated.emit(f"视频时长({final_video_duration:.2f}s)超过音频时长({audio_clip.duration:.2f}s)，将缩短视频")
+            self._log(f"视频时长({final_video_duration:.2f}s)超过音频时长({audio_clip.duration:.2f}s)，将缩短视频")
             
             # 直接剪辑视频到音频长度
             final_video = final_video.subclip(0, audio_clip.duration)
             final_video_duration = audio_clip.duration
-            self.log_updated.emit(f"✓ 视频缩短完成，最终时长: {final_video_duration:.2f}s")
+            self._log(f"✓ 视频缩短完成，最终时长: {final_video_duration:.2f}s")
         
         return final_video
     
-    def process_segmented_video(self, clips, audio_clip, audio_duration, image_files):
-        """分段处理视频（节省内存）- 使用ffmpeg分割音频避免moviepy进程问题"""
-        self.log_updated.emit(f"开始分段处理，音频总时长: {audio_duration:.1f}s")
-        
-        # 步骤1: 先将完整音频导出为临时文件，避免后续subclip时进程失效
-        import tempfile
-        temp_full_audio = os.path.join(tempfile.gettempdir(), f"full_audio_{os.getpid()}.wav")
-        self.log_updated.emit("正在导出完整音频到临时文件...")
-        try:
-            audio_clip.write_audiofile(
-                temp_full_audio,
-                fps=44100,
-                nbytes=2,
-                codec='pcm_s16le',
-                logger=None,
-                verbose=False
-            )
-            self.log_updated.emit(f"✓ 完整音频已导出: {temp_full_audio}")
-        except Exception as e:
-            self.log_updated.emit(f"⚠️ 音频导出失败，将使用无音频模式: {str(e)}")
-            temp_full_audio = None
+    def process_segmented_video(self, clips, audio_duration, image_files):
+        """分段处理视频（节省内存）- 各段只导出视频，拼接时由ffmpeg一次性混入原音频文件"""
+        self._log(f"开始分段处理，音频总时长: {audio_duration:.1f}s")
         
         # 计算分段参数
         segment_duration = 300  # 每段5分钟
-        num_segments = int(audio_duration / segment_duration) + 1
-        self.log_updated.emit(f"将分为 {num_segments} 段处理，每段约 {segment_duration}s")
+        # 向上取整：音频时长恰为整段倍数时不会多出一个零时长的段落
+        num_segments = max(1, math.ceil(audio_duration / segment_duration))
+        self._log(f"将分为 {num_segments} 段处理，每段约 {segment_duration}s")
         
         # 临时目录用于保存分段视频
         temp_dir = os.path.join(os.path.dirname(self.output_path) or os.getcwd(), "_segments")
@@ -640,6 +1104,10 @@ class VideoGenerationWorker(QThread):
             # 回退到当前目录
             temp_dir = os.getcwd()
         
+        # 片段时间线的累计边界（首项为0），各段落按时间比例用二分查找截取
+        import numpy as np
+        clip_bounds = np.concatenate(([0.0], np.cumsum([clip.duration for clip in clips])))
+        
         temp_segment_paths = []
         
         for i in range(num_segments):
@@ -647,10 +1115,11 @@ class VideoGenerationWorker(QThread):
             end_time = min((i + 1) * segment_duration, audio_duration)
             segment_audio_duration = end_time - start_time
             
-            self.log_updated.emit(f"处理第 {i+1}/{num_segments} 段: {start_time:.1f}s - {end_time:.1f}s")
+            self._log(f"处理第 {i+1}/{num_segments} 段: {start_time:.1f}s - {end_time:.1f}s")
             
             # 为当前段落分配图片片段
-            segment_clips = self.allocate_clips_for_segment(clips, segment_audio_duration, i, num_segments)
+            segment_clips = self.allocate_clips_for_segment(clips, clip_bounds, start_time / audio_duration,
+                                                            end_time / audio_duration, i)
             
             # 处理当前段落的视频片段
             if self.enable_video_clips:
@@ -658,67 +1127,34 @@ class VideoGenerationWorker(QThread):
             
             # 拼接当前段落的视频
             if segment_clips:
-                if self.resolution:
-                    segment_video = concatenate_videoclips(segment_clips, method="chain")
-                else:
-                    segment_video = concatenate_videoclips(segment_clips)
+                segment_video = self._concatenate(segment_clips)
                 
                 # 同步到音频长度
+                ffmpeg_params = x264_slideshow_params(self.fps, self.preset)
                 if segment_video.duration < segment_audio_duration:
-                    # 延长视频
-                    extend_duration = segment_audio_duration - segment_video.duration
-                    last_frame = segment_video.subclip(segment_video.duration - 0.1, segment_video.duration)
-                    extended_clip = last_frame.loop(duration=extend_duration)
-                    segment_video = concatenate_videoclips([segment_video, extended_clip])
+                    # 延长视频：编码时用tpad复制最后一帧
+                    ffmpeg_params += ['-vf', tpad_filter(segment_audio_duration - segment_video.duration)]
                 elif segment_video.duration > segment_audio_duration:
                     # 缩短视频
                     segment_video = segment_video.subclip(0, segment_audio_duration)
                 
-                # 导出无音频视频，然后用ffmpeg添加音频
-                temp_video_no_audio = os.path.join(temp_dir, f"segment_{i+1:03d}_noaudio.mp4")
+                # 只导出视频：各段单独编码音频会在段落衔接处产生间隙并累积音画偏移
                 temp_path = os.path.join(temp_dir, f"segment_{i+1:03d}.mp4")
-                self.log_updated.emit(f"导出第 {i+1} 段视频...")
+                self._log(f"导出第 {i+1} 段视频...")
                 
-                # 先导出无音频视频
+                self._flush_log()
                 segment_video.write_videofile(
-                    temp_video_no_audio,
+                    temp_path,
                     fps=self.fps,
                     codec='libx264',
                     preset=self.preset,
+                    ffmpeg_params=ffmpeg_params,
                     audio=False,
                     logger=None,
                     verbose=False,
                     threads=self.threads
                 )
                 
-                # 使用ffmpeg从完整音频中提取对应时间段并合并
-                if temp_full_audio and os.path.exists(temp_full_audio):
-                    cmd = [
-                        'ffmpeg', '-y',
-                        '-i', temp_video_no_audio,
-                        '-ss', str(start_time),
-                        '-t', str(segment_audio_duration),
-                        '-i', temp_full_audio,
-                        '-c:v', 'copy',
-                        '-c:a', 'aac',
-                        '-b:a', '192k',
-                        '-shortest',
-                        temp_path
-                    ]
-                    result = subprocess.run(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
-                    if result.returncode != 0:
-                        self.log_updated.emit(f"⚠️ 音频合并失败，使用无音频版本")
-                        shutil.copy2(temp_video_no_audio, temp_path)
-                else:
-                    # 没有音频，直接复制
-                    shutil.copy2(temp_video_no_audio, temp_path)
-                
-                # 删除无音频临时文件
-                try:
-                    os.remove(temp_video_no_audio)
-                except:
-                    pass
-                
                 # 关闭释放内存
                 try:
                     segment_video.close()
@@ -728,9 +1164,9 @@ class VideoGenerationWorker(QThread):
                 temp_segment_paths.append(temp_path)
                 self.temp_segment_files.append(temp_path)
                 
-                self.log_updated.emit(f"✓ 第 {i+1} 段处理完成，时长: {segment_audio_duration:.1f}s")
+                self._log(f"✓ 第 {i+1} 段处理完成，时长: {segment_audio_duration:.1f}s")
             else:
-                self.log_updated.emit(f"⚠️ 第 {i+1} 段没有可用的视频片段")
+                self._log(f"⚠️ 第 {i+1} 段没有可用的视频片段")
             
             # 强制清理内存
             import gc
@@ -738,159 +1174,216 @@ class VideoGenerationWorker(QThread):
             
             # 更新进度
             progress = 85 + (i + 1) * 10 // num_segments
-            self.progress_updated.emit(progress)
-        
-        # 清理完整音频临时文件
-        if temp_full_audio and os.path.exists(temp_full_audio):
-            try:
-                os.remove(temp_full_audio)
-            except:
-                pass
+            self._set_progress(progress)
         
         # 拼接所有段落（基于磁盘文件，内存占用更低）
         if temp_segment_paths:
-            self.log_updated.emit("拼接所有段落(基于临时文件)...")
+            if self._concat_segments(temp_segment_paths):
+                self._log("✓ 分段处理完成，段落已直接拼接到输出文件")
+                return None
+            self._log("拼接所有段落(基于临时文件)...")
             from moviepy.editor import VideoFileClip
             concat_clips = []
             for p in temp_segment_paths:
                 try:
-                    concat_clips.append(VideoFileClip(p))
+                    concat_clips.append(VideoFileClip(p, audio=False))
                 except Exception as e:
-                    self.log_updated.emit(f"✗ 加载段落失败 {os.path.basename(p)}: {str(e)}")
+                    self._log(f"✗ 加载段落失败 {os.path.basename(p)}: {str(e)}")
             if concat_clips:
-                final_video = concatenate_videoclips(concat_clips, method="chain")
-                self.log_updated.emit(f"✓ 分段处理完成，最终时长: {final_video.duration:.1f}s")
+                final_video = self._concatenate(concat_clips)
+                self._log(f"✓ 分段处理完成，最终时长: {final_video.duration:.1f}s")
                 return final_video
             else:
-                self.log_updated.emit("✗ 无法加载任何段落视频")
-                return None
+                raise RuntimeError("无法加载任何段落视频")
         else:
-            self.log_updated.emit("✗ 分段处理失败，没有生成任何段落")
-            return None
+            raise RuntimeError("分段处理失败，没有生成任何段落")
     
-    def allocate_clips_for_segment(self, clips, segment_duration, segment_index, total_segments):
-        """为段落分配图片片段"""
-        if not clips:
-            return []
+    def _concat_segments(self, segment_paths):
+        """
+        用ffmpeg concat demuxer把段落视频流复制拼接到输出文件，同时混入完整的原音频
         
-        # 计算当前段落应该使用的图片数量
-        total_duration = sum(clip.duration for clip in clips)
-        if total_duration == 0:
-            return []
+        各段编码参数一致，视频无需解码和重新编码；音频整条只编码一次，段落衔接处没有间隙。
+        失败时返回False，由调用方回退到MoviePy拼接
+        """
+        import tempfile
         
-        # 按比例分配图片片段
-        segment_ratio = segment_duration / total_duration
-        num_clips = max(1, int(len(clips) * segment_ratio))
+        self._log("使用ffmpeg直接拼接所有段落（不重新编码）...")
+        fd, list_path = tempfile.mkstemp(prefix='concat_', suffix='.txt')
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            for path in segment_paths:
+                escaped = os.path.abspath(path).replace("'", "'\\''")
+                f.write(f"file '{escaped}'\n")
+        cmd = [
+            'ffmpeg', '-y', '-loglevel', 'error',
+            '-f', 'concat', '-safe', '0', '-i', list_path,
+            '-i', self.audio_file,
+            '-map', '0:v', '-map', '1:a',
+            '-c:v', 'copy',
+            '-c:a', 'aac', '-b:a', '192k',
+            '-shortest',
+            '-movflags', MP4_MOVFLAGS,
+            self.output_path
+        ]
+        try:
+            self._flush_log()
+            result = subprocess.run(cmd, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE)
+        except OSError as e:
+            self._log(f"⚠️ 无法启动ffmpeg，改用MoviePy拼接: {str(e)}")
+            return False
+        finally:
+            os.remove(list_path)
+        if result.returncode != 0:
+            self._log(f"⚠️ ffmpeg拼接失败，改用MoviePy拼接: "
+                      f"{result.stderr.decode('utf-8', errors='ignore')[-500:]}")
+            return False
+        return True
+    
+    def allocate_clips_for_segment(self, clips, clip_bounds, start_ratio, end_ratio, segment_index):
+        """
+        为段落分配图片片段
         
-        # 选择图片片段
-        start_index = segment_index * num_clips
-        end_index = min(start_index + num_clips, len(clips))
+        clip_bounds为片段时间线的累计边界（长度为片段数+1，首项为0），
+        段落占音频的[start_ratio, end_ratio)比例，分配起点落在对应时间范围内的片段。
+        """
+        import numpy as np
+        
+        total_duration = clip_bounds[-1] if len(clip_bounds) else 0
+        if not clips or total_duration <= 0:
+            return []
+        
+        # 按时间比例换算到片段时间线，二分查找起点落在范围内的片段
+        start_index, end_index = np.searchsorted(clip_bounds[:-1],
+                                                 [start_ratio * total_duration, end_ratio * total_duration])
+        if start_index == end_index:
+            # 单个片段跨越整个段落时，使用覆盖段落起点的片段
+            start_index = min(int(np.searchsorted(clip_bounds, start_ratio * total_duration, side='right')) - 1,
+                              len(clips) - 1)
+            end_index = start_index + 1
         segment_clips = clips[start_index:end_index]
         
-        self.log_updated.emit(f"段落 {segment_index + 1}: 分配了 {len(segment_clips)} 个图片片段")
+        self._log(f"段落 {segment_index + 1}: 分配了 {len(segment_clips)} 个图片片段")
         return segment_clips
     
     def move_processed_images(self):
         """移动已处理的图片到已处理文件夹"""
         try:
-            self.log_updated.emit("步骤8: 移动已处理图片...")
+            self._log("步骤8: 移动已处理图片...")
             self.status_updated.emit("移动已处理图片...")
             
             # 只移动实际处理的图片
             processed_images = self.actually_processed_images
             
             if not processed_images:
-                self.log_updated.emit("没有找到需要移动的已处理图片文件")
+                self._log("没有找到需要移动的已处理图片文件")
                 return
             
             # 确保已处理文件夹存在
             if not os.path.exists(self.processed_folder):
                 os.makedirs(self.processed_folder)
-                self.log_updated.emit(f"创建已处理文件夹: {self.processed_folder}")
+                self._log(f"创建已处理文件夹: {self.processed_folder}")
             
-            moved_count = 0
-            for image_path in processed_images:
-                try:
-                    filename = os.path.basename(image_path)
-                    destination = os.path.join(self.processed_folder, filename)
-                    
-                    # 如果目标文件已存在，添加时间戳
-                    if os.path.exists(destination):
-                        name, ext = os.path.splitext(filename)
-                        timestamp = int(time.time())
-                        filename = f"{name}_{timestamp}{ext}"
-                        destination = os.path.join(self.processed_folder, filename)
-                    
-                    # 移动文件
-                    shutil.move(image_path, destination)
-                    moved_count += 1
-                    self.log_updated.emit(f"✓ 已移动: {filename}")
-                    
-                except Exception as e:
-                    self.log_updated.emit(f"✗ 移动失败 {os.path.basename(image_path)}: {str(e)}")
-                    continue
+            moved_count = self._move_files(processed_images, self.processed_folder)
             
-            self.log_updated.emit(f"✓ 已移动 {moved_count} 张已处理的图片到已处理文件夹")
-            self.log_updated.emit(f"总共处理了 {len(self.actually_processed_images)} 张图片，移动了 {moved_count} 张")
+            self._log(f"✓ 已移动 {moved_count} 张已处理的图片到已处理文件夹")
+            self._log(f"总共处理了 {len(self.actually_processed_images)} 张图片，移动了 {moved_count} 张")
             
         except Exception as e:
-            self.log_updated.emit(f"✗ 移动已处理图片失败: {str(e)}")
+            self._log(f"✗ 移动已处理图片失败: {str(e)}")
     
     def move_processed_videos(self):
         """移动已处理的视频片段到已处理视频片段文件夹"""
         try:
-            self.log_updated.emit("步骤9: 移动已处理视频片段...")
+            self._log("步骤9: 移动已处理视频片段...")
             self.status_updated.emit("移动已处理视频片段...")
             
             # 只移动实际处理的视频片段
             processed_videos = self.actually_processed_videos
             
             if not processed_videos:
-                self.log_updated.emit("没有找到需要移动的已处理视频片段文件")
+                self._log("没有找到需要移动的已处理视频片段文件")
                 return
             
             # 确保已处理视频片段文件夹存在
             if not os.path.exists(self.processed_video_folder):
                 os.makedirs(self.processed_video_folder)
-                self.log_updated.emit(f"创建已处理视频片段文件夹: {self.processed_video_folder}")
+                self._log(f"创建已处理视频片段文件夹: {self.processed_video_folder}")
             
-            moved_count = 0
-            for video_path in processed_videos:
-                try:
-                    filename = os.path.basename(video_path)
-                    destination = os.path.join(self.processed_video_folder, filename)
-                    
-                    # 如果目标文件已存在，添加时间戳
-                    if os.path.exists(destination):
-                        name, ext = os.path.splitext(filename)
-                        timestamp = int(time.time())
-                        filename = f"{name}_{timestamp}{ext}"
-                        destination = os.path.join(self.processed_video_folder, filename)
-                    
-                    # 移动文件
-                    shutil.move(video_path, destination)
-                    moved_count += 1
-                    self.log_updated.emit(f"✓ 已移动: {filename}")
-                    
-                except Exception as e:
-                    self.log_updated.emit(f"✗ 移动失败 {os.path.basename(video_path)}: {str(e)}")
-                    continue
+            moved_count = self._move_files(processed_videos, self.processed_video_folder)
             
-            self.log_updated.emit(f"✓ 已移动 {moved_count} 个已处理的视频片段到已处理视频片段文件夹")
-            self.log_updated.emit(f"总共处理了 {len(self.actually_processed_videos)} 个视频片段，移动了 {moved_count} 个")
+            self._log(f"✓ 已移动 {moved_count} 个已处理的视频片段到已处理视频片段文件夹")
+            self._log(f"总共处理了 {len(self.actually_processed_videos)} 个视频片段，移动了 {moved_count} 个")
             
         except Exception as e:
-            self.log_updated.emit(f"✗ 移动已处理视频片段失败: {str(e)}")
+            self._log(f"✗ 移动已处理视频片段失败: {str(e)}")
+    
+    def _move_files(self, paths, dest_folder):
+        """
+        把文件移动到dest_folder（重名时加时间戳），返回成功移动的数量
+        
+        与目标在同一文件系统时直接重命名，不复制数据；跨设备时复制是IO密集操作，用线程池并发执行。
+        """
+        from concurrent.futures import ThreadPoolExecutor
+        
+        jobs = []
+        for path in paths:
+            filename = os.path.basename(path)
+            destination = os.path.join(dest_folder, filename)
+            
+            # 如果目标文件已存在，添加时间戳（os.replace在非Windows系统上会直接覆盖，不能依赖异常）
+            if os.path.exists(destination):
+                name, ext = os.path.splitext(filename)
+                timestamp = int(time.time())
+                filename = f"{name}_{timestamp}{ext}"
+                destination = os.path.join(dest_folder, filename)
+            jobs.append((path, destination))
+        
+        def device(path):
+            try:
+                return os.stat(path).st_dev
+            except OSError:
+                return None
+        
+        # 按来源文件夹判断一次是否与目标在同一设备
+        dest_dev = device(dest_folder)
+        same_device = {folder: dest_dev is not None and device(folder) == dest_dev
+                       for folder in {os.path.dirname(src) for src, _ in jobs}}
+        
+        def move(job):
+            src, dst = job
+            try:
+                if same_device[os.path.dirname(src)]:
+                    os.replace(src, dst)
+                else:
+                    shutil.move(src, dst)
+                return None
+            except Exception as e:
+                return e
+        
+        # 同设备重命名很快，直接逐个执行；否则并发复制
+        if all(same_device.values()) or len(jobs) <= 1:
+            results = map(move, jobs)
+        else:
+            with ThreadPoolExecutor(max_workers=8) as executor:
+                results = list(executor.map(move, jobs))
+        
+        moved_count = 0
+        for (src, dst), error in zip(jobs, results):
+            if error is None:
+                moved_count += 1
+                self._log(f"✓ 已移动: {os.path.basename(dst)}")
+            else:
+                self._log(f"✗ 移动失败 {os.path.basename(src)}: {str(error)}")
+        return moved_count
     
     def get_video_clips(self):
         """获取视频片段文件列表"""
         if not self.enable_video_clips or not self.video_clip_folder or not os.path.exists(self.video_clip_folder):
             return []
         
-        video_clips = []
-        for file in os.listdir(self.video_clip_folder):
-            if any(file.lower().endswith(ext) for ext in self.video_extensions):
-                video_clips.append(os.path.join(self.video_clip_folder, file))
+        with os.scandir(self.video_clip_folder) as entries:
+            video_clips = [entry.path for entry in entries
+                           if os.path.splitext(entry.name)[1].lower() in self.video_extensions
+                           and entry.is_file()]
         
         # 随机选择指定数量的视频片段
         if len(video_clips) > self.video_clip_count:
@@ -905,22 +1398,22 @@ class VideoGenerationWorker(QThread):
         
         video_clips = self.get_video_clips()
         if not video_clips:
-            self.log_updated.emit("没有找到可用的视频片段")
+            self._log("没有找到可用的视频片段")
             return clips
         
-        self.log_updated.emit(f"找到 {len(video_clips)} 个视频片段，准备插入")
+        self._log(f"找到 {len(video_clips)} 个视频片段，准备插入")
         
         # 显示系统内存信息
         memory_info = psutil.virtual_memory()
-        self.log_updated.emit(f"系统内存信息: 总计 {memory_info.total // (1024**3)}GB, 可用 {memory_info.available // (1024**3)}GB, 使用率 {memory_info.percent:.1f}%")
+        self._log(f"系统内存信息: 总计 {memory_info.total // (1024**3)}GB, 可用 {memory_info.available // (1024**3)}GB, 使用率 {memory_info.percent:.1f}%")
         
         try:
-            from moviepy.editor import VideoFileClip, concatenate_videoclips
+            from moviepy.editor import VideoFileClip
             import gc
             import ctypes
             
             # 第一步：获取音频时长
-            self.log_updated.emit(f"音频时长: {audio_duration:.1f}s")
+            self._log(f"音频时长: {audio_duration:.1f}s")
             
             # 强制内存释放函数
             def force_memory_cleanup():
@@ -940,7 +1433,7 @@ class VideoGenerationWorker(QThread):
                     memory_percent = psutil.virtual_memory().percent
                     return memory_percent
                 except Exception as e:
-                    self.log_updated.emit(f"内存清理失败: {str(e)}")
+                    self._log(f"内存清理失败: {str(e)}")
                     return psutil.virtual_memory().percent
             
             # 第二步：分批处理视频片段，避免内存溢出
@@ -949,14 +1442,14 @@ class VideoGenerationWorker(QThread):
             
             # 根据视频片段数量和内存使用情况动态调整批次大小
             current_memory = force_memory_cleanup()
-            self.log_updated.emit(f"初始内存使用率: {current_memory:.1f}%")
+            self._log(f"初始内存使用率: {current_memory:.1f}%")
             
             if current_memory > 95:
                 batch_size = 1  # 内存严重不足时一次只处理1个
-                self.log_updated.emit("内存严重不足，使用最小批次大小")
+                self._log("内存严重不足，使用最小批次大小")
             elif current_memory > 90:
                 batch_size = 1  # 内存不足时一次只处理1个
-                self.log_updated.emit("内存不足，使用最小批次大小")
+                self._log("内存不足，使用最小批次大小")
             elif current_memory > 80:
                 batch_size = 2  # 内存较高时一次处理2个
             elif len(video_clips) <= 10:
@@ -971,29 +1464,35 @@ class VideoGenerationWorker(QThread):
                 current_memory = force_memory_cleanup()
                 if current_memory > 95:
                     batch_size = 1
-                    self.log_updated.emit("内存使用率过高，强制使用最小批次大小")
+                    self._log("内存使用率过高，强制使用最小批次大小")
                 elif current_memory > 90:
                     batch_size = 2
-                    self.log_updated.emit("内存使用率较高，使用小批次大小")
+                    self._log("内存使用率较高，使用小批次大小")
                 
                 batch_videos = video_clips[i:i+batch_size]
-                self.log_updated.emit(f"处理视频片段批次 {i//batch_size + 1}/{(len(video_clips)-1)//batch_size + 1} ({len(batch_videos)} 个，内存使用率: {current_memory:.1f}%)")
+                self._log(f"处理视频片段批次 {i//batch_size + 1}/{(len(video_clips)-1)//batch_size + 1} ({len(batch_videos)} 个，内存使用率: {current_memory:.1f}%)")
                 
                 for video_path in batch_videos:
                     try:
                         # 检查内存使用情况
                         memory_percent = force_memory_cleanup()
                         if memory_percent > 98:
-                            self.log_updated.emit(f"⚠️ 内存使用率过高 ({memory_percent:.1f}%)，跳过当前视频片段")
+                            self._log(f"⚠️ 内存使用率过高 ({memory_percent:.1f}%)，跳过当前视频片段")
                             continue
                         elif memory_percent > 95:
-                            self.log_updated.emit(f"⚠️ 内存使用率较高 ({memory_percent:.1f}%)，建议减少视频片段数量")
+                            self._log(f"⚠️ 内存使用率较高 ({memory_percent:.1f}%)，建议减少视频片段数量")
                         
-                        video_clip = VideoFileClip(video_path)
-                        video_clip = video_clip.without_audio()
+                        # 只根据时长决定截取方式，片段在组装最终序列时才真正打开
+                        try:
+                            original_duration = probe_media(video_path)[0]
+                        except (OSError, subprocess.CalledProcessError, ValueError):
+                            # ffprobe不可用时打开片段读取时长
+                            probe_clip = VideoFileClip(video_path, audio=False)
+                            original_duration = probe_clip.duration
+                            probe_clip.close()
                         
                         # 智能调整视频片段时长以适应音频
-                        original_duration = video_clip.duration
+                        start_time = 0.0
                         
                         # 根据音频时长和视频片段数量动态调整最大时长
                         estimated_video_count = len(video_clips)
@@ -1002,86 +1501,75 @@ class VideoGenerationWorker(QThread):
                         
                         if original_duration > max_allowed_duration:
                             start_time = (original_duration - max_allowed_duration) / 2
-                            video_clip = video_clip.subclip(start_time, start_time + max_allowed_duration)
                             actual_duration = max_allowed_duration
-                            self.log_updated.emit(f"视频片段过长，从中间截取: {os.path.basename(video_path)} ({original_duration:.1f}s -> {actual_duration:.1f}s)")
+                            self._log(f"视频片段过长，从中间截取: {os.path.basename(video_path)} ({original_duration:.1f}s -> {actual_duration:.1f}s)")
                         elif original_duration < min_allowed_duration:
-                            loops_needed = int(min_allowed_duration / original_duration) + 1
-                            video_clips_loop = [video_clip] * loops_needed
-                            video_clip = concatenate_videoclips(video_clips_loop).subclip(0, min_allowed_duration)
                             actual_duration = min_allowed_duration
-                            self.log_updated.emit(f"视频片段过短，循环播放: {os.path.basename(video_path)} ({original_duration:.1f}s -> {actual_duration:.1f}s)")
+                            self._log(f"视频片段过短，循环播放: {os.path.basename(video_path)} ({original_duration:.1f}s -> {actual_duration:.1f}s)")
                         else:
                             actual_duration = original_duration
-                            self.log_updated.emit(f"视频片段时长合适: {os.path.basename(video_path)} ({actual_duration:.1f}s)")
+                            self._log(f"视频片段时长合适: {os.path.basename(video_path)} ({actual_duration:.1f}s)")
                         
                         video_clip_data.append({
-                            'clip': video_clip,
+                            'start': start_time,
                             'duration': actual_duration,
+                            'source_duration': original_duration,
                             'path': video_path
                         })
                         total_video_duration += actual_duration
                         
                     except Exception as e:
-                        self.log_updated.emit(f"✗ 加载视频片段失败 {os.path.basename(video_path)}: {str(e)}")
+                        self._log(f"✗ 加载视频片段失败 {os.path.basename(video_path)}: {str(e)}")
                         continue
                 
                 # 每批处理完后强制清理内存
                 current_memory = force_memory_cleanup()
-                self.log_updated.emit(f"批次处理完成，当前内存使用率: {current_memory:.1f}%")
+                self._log(f"批次处理完成，当前内存使用率: {current_memory:.1f}%")
                 
                 # 如果内存使用率仍然很高，进行深度清理
                 if current_memory > 90:
-                    self.log_updated.emit("内存使用率较高，进行深度清理...")
-                    # 清理已处理的视频片段
-                    for data in video_clip_data:
-                        if 'clip' in data:
-                            try:
-                                data['clip'].close()
-                            except:
-                                pass
+                    self._log("内存使用率较高，进行深度清理...")
                     # 再次强制清理
                     force_memory_cleanup()
             
             if not video_clip_data:
-                self.log_updated.emit("没有成功加载任何视频片段")
+                self._log("没有成功加载任何视频片段")
                 # 如果内存不足导致无法加载视频片段，建议用户减少视频片段数量
                 current_memory = force_memory_cleanup()
                 if current_memory > 90:
-                    self.log_updated.emit("建议：内存不足，请减少视频片段数量或关闭其他程序")
-                    self.log_updated.emit("当前系统内存使用率过高，建议：")
-                    self.log_updated.emit("1. 关闭其他占用内存的程序")
-                    self.log_updated.emit("2. 减少视频片段数量")
-                    self.log_updated.emit("3. 检查是否有内存泄漏")
+                    self._log("建议：内存不足，请减少视频片段数量或关闭其他程序")
+                    self._log("当前系统内存使用率过高，建议：")
+                    self._log("1. 关闭其他占用内存的程序")
+                    self._log("2. 减少视频片段数量")
+                    self._log("3. 检查是否有内存泄漏")
                 return clips
             
-            self.log_updated.emit(f"视频片段总时长: {total_video_duration:.1f}s")
+            self._log(f"视频片段总时长: {total_video_duration:.1f}s")
             
             # 第三步：智能分配时间
             # 如果视频片段总时长超过音频的80%，则按比例缩短所有视频片段
             if total_video_duration > audio_duration * 0.8:
                 scale_factor = (audio_duration * 0.8) / total_video_duration
-                self.log_updated.emit(f"视频片段总时长({total_video_duration:.1f}s)过长，按比例缩短到 {audio_duration * 0.8:.1f}s")
+                self._log(f"视频片段总时长({total_video_duration:.1f}s)过长，按比例缩短到 {audio_duration * 0.8:.1f}s")
                 
                 # 重新计算所有视频片段的时长
                 total_video_duration = 0
                 for data in video_clip_data:
                     new_duration = data['duration'] * scale_factor
                     data['duration'] = new_duration
-                    data['clip'] = data['clip'].subclip(0, new_duration)
                     total_video_duration += new_duration
-                    self.log_updated.emit(f"缩短视频片段: {os.path.basename(data['path'])} -> {new_duration:.1f}s")
+                    self._log(f"缩短视频片段: {os.path.basename(data['path'])} -> {new_duration:.1f}s")
             
             remaining_time = audio_duration - total_video_duration
-            self.log_updated.emit(f"剩余时间给图片: {remaining_time:.1f}s")
+            self._log(f"剩余时间给图片: {remaining_time:.1f}s")
             
             if remaining_time <= 0:
-                self.log_updated.emit(f"警告: 视频片段总时长({total_video_duration:.1f}s)超过音频时长({audio_duration:.1f}s)")
+                self._log(f"警告: 视频片段总时长({total_video_duration:.1f}s)超过音频时长({audio_duration:.1f}s)")
                 remaining_time = audio_duration * 0.1
-                self.log_updated.emit(f"调整后剩余时间: {remaining_time:.1f}s")
+                self._log(f"调整后剩余时间: {remaining_time:.1f}s")
             
             # 第四步：根据剩余时间重新生成图片片段
-            self.log_updated.emit(f"使用剩余时长 {remaining_time:.1f}s 重新生成图片片段")
+            self._log(f"使用剩余时长 {remaining_time:.1f}s 重新生成图片片段")
             
             # 清空现有图片片段
             clips = []
@@ -1092,72 +1580,38 @@ class VideoGenerationWorker(QThread):
             else:
                 dmin = dmax = float(self.image_duration)
             
-            self.log_updated.emit(f"图片时长范围: {dmin}-{dmax}s, 剩余时间: {remaining_time:.1f}s")
+            self._log(f"图片时长范围: {dmin}-{dmax}s, 剩余时间: {remaining_time:.1f}s")
             
             # 计算能放多少张图片
             if dmin <= 0:
-                self.log_updated.emit(f"错误: 图片最小时长({dmin})必须大于0")
+                self._log(f"错误: 图片最小时长({dmin})必须大于0")
                 max_images = 0
             else:
                 max_images = int(remaining_time / dmin)
-                self.log_updated.emit(f"最多可放: {max_images}张图片")
+                self._log(f"最多可放: {max_images}张图片")
             
             if max_images > 0 and len(image_files) > 0:
-                # 重新生成图片片段，使用剩余时间
-                current_time = 0.0
-                for i in range(min(max_images, len(image_files))):
-                    # 计算当前片段时长
-                    remaining_for_this_image = remaining_time - current_time
-                    if remaining_for_this_image <= 0:
-                        break
-                    
-                    # 在范围内随机，但不超过剩余时间
-                    if isinstance(self.image_duration, tuple):
-                        rnd = random.random()
-                        desired = dmin + (dmax - dmin) * rnd
-                    else:
-                        desired = float(self.image_duration)
-                    
-                    self.log_updated.emit(f"计算图片片段{i+1}: desired={desired:.1f}s, remaining={remaining_for_this_image:.1f}s")
-                    
-                    if desired <= 0 or remaining_for_this_image <= 0:
-                        self.log_updated.emit(f"跳过图片片段{i+1}: desired={desired:.1f}s, remaining={remaining_for_this_image:.1f}s")
-                        break
-                    
-                    clip_duration = min(desired, remaining_for_this_image)
-                    
-                    if clip_duration <= 0:
-                        break
-                    
-                    try:
-                        # 选择动画效果
-                        effect = self.animation_effect
-                        if effect == "随机效果":
-                            effects = ['Slow Zoom In', 'Slow Zoom Out', 'Pan Left to Right', 'Pan Right to Left']
-                            effect = random.choice(effects)
-                        
-                        # 创建图片片段
-                        clip = create_animated_clip(
-                            image_files[i], 
-                            clip_duration, 
-                            effect, 
-                            self.animation_intensity,
-                            self.resolution
-                        )
-                        
-                        clips.append(clip)
-                        current_time += clip_duration
-                        self.log_updated.emit(f"重新生成图片片段{i+1}: {os.path.basename(image_files[i])}, 时长={clip_duration:.1f}s")
-                        
-                    except Exception as e:
-                        self.log_updated.emit(f"重新生成图片片段失败 {os.path.basename(image_files[i])}: {str(e)}")
-                        break
+                # 重新规划图片片段，使用剩余时间
+                plan = []
+                desired_durations, durations = self._plan_durations(min(max_images, len(image_files)), remaining_time)
+                effects = self._plan_effects(len(durations), ['Slow Zoom In', 'Slow Zoom Out',
+                                                              'Pan Left to Right', 'Pan Right to Left'])
+                for i, (desired, clip_duration, effect) in enumerate(zip(desired_durations, durations, effects)):
+                    self._log(f"计算图片片段{i+1}: desired={desired:.1f}s, 实际={clip_duration:.1f}s")
+                    plan.append((i, image_files[i], clip_duration, effect))
+                
+                # 创建图片片段
+                for (i, image_path, clip_duration, effect), clip in zip(plan, self.build_image_clips(plan)):
+                    if clip is None:
+                        continue
+                    clips.append(clip)
+                    self._log(f"重新生成图片片段{i+1}: {os.path.basename(image_path)}, 时长={clip_duration:.1f}s")
                 
                 # 验证重新生成后的总时长
                 total_image_duration = sum(clip.duration for clip in clips)
-                self.log_updated.emit(f"重新生成后图片片段总时长: {total_image_duration:.1f}s")
+                self._log(f"重新生成后图片片段总时长: {total_image_duration:.1f}s")
             else:
-                self.log_updated.emit(f"剩余时间不足，无法生成图片片段")
+                self._log(f"剩余时间不足，无法生成图片片段")
             
             # 第六步：创建最终视频序列 - 随机穿插图片和视频片段
             final_clips = []
@@ -1167,7 +1621,7 @@ class VideoGenerationWorker(QThread):
             
             # 确保clips不为空
             if not clips:
-                self.log_updated.emit("警告: 没有图片片段，无法创建视频")
+                self._log("警告: 没有图片片段，无法创建视频")
                 return []
             
             # 添加图片片段
@@ -1182,7 +1636,7 @@ class VideoGenerationWorker(QThread):
             # 添加视频片段
             for i, data in enumerate(video_clip_data):
                 try:
-                    video_clip = data['clip']
+                    video_clip = self._open_video_clip(data)
                     if self.resolution:
                         video_clip = self._adjust_video_clip_resolution(video_clip)
                     
@@ -1197,31 +1651,42 @@ class VideoGenerationWorker(QThread):
                     })
                     
                 except Exception as e:
-                    self.log_updated.emit(f"✗ 处理视频片段失败 {os.path.basename(data['path'])}: {str(e)}")
+                    self._log(f"✗ 处理视频片段失败 {os.path.basename(data['path'])}: {str(e)}")
             
             # 随机打乱片段顺序
             random.shuffle(all_segments)
-            self.log_updated.emit(f"随机打乱片段顺序，共 {len(all_segments)} 个片段")
+            self._log(f"随机打乱片段顺序，共 {len(all_segments)} 个片段")
             
             # 按顺序添加所有片段
             for i, segment in enumerate(all_segments):
                 final_clips.append(segment['clip'])
-                self.log_updated.emit(f"✓ 添加{segment['name']}: 时长={segment['duration']:.1f}s")
+                self._log(f"✓ 添加{segment['name']}: 时长={segment['duration']:.1f}s")
             
             # 计算最终总时长
             total_duration = sum(clip.duration for clip in final_clips)
-            self.log_updated.emit(f"最终视频总时长: {total_duration:.1f}s (目标音频时长: {audio_duration:.1f}s)")
+            self._log(f"最终视频总时长: {total_duration:.1f}s (目标音频时长: {audio_duration:.1f}s)")
             
             if abs(total_duration - audio_duration) > 0.1:
-                self.log_updated.emit(f"警告: 视频时长({total_duration:.1f}s)与音频时长({audio_duration:.1f}s)不匹配！")
+                self._log(f"警告: 视频时长({total_duration:.1f}s)与音频时长({audio_duration:.1f}s)不匹配！")
             
             return final_clips
             
         except Exception as e:
-            self.log_updated.emit(f"✗ 视频片段插入失败: {str(e)}")
+            self._log(f"✗ 视频片段插入失败: {str(e)}")
             # 如果视频片段插入失败，返回原始clips
             return clips
     
+    def _open_video_clip(self, data):
+        """按insert_video_clips确定的起点和时长打开视频片段，过短的片段循环播放补足"""
+        from moviepy.editor import VideoFileClip, concatenate_videoclips
+        
+        video_clip = VideoFileClip(data['path'], audio=False)
+        if data['duration'] > data['source_duration']:
+            loops_needed = int(data['duration'] / data['source_duration']) + 1
+            return concatenate_videoclips([video_clip] * loops_needed).subclip(0, data['duration'])
+        # ffprobe与MoviePy读到的时长可能略有差异，终点不超过片段实际时长
+        return video_clip.subclip(data['start'], min(data['start'] + data['duration'], video_clip.duration))
+    
     def _adjust_video_clip_resolution(self, video_clip):
         """调整视频片段分辨率"""
         if not self.resolution:
@@ -1232,14 +1697,14 @@ class VideoGenerationWorker(QThread):
         
         # 如果尺寸已经匹配，无需调整
         if original_width == target_width and original_height == target_height:
-            self.log_updated.emit(f"视频片段尺寸已匹配: {original_width}x{original_height}")
+            self._log(f"视频片段尺寸已匹配: {original_width}x{original_height}")
             return video_clip
         
         # 根据缩放模式处理
         if self.video_clip_scale_mode == "stretch":
             # 拉伸模式：强制调整到目标尺寸（可能变形）
-            video_clip = video_clip.resize((target_width, target_height))
-            self.log_updated.emit(f"拉伸视频片段: {original_width}x{original_height} -> {target_width}x{target_height}")
+            video_clip = video_clip.fl_image(lambda frame: resize_frame(frame, (target_width, target_height)))
+            self._log(f"拉伸视频片段: {original_width}x{original_height} -> {target_width}x{target_height}")
             
         elif self.video_clip_scale_mode == "fit":
             # 适应模式：保持比例，添加黑边
@@ -1250,23 +1715,14 @@ class VideoGenerationWorker(QThread):
             new_width = int(original_width * scale_ratio)
             new_height = int(original_height * scale_ratio)
             
-            # 缩放到合适尺寸
-            video_clip = video_clip.resize((new_width, new_height))
-            
-            # 如果尺寸不匹配，添加黑边
-            if new_width != target_width or new_height != target_height:
-                # 创建黑色背景
-                from moviepy.editor import ColorClip, CompositeVideoClip
-                background = ColorClip(size=(target_width, target_height), color=(0, 0, 0), duration=video_clip.duration)
-                
-                # 计算居中位置
-                x_offset = (target_width - new_width) // 2
-                y_offset = (target_height - new_height) // 2
-                
-                # 将视频片段合成到背景上
-                video_clip = CompositeVideoClip([background, video_clip.set_position((x_offset, y_offset))])
+            # 缩放和居中补黑边在同一次帧变换中完成
+            x_offset = (target_width - new_width) // 2
+            y_offset = (target_height - new_height) // 2
+            video_clip = video_clip.fl_image(scale_to_canvas(
+                (original_width, original_height), (target_width, target_height),
+                scale_ratio, (x_offset, y_offset)))
             
-            self.log_updated.emit(f"适应模式调整: {original_width}x{original_height} -> {target_width}x{target_height} (保持比例)")
+            self._log(f"适应模式调整: {original_width}x{original_height} -> {target_width}x{target_height} (保持比例)")
             
         else:  # crop 模式（默认）
             # 裁剪模式：保持比例，居中裁剪
@@ -1277,33 +1733,147 @@ class VideoGenerationWorker(QThread):
             new_width = int(original_width * scale_ratio)
             new_height = int(original_height * scale_ratio)
             
-            # 先缩放到合适尺寸
-            video_clip = video_clip.resize((new_width, new_height))
-            
-            # 居中裁剪到目标尺寸
-            x_center = new_width // 2
-            y_center = new_height // 2
-            x1 = x_center - target_width // 2
-            y1 = y_center - target_height // 2
-            x2 = x1 + target_width
-            y2 = y1 + target_height
+            # 居中裁剪到目标尺寸，缩放和裁剪在同一次帧变换中完成，全程uint8
+            x1 = new_width // 2 - target_width // 2
+            y1 = new_height // 2 - target_height // 2
+            video_clip = video_clip.fl_image(scale_to_canvas(
+                (original_width, original_height), (target_width, target_height),
+                scale_ratio, (-x1, -y1)))
             
-            video_clip = video_clip.crop(x1=x1, y1=y1, x2=x2, y2=y2)
-            
-            self.log_updated.emit(f"裁剪模式调整: {original_width}x{original_height} -> {target_width}x{target_height} (保持比例)")
+            self._log(f"裁剪模式调整: {original_width}x{original_height} -> {target_width}x{target_height} (保持比例)")
         
         return video_clip
     
     def stop(self):
         """停止线程"""
         self._is_running = False
+        self._continue_event.set()
         self.quit()
         self.wait(5000)  # 等待最多5秒
 
 
+class AudioFolderScanner(QThread):
+    """在后台扫描音频文件夹，避免网络路径下列目录时卡住界面"""
+    
+    scan_finished = pyqtSignal(list, list, str)  # (文件名列表, 完整路径列表, 错误信息)
+    
+    def __init__(self, folder: str):
+        super().__init__()
+        self.folder = folder
+    
+    def run(self):
+        # 获取音频文件夹中的所有音频文件（scandir直接给出文件名和完整路径，不再逐个join）
+        # 小写文件名只计算一次，既用于扩展名过滤，也作为排序键
+        try:
+            audio_entries = []
+            with os.scandir(self.folder) as entries:
+                for entry in entries:
+                    lower_name = entry.name.lower()
+                    if lower_name.endswith(AUDIO_EXTENSIONS) and not entry.is_dir():
+                        audio_entries.append((lower_name, entry.name, entry.path))
+        except OSError as e:
+            self.scan_finished.emit([], [], str(e))
+            return
+        
+        # 按文件名排序（不区分大小写）
+        audio_entries.sort()
+        self.scan_finished.emit([name for _, name, _ in audio_entries],
+                                [path for _, _, path in audio_entries], "")
+
+
+# 配置中动画效果名称的合法取值，加载配置时只做集合查找
+_SUPPORTED_EFFECTS = frozenset(get_supported_effects())
+
+# 控件样式表（模块级常量，只构造一次）
+# 路径标签：已选择/未选择两种状态
+_PATH_LABEL_SELECTED_QSS = "color: #333; font-style: normal;"
+_PATH_LABEL_UNSELECTED_QSS = "color: #666; font-style: italic;"
+
+# 视频片段开关按钮：未选中为灰色，选中为绿色，由Qt按:checked状态自动切换，无需重新设置样式表
+_VIDEO_CLIPS_TOGGLE_QSS = """
+    QPushButton {
+        background-color: #6c757d;
+        color: white;
+        border: none;
+        padding: 8px 16px;
+        border-radius: 4px;
+        font-weight: bold;
+    }
+    QPushButton:hover {
+        background-color: #5a6268;
+    }
+    QPushButton:checked {
+        background-color: #28a745;
+    }
+    QPushButton:checked:hover {
+        background-color: #218838;
+    }
+"""
+
+_RESET_BUTTON_QSS = """
+    QPushButton {
+        background-color: #dc3545;
+        color: white;
+        border: none;
+        border-radius: 4px;
+        font-weight: bold;
+    }
+    QPushButton:hover {
+        background-color: #c82333;
+    }
+"""
+
+_LOG_TEXT_QSS = """
+    QTextEdit {
+        background-color: #1e1e1e;
+        color: #ffffff;
+        border: 1px solid #555;
+        border-radius: 5px;
+        padding: 10px;
+    }
+"""
+
+_CLEAR_LOG_BUTTON_QSS = """
+    QPushButton {
+        background-color: #6c757d;
+        color: white;
+        border: none;
+        padding: 5px 15px;
+        border-radius: 3px;
+        font-size: 12px;
+    }
+    QPushButton:hover {
+        background-color: #5a6268;
+    }
+"""
+
+
 class MainWindow(QMainWindow):
     """主窗口"""
     
+    # 视频片段缩放模式 -> 下拉框显示文字
+    SCALE_MODE_LABELS = {
+        "crop": "裁剪模式 (保持比例)",
+        "fit": "适应模式 (添加黑边)",
+        "stretch": "拉伸模式 (可能变形)",
+    }
+    # 下拉框显示文字 -> 视频片段缩放模式
+    SCALE_MODE_BY_LABEL = {label: mode for mode, label in SCALE_MODE_LABELS.items()}
+    # 由参数控件直接决定的配置项：(配置键, 控件属性名)
+    WIDGET_CONFIG_KEYS = (
+        ("image_duration_min", "duration_min_spin"),
+        ("image_duration_max", "duration_max_spin"),
+        ("animation_effect", "effect_combo"),
+        ("animation_intensity", "intensity_spinbox"),
+        ("resolution", "resolution_combo"),
+        ("custom_width", "custom_width_spin"),
+        ("custom_height", "custom_height_spin"),
+        ("fps", "fps_spin"),
+        ("preset", "preset_combo"),
+        ("crf", "crf_spin"),
+        ("threads", "threads_spin"),
+    )
+    
     def __init__(self):
         super().__init__()
         self.setWindowTitle("Audio-Driven Photo Slideshow Generator")
@@ -1312,8 +1882,12 @@ class MainWindow(QMainWindow):
         # 初始化配置管理器
         self.config_manager = ConfigManager()
         
-        # 加载配置
-        self.config = self.config_manager.load_config()
+        # 加载配置：在后台线程读取配置文件，与下面的界面构建并行，load_config_to_ui前再取结果
+        from concurrent.futures import ThreadPoolExecutor
+        config_loader = ThreadPoolExecutor(max_workers=1)
+        config_future = config_loader.submit(self.config_manager.load_config)
+        config_loader.shutdown(wait=False)
+        self.config = {}
         
         # 存储选择的文件路径
         self.selected_image_folder = None
@@ -1335,8 +1909,45 @@ class MainWindow(QMainWindow):
         
         # 工作线程
         self.worker_thread = None
+        self._audio_scanner = None
+        # 从点击生成到任务结束期间为True，防止确认对话框期间重复点击再次进入
+        self._generating = False
+        self._scanning = False
+        
+        # 是/否确认框，首次使用时创建，之后复用
+        self._question_box = None
+        
+        # 批量处理状态：batch_audio_files为None表示当前不是批量处理
+        self.batch_audio_files = None
+        self.batch_basenames = None
+        self.current_batch_index = 0
+        self._batch_stopped = False
+        
+        # 自动保存去抖：连续修改参数时只在停止修改300毫秒后写一次配置
+        self._save_timer = QTimer(self)
+        self._save_timer.setSingleShot(True)
+        self._save_timer.setInterval(300)
+        self._save_timer.timeout.connect(self.save_config_from_ui)
+        # 参数控件当前值的缓存，由各控件的信号更新，保存时不必逐个读取控件
+        self._config_cache = {}
+        
+        # 日志缓冲：工作线程日志和状态较密集时每100毫秒批量写入一次界面，状态文字只保留最新一条
+        self._log_buffer = []
+        self._pending_status = None
+        self._log_flush_timer = QTimer(self)
+        self._log_flush_timer.setSingleShot(True)
+        self._log_flush_timer.setInterval(100)
+        self._log_flush_timer.timeout.connect(self._flush_log)
+        
+        # 进度条每帧（约16毫秒）最多刷新一次，只写入最新的进度值
+        self._pending_progress = 0
+        self._progress_timer = QTimer(self)
+        self._progress_timer.setSingleShot(True)
+        self._progress_timer.setInterval(16)
+        self._progress_timer.timeout.connect(self._apply_progress)
         
         self.setup_ui()
+        self.config = config_future.result()
         self.load_config_to_ui()
     
     def closeEvent(self, event):
@@ -1345,134 +1956,140 @@ class MainWindow(QMainWindow):
         if self.worker_thread and self.worker_thread.isRunning():
             self.worker_thread.stop()
         
+        # 写入尚未保存的配置修改
+        if self._save_timer.isActive():
+            self._save_timer.stop()
+            self.save_config_from_ui()
+        
         # 接受关闭事件
         event.accept()
     
     def load_config_to_ui(self):
-        # 临时禁用自动保存，避免加载时触发保存
-        self._loading_config = True
-        
-        # 加载文件路径
-        if self.config.get("image_folder"):
-            self.selected_image_folder = self.config["image_folder"]
-            self.image_folder_label.setText(f"已选择: {os.path.basename(self.selected_image_folder)}")
-        
-        if self.config.get("audio_file"):
-            self.selected_audio_file = self.config["audio_file"]
-            self.audio_file_label.setText(f"已选择: {os.path.basename(self.selected_audio_file)}")
-        
-        if self.config.get("audio_folder"):
-            self.selected_audio_folder = self.config["audio_folder"]
-            self.audio_folder_label.setText(f"已选择: {os.path.basename(self.selected_audio_folder)}")
+        # 加载期间屏蔽控件信号，既不触发自动保存，也不逐个调用槽函数
+        widgets = [getattr(self, name) for name in (
+            'duration_min_spin', 'duration_max_spin', 'effect_combo', 'intensity_spinbox',
+            'resolution_combo', 'custom_width_spin', 'custom_height_spin',
+            'fps_spin', 'preset_combo', 'crf_spin', 'threads_spin',
+            'enable_video_clips_checkbox', 'video_clip_count_spin', 'video_clip_scale_combo',
+            'enable_segmented_processing_checkbox')]
+        for widget in widgets:
+            widget.blockSignals(True)
+        # 所有控件更新完后统一重绘一次
+        self.setUpdatesEnabled(False)
+        try:
+            self._apply_config_to_ui()
+        finally:
+            for widget in widgets:
+                widget.blockSignals(False)
+            self.setUpdatesEnabled(True)
+        
+        # 信号被屏蔽，on_resolution_changed不会执行，手动更新自定义分辨率输入框状态
+        is_custom = self.resolution_combo.currentText().startswith("Custom")
+        self.custom_width_spin.setEnabled(is_custom)
+        self.custom_height_spin.setEnabled(is_custom)
+        
+        # 加载期间信号被屏蔽，从控件重新同步一次缓存
+        for key, name in self.WIDGET_CONFIG_KEYS:
+            widget = getattr(self, name)
+            self._config_cache[key] = widget.currentText() if isinstance(widget, QComboBox) else widget.value()
+    
+    def _set_path_label(self, label, path):
+        """以单行省略形式显示已选择的路径，完整路径放在提示中"""
+        width = label.width() if label.isVisible() else 400
+        text = f"已选择: {os.path.basename(path)}"
+        label.setText(label.fontMetrics().elidedText(text, Qt.ElideMiddle, width))
+        label.setToolTip(path)
+        # 样式已是已选择状态时不重复设置，避免样式表重新解析
+        if label.styleSheet() != _PATH_LABEL_SELECTED_QSS:
+            label.setStyleSheet(_PATH_LABEL_SELECTED_QSS)
+    
+    def _set_if_changed(self, widget, value):
+        """值与控件当前值不同时才写入，避免多余的范围检查和重绘"""
+        if isinstance(widget, QComboBox):
+            # 下拉框按预先建立的 文字->序号 表定位，选项不存在时保持不变（与setCurrentText一致）
+            index = self._combo_indexes[widget].get(value)
+            if index is not None and widget.currentIndex() != index:
+                widget.setCurrentIndex(index)
+        elif widget.value() != value:
+            widget.setValue(value)
+    
+    def _apply_config_to_ui(self):
+        """把self.config中的值写入各控件"""
+        get = self.config.get
+        
+        # 加载文件路径：(配置键, 属性名, 显示标签, 未选择时的提示)
+        path_fields = (
+            ("image_folder", "selected_image_folder", self.image_folder_label, "未选择文件夹"),
+            ("audio_file", "selected_audio_file", self.audio_file_label, "未选择音频文件"),
+            ("audio_folder", "selected_audio_folder", self.audio_folder_label, "未选择音频文件夹"),
+            ("processed_folder", "selected_processed_folder", self.processed_folder_label, "未选择已处理文件夹"),
+            ("output_folder", "selected_output_folder", self.output_folder_label, "未选择输出文件夹"),
+            ("video_clip_folder", "selected_video_clip_folder", self.video_clip_folder_label, "未选择视频片段文件夹"),
+            ("processed_video_folder", "selected_processed_video_folder", self.processed_video_folder_label,
+             "未选择已处理视频片段文件夹"),
+        )
+        for key, attr, label, placeholder in path_fields:
+            value = get(key)
+            if value:
+                setattr(self, attr, value)
+                self._set_path_label(label, value)
+            elif getattr(self, attr):
+                # 之前选择过路径而配置中已清空（如重置配置），恢复为未选择状态
+                setattr(self, attr, None)
+                label.setText(placeholder)
+                label.setStyleSheet(_PATH_LABEL_UNSELECTED_QSS)
+                label.setToolTip("")
         
         # 加载处理模式
-        self.processing_mode = self.config.get("processing_mode", "single")
+        self.processing_mode = get("processing_mode", "single")
         
         # 更新处理模式按钮状态
-        if hasattr(self, 'single_mode_btn') and hasattr(self, 'batch_mode_btn'):
-            if self.processing_mode == "single":
-                self.single_mode_btn.setChecked(True)
-                self.batch_mode_btn.setChecked(False)
-            else:
-                self.single_mode_btn.setChecked(False)
-                self.batch_mode_btn.setChecked(True)
-        
-        if self.config.get("processed_folder"):
-            self.selected_processed_folder = self.config["processed_folder"]
-            self.processed_folder_label.setText(f"已选择: {os.path.basename(self.selected_processed_folder)}")
-        
-        if self.config.get("output_folder"):
-            self.selected_output_folder = self.config["output_folder"]
-            self.output_folder_label.setText(f"已选择: {os.path.basename(self.selected_output_folder)}")
-        
-        if self.config.get("video_clip_folder"):
-            self.selected_video_clip_folder = self.config["video_clip_folder"]
-            self.video_clip_folder_label.setText(f"已选择: {os.path.basename(self.selected_video_clip_folder)}")
-        
-        if self.config.get("processed_video_folder"):
-            self.selected_processed_video_folder = self.config["processed_video_folder"]
-            self.processed_video_folder_label.setText(f"已选择: {os.path.basename(self.selected_processed_video_folder)}")
+        is_single = self.processing_mode == "single"
+        self.single_mode_btn.setChecked(is_single)
+        self.batch_mode_btn.setChecked(not is_single)
         
         # 加载视频片段设置
-        self.enable_video_clips = self.config.get("enable_video_clips", False)
-        self.video_clip_count = self.config.get("video_clip_count", 3)
-        self.video_clip_scale_mode = self.config.get("video_clip_scale_mode", "crop")
-        self.enable_segmented_processing = self.config.get("enable_segmented_processing", False)  # 默认禁用
+        # 旧版本以QDoubleSpinBox保存的整数项可能是浮点数，QSpinBox.setValue只接受int
+        self.enable_video_clips = get("enable_video_clips", False)
+        self.video_clip_count = int(get("video_clip_count", 3))
+        self.video_clip_scale_mode = get("video_clip_scale_mode", "crop")
+        self.enable_segmented_processing = get("enable_segmented_processing", False)  # 默认禁用
         
         # 更新视频片段UI状态
-        if hasattr(self, 'enable_video_clips_checkbox'):
-            self.enable_video_clips_checkbox.setChecked(self.enable_video_clips)
-            self.video_clip_count_spin.setEnabled(self.enable_video_clips)
-            if hasattr(self, 'enable_segmented_processing_checkbox'):
-                self.enable_segmented_processing_checkbox.setChecked(self.enable_segmented_processing)
-            self.video_clip_count_spin.setValue(self.video_clip_count)
-            
-            # 更新缩放模式下拉框
-            if hasattr(self, 'video_clip_scale_combo'):
-                if self.video_clip_scale_mode == "crop":
-                    self.video_clip_scale_combo.setCurrentText("裁剪模式 (保持比例)")
-                elif self.video_clip_scale_mode == "fit":
-                    self.video_clip_scale_combo.setCurrentText("适应模式 (添加黑边)")
-                elif self.video_clip_scale_mode == "stretch":
-                    self.video_clip_scale_combo.setCurrentText("拉伸模式 (可能变形)")
-            
-            # 更新按钮样式
-            if self.enable_video_clips:
-                self.enable_video_clips_checkbox.setStyleSheet("""
-                    QPushButton {
-                        background-color: #28a745;
-                        color: white;
-                        border: none;
-                        padding: 8px 16px;
-                        border-radius: 4px;
-                        font-weight: bold;
-                    }
-                    QPushButton:hover {
-                        background-color: #218838;
-                    }
-                """)
-            else:
-                self.enable_video_clips_checkbox.setStyleSheet("""
-                    QPushButton {
-                        background-color: #6c757d;
-                        color: white;
-                        border: none;
-                        padding: 8px 16px;
-                        border-radius: 4px;
-                        font-weight: bold;
-                    }
-                    QPushButton:hover {
-                        background-color: #5a6268;
-                    }
-                """)
+        self.enable_video_clips_checkbox.setChecked(self.enable_video_clips)
+        self.video_clip_count_spin.setEnabled(self.enable_video_clips)
+        self.enable_segmented_processing_checkbox.setChecked(self.enable_segmented_processing)
+        self._set_if_changed(self.video_clip_count_spin, self.video_clip_count)
+        
+        # 更新缩放模式下拉框
+        scale_label = self.SCALE_MODE_LABELS.get(self.video_clip_scale_mode)
+        if scale_label:
+            self._set_if_changed(self.video_clip_scale_combo, scale_label)
         
         # 加载参数设置
-        self.duration_min_spin.setValue(self.config.get("image_duration_min", 4.0))
-        self.duration_max_spin.setValue(self.config.get("image_duration_max", 6.0))
+        self._set_if_changed(self.duration_min_spin, get("image_duration_min", 4.0))
+        self._set_if_changed(self.duration_max_spin, get("image_duration_max", 6.0))
         
-        effect = self.config.get("animation_effect", "Slow Zoom In")
-        if effect in get_supported_effects():
-            self.effect_combo.setCurrentText(effect)
+        effect = get("animation_effect", "Slow Zoom In")
+        if effect in _SUPPORTED_EFFECTS:
+            self._set_if_changed(self.effect_combo, effect)
         
-        self.intensity_spinbox.setValue(self.config.get("animation_intensity", 1.0))
+        self._set_if_changed(self.intensity_spinbox, get("animation_intensity", 1.0))
         
         # 加载分辨率设置
-        resolution = self.config.get("resolution", "1920x1080 (16:9)")
+        resolution = get("resolution", "1920x1080 (16:9)")
         if resolution == "Custom...":
-            self.resolution_combo.setCurrentText("Custom...")
-            self.custom_width_spin.setValue(self.config.get("custom_width", 1920))
-            self.custom_height_spin.setValue(self.config.get("custom_height", 1080))
+            self._set_if_changed(self.resolution_combo, "Custom...")
+            self._set_if_changed(self.custom_width_spin, int(get("custom_width", 1920)))
+            self._set_if_changed(self.custom_height_spin, int(get("custom_height", 1080)))
         else:
-            self.resolution_combo.setCurrentText(resolution)
+            self._set_if_changed(self.resolution_combo, resolution)
         
         # 加载导出设置
-        self.fps_spin.setValue(self.config.get("fps", 24))
-        self.preset_combo.setCurrentText(self.config.get("preset", "ultrafast"))
-        self.crf_spin.setValue(self.config.get("crf", 23))
-        self.threads_spin.setValue(self.config.get("threads", 0))
-        
-        # 重新启用自动保存
-        self._loading_config = False
+        self._set_if_changed(self.fps_spin, int(get("fps", 24)))
+        self._set_if_changed(self.preset_combo, get("preset", "ultrafast"))
+        self._set_if_changed(self.crf_spin, int(get("crf", 23)))
+        self._set_if_changed(self.threads_spin, int(get("threads", 0)))
     
     def save_config_from_ui(self):
         """将当前UI设置保存到配置"""
@@ -1489,18 +2106,11 @@ class MainWindow(QMainWindow):
             "video_clip_count": self.video_clip_count,
             "video_clip_scale_mode": self.video_clip_scale_mode,
             "enable_segmented_processing": self.enable_segmented_processing,
-            "image_duration_min": self.duration_min_spin.value(),
-            "image_duration_max": self.duration_max_spin.value(),
-            "animation_effect": self.effect_combo.currentText(),
-            "animation_intensity": self.intensity_spinbox.value(),
-            "resolution": self.resolution_combo.currentText(),
-            "custom_width": self.custom_width_spin.value(),
-            "custom_height": self.custom_height_spin.value(),
-            "fps": self.fps_spin.value(),
-            "preset": self.preset_combo.currentText(),
-            "crf": self.crf_spin.value(),
-            "threads": self.threads_spin.value()
+            **self._config_cache
         }
+        # 与上次保存的配置相同时不写盘
+        if all(self.config.get(key) == value for key, value in config.items()):
+            return
         self.config_manager.save_config(config)
         self.config = config
     
@@ -1554,6 +2164,16 @@ class MainWindow(QMainWindow):
         splitter.setSizes([300, 300])  # 设置初始大小比例
         
         main_layout.addWidget(splitter)
+        
+        # 所有参数控件创建完毕后统一连接自动保存信号
+        self.connect_config_signals()
+        
+        # 加载配置时使用的下拉框 文字->序号 表
+        self._combo_indexes = {
+            combo: {combo.itemText(i): i for i in range(combo.count())}
+            for combo in (self.effect_combo, self.resolution_combo,
+                          self.preset_combo, self.video_clip_scale_combo)
+        }
     
     def create_input_selection_group(self) -> QGroupBox:
         """创建输入选择区"""
@@ -1564,10 +2184,10 @@ class MainWindow(QMainWindow):
         # 图片文件夹选择
         folder_layout = QHBoxLayout()
         self.folder_btn = QPushButton("选择图片文件夹")
-        self.folder_btn.clicked.connect(self.select_image_folder)
         self.image_folder_label = QLabel("未选择文件夹")
-        self.image_folder_label.setWordWrap(True)
-        self.image_folder_label.setStyleSheet("color: #666; font-style: italic;")
+        self.image_folder_label.setStyleSheet(_PATH_LABEL_UNSELECTED_QSS)
+        self.folder_btn.clicked.connect(partial(
+            self._pick_folder, "选择包含图片的文件夹", "selected_image_folder", self.image_folder_label, "image_folder"))
         
         folder_layout.addWidget(self.folder_btn)
         folder_layout.addWidget(self.image_folder_label, 1)
@@ -1578,8 +2198,7 @@ class MainWindow(QMainWindow):
         self.audio_btn = QPushButton("选择音频文件")
         self.audio_btn.clicked.connect(self.select_audio_file)
         self.audio_file_label = QLabel("未选择音频文件")
-        self.audio_file_label.setWordWrap(True)
-        self.audio_file_label.setStyleSheet("color: #666; font-style: italic;")
+        self.audio_file_label.setStyleSheet(_PATH_LABEL_UNSELECTED_QSS)
         
         audio_layout.addWidget(self.audio_btn)
         audio_layout.addWidget(self.audio_file_label, 1)
@@ -1588,10 +2207,10 @@ class MainWindow(QMainWindow):
         # 音频文件夹选择
         audio_folder_layout = QHBoxLayout()
         self.audio_folder_btn = QPushButton("选择音频文件夹")
-        self.audio_folder_btn.clicked.connect(self.select_audio_folder)
         self.audio_folder_label = QLabel("未选择音频文件夹")
-        self.audio_folder_label.setWordWrap(True)
-        self.audio_folder_label.setStyleSheet("color: #666; font-style: italic;")
+        self.audio_folder_label.setStyleSheet(_PATH_LABEL_UNSELECTED_QSS)
+        self.audio_folder_btn.clicked.connect(partial(
+            self._pick_folder, "选择音频文件夹", "selected_audio_folder", self.audio_folder_label, "audio_folder"))
         
         audio_folder_layout.addWidget(self.audio_folder_btn)
         audio_folder_layout.addWidget(self.audio_folder_label, 1)
@@ -1609,8 +2228,8 @@ class MainWindow(QMainWindow):
         self.single_mode_btn.setChecked(True)  # 默认选择单个处理
         
         # 连接信号
-        self.single_mode_btn.clicked.connect(lambda: self.set_processing_mode("single"))
-        self.batch_mode_btn.clicked.connect(lambda: self.set_processing_mode("batch"))
+        self.single_mode_btn.clicked.connect(partial(self.set_processing_mode, "single"))
+        self.batch_mode_btn.clicked.connect(partial(self.set_processing_mode, "batch"))
         
         mode_layout.addWidget(mode_label)
         mode_layout.addWidget(self.single_mode_btn)
@@ -1621,10 +2240,10 @@ class MainWindow(QMainWindow):
         # 视频片段设置
         video_clip_layout = QHBoxLayout()
         self.video_clip_btn = QPushButton("选择视频片段文件夹")
-        self.video_clip_btn.clicked.connect(self.select_video_clip_folder)
         self.video_clip_folder_label = QLabel("未选择视频片段文件夹")
-        self.video_clip_folder_label.setWordWrap(True)
-        self.video_clip_folder_label.setStyleSheet("color: #666; font-style: italic;")
+        self.video_clip_folder_label.setStyleSheet(_PATH_LABEL_UNSELECTED_QSS)
+        self.video_clip_btn.clicked.connect(partial(
+            self._pick_folder, "选择视频片段文件夹", "selected_video_clip_folder", self.video_clip_folder_label, "video_clip_folder"))
         
         video_clip_layout.addWidget(self.video_clip_btn)
         video_clip_layout.addWidget(self.video_clip_folder_label, 1)
@@ -1637,13 +2256,13 @@ class MainWindow(QMainWindow):
         self.enable_video_clips_checkbox = QPushButton("插入视频片段")
         self.enable_video_clips_checkbox.setCheckable(True)
         self.enable_video_clips_checkbox.setChecked(False)
+        self.enable_video_clips_checkbox.setStyleSheet(_VIDEO_CLIPS_TOGGLE_QSS)
         self.enable_video_clips_checkbox.clicked.connect(self.toggle_video_clips)
         
         # 视频片段数量设置
         clip_count_label = QLabel("插入数量:")
-        self.video_clip_count_spin = QDoubleSpinBox()
+        self.video_clip_count_spin = QSpinBox()
         self.video_clip_count_spin.setRange(1, 999)  # 改为最大999个
-        self.video_clip_count_spin.setDecimals(0)
         self.video_clip_count_spin.setValue(3)
         self.video_clip_count_spin.setSuffix(" 个")
         self.video_clip_count_spin.setEnabled(False)
@@ -1672,7 +2291,7 @@ class MainWindow(QMainWindow):
         scale_mode_layout = QHBoxLayout()
         scale_mode_label = QLabel("缩放模式:")
         self.video_clip_scale_combo = QComboBox()
-        self.video_clip_scale_combo.addItems(["裁剪模式 (保持比例)", "适应模式 (添加黑边)", "拉伸模式 (可能变形)"])
+        self.video_clip_scale_combo.addItems(list(self.SCALE_MODE_LABELS.values()))
         self.video_clip_scale_combo.setCurrentText("裁剪模式 (保持比例)")
         self.video_clip_scale_combo.currentTextChanged.connect(self.on_scale_mode_changed)
         
@@ -1692,10 +2311,10 @@ class MainWindow(QMainWindow):
         # 输出视频文件夹选择
         output_layout = QHBoxLayout()
         self.output_btn = QPushButton("选择输出视频文件夹")
-        self.output_btn.clicked.connect(self.select_output_folder)
         self.output_folder_label = QLabel("未选择输出文件夹")
-        self.output_folder_label.setWordWrap(True)
-        self.output_folder_label.setStyleSheet("color: #666; font-style: italic;")
+        self.output_folder_label.setStyleSheet(_PATH_LABEL_UNSELECTED_QSS)
+        self.output_btn.clicked.connect(partial(
+            self._pick_folder, "选择输出视频文件夹", "selected_output_folder", self.output_folder_label, "output_folder"))
         
         output_layout.addWidget(self.output_btn)
         output_layout.addWidget(self.output_folder_label, 1)
@@ -1704,10 +2323,10 @@ class MainWindow(QMainWindow):
         # 已处理图片文件夹选择
         processed_layout = QHBoxLayout()
         self.processed_btn = QPushButton("选择已处理图片文件夹")
-        self.processed_btn.clicked.connect(self.select_processed_folder)
         self.processed_folder_label = QLabel("未选择已处理文件夹")
-        self.processed_folder_label.setWordWrap(True)
-        self.processed_folder_label.setStyleSheet("color: #666; font-style: italic;")
+        self.processed_folder_label.setStyleSheet(_PATH_LABEL_UNSELECTED_QSS)
+        self.processed_btn.clicked.connect(partial(
+            self._pick_folder, "选择已处理图片文件夹", "selected_processed_folder", self.processed_folder_label, "processed_folder"))
         
         processed_layout.addWidget(self.processed_btn)
         processed_layout.addWidget(self.processed_folder_label, 1)
@@ -1716,10 +2335,10 @@ class MainWindow(QMainWindow):
         # 已处理视频片段文件夹选择
         processed_video_layout = QHBoxLayout()
         self.processed_video_btn = QPushButton("选择已处理视频片段文件夹")
-        self.processed_video_btn.clicked.connect(self.select_processed_video_folder)
         self.processed_video_folder_label = QLabel("未选择已处理视频片段文件夹")
-        self.processed_video_folder_label.setWordWrap(True)
-        self.processed_video_folder_label.setStyleSheet("color: #666; font-style: italic;")
+        self.processed_video_folder_label.setStyleSheet(_PATH_LABEL_UNSELECTED_QSS)
+        self.processed_video_btn.clicked.connect(partial(
+            self._pick_folder, "选择已处理视频片段文件夹", "selected_processed_video_folder", self.processed_video_folder_label, "processed_video_folder"))
         
         processed_video_layout.addWidget(self.processed_video_btn)
         processed_video_layout.addWidget(self.processed_video_folder_label, 1)
@@ -1763,6 +2382,7 @@ class MainWindow(QMainWindow):
         # 添加动画效果选项
         effects = ["随机效果", "Slow Zoom In", "Slow Zoom Out", 
                   "Pan Left to Right", "Pan Right to Left",
+                  "Pan Up to Down", "Pan Down to Up",
                   "Pan Diagonal Up Right", "Pan Diagonal Up Left",
                   "Pan Diagonal Down Right", "Pan Diagonal Down Left"]
         self.effect_combo.addItems(effects)
@@ -1797,29 +2417,28 @@ class MainWindow(QMainWindow):
         resolution_layout = QHBoxLayout()
         resolution_label = QLabel("分辨率:")
         self.resolution_combo = QComboBox()
-        # 预置常用分辨率（宽x高）
-        self.resolution_combo.addItems([
-            "1920x1080 (16:9)",
-            "1280x720 (16:9)",
-            "2560x1440 (16:9)",
-            "3840x2160 (16:9)",
-            "1080x1080 (1:1)",
-            "1080x1920 (9:16)",
-            "Custom..."
-        ])
+        # 预置常用分辨率（宽x高），(宽, 高)作为选项数据保存，生成时无需再解析文字
+        for text, size in [
+            ("1920x1080 (16:9)", (1920, 1080)),
+            ("1280x720 (16:9)", (1280, 720)),
+            ("2560x1440 (16:9)", (2560, 1440)),
+            ("3840x2160 (16:9)", (3840, 2160)),
+            ("1080x1080 (1:1)", (1080, 1080)),
+            ("1080x1920 (9:16)", (1080, 1920)),
+            ("Custom...", None),
+        ]:
+            self.resolution_combo.addItem(text, size)
         self.resolution_combo.setCurrentIndex(0)  # 默认1920x1080
 
         # 自定义分辨率（可选）
-        self.custom_width_spin = QDoubleSpinBox()
+        self.custom_width_spin = QSpinBox()
         self.custom_width_spin.setRange(320, 7680)
-        self.custom_width_spin.setDecimals(0)
         self.custom_width_spin.setValue(1920)
         self.custom_width_spin.setSuffix(" w")
         self.custom_width_spin.setEnabled(False)
 
-        self.custom_height_spin = QDoubleSpinBox()
+        self.custom_height_spin = QSpinBox()
         self.custom_height_spin.setRange(240, 4320)
-        self.custom_height_spin.setDecimals(0)
         self.custom_height_spin.setValue(1080)
         self.custom_height_spin.setSuffix(" h")
         self.custom_height_spin.setEnabled(False)
@@ -1838,32 +2457,15 @@ class MainWindow(QMainWindow):
         resolution_layout.addStretch()
         layout.addLayout(resolution_layout)
         
-        # 连接所有参数控件的信号到自动保存
-        self.connect_config_signals()
-        
         return group
     
     def connect_config_signals(self):
-        """连接所有参数控件的信号到自动保存"""
-        # 图片时长设置
-        self.duration_min_spin.valueChanged.connect(self.auto_save_config)
-        self.duration_max_spin.valueChanged.connect(self.auto_save_config)
-        
-        # 动画效果设置
-        self.effect_combo.currentTextChanged.connect(self.auto_save_config)
-        
-        # 动画强度设置
-        self.intensity_spinbox.valueChanged.connect(self.auto_save_config)
-        
-        # 分辨率设置
-        self.resolution_combo.currentTextChanged.connect(self.auto_save_config)
-        self.custom_width_spin.valueChanged.connect(self.auto_save_config)
-        self.custom_height_spin.valueChanged.connect(self.auto_save_config)
-
-        # 分段处理开关
-        if hasattr(self, 'enable_segmented_processing_checkbox'):
-            self.enable_segmented_processing_checkbox.stateChanged.connect(self.on_segmented_processing_toggled)
-
+        """把所有参数控件的变化信号连接到配置缓存（保存去抖）"""
+        for key, name in self.WIDGET_CONFIG_KEYS:
+            widget = getattr(self, name)
+            signal = widget.currentTextChanged if isinstance(widget, QComboBox) else widget.valueChanged
+            signal.connect(partial(self._update_config_cache, key))
+    
     def on_segmented_processing_toggled(self):
         """分段处理开关切换"""
         if hasattr(self, 'enable_segmented_processing_checkbox'):
@@ -1871,12 +2473,15 @@ class MainWindow(QMainWindow):
             # 保存配置
             self.config_manager.update_config(enable_segmented_processing=self.enable_segmented_processing)
     
+    def _update_config_cache(self, key: str, value):
+        """记录控件的新值并安排自动保存"""
+        self._config_cache[key] = value
+        self._save_timer.start()
+    
     def auto_save_config(self):
         """自动保存配置"""
-        # 如果正在加载配置，不执行自动保存
-        if hasattr(self, '_loading_config') and self._loading_config:
-            return
-        self.save_config_from_ui()
+        # 重新计时，合并连续的修改
+        self._save_timer.start()
     
     def create_action_feedback_group(self) -> QGroupBox:
         """创建执行与反馈区"""
@@ -1895,18 +2500,7 @@ class MainWindow(QMainWindow):
         self.reset_config_btn = QPushButton("重置配置")
         self.reset_config_btn.setMinimumHeight(50)
         self.reset_config_btn.clicked.connect(self.reset_config)
-        self.reset_config_btn.setStyleSheet("""
-            QPushButton {
-                background-color: #dc3545;
-                color: white;
-                border: none;
-                border-radius: 4px;
-                font-weight: bold;
-            }
-            QPushButton:hover {
-                background-color: #c82333;
-            }
-        """)
+        self.reset_config_btn.setStyleSheet(_RESET_BUTTON_QSS)
         
         button_layout.addWidget(self.generate_btn)
         button_layout.addWidget(self.reset_config_btn)
@@ -1915,24 +2509,22 @@ class MainWindow(QMainWindow):
         # 性能/导出设置
         perf_layout = QHBoxLayout()
         fps_label = QLabel("FPS:")
-        self.fps_spin = QDoubleSpinBox()
+        self.fps_spin = QSpinBox()
         self.fps_spin.setRange(12, 60)
-        self.fps_spin.setDecimals(0)
         self.fps_spin.setValue(24)
         preset_label = QLabel("Preset:")
         self.preset_combo = QComboBox()
         self.preset_combo.addItems(["ultrafast", "superfast", "veryfast", "faster", "fast", "medium"])  # 仅加速预设
         self.preset_combo.setCurrentText("ultrafast")
         crf_label = QLabel("CRF:")
-        self.crf_spin = QDoubleSpinBox()
+        self.crf_spin = QSpinBox()
         self.crf_spin.setRange(15, 35)
-        self.crf_spin.setDecimals(0)
         self.crf_spin.setValue(23)
         threads_label = QLabel("Threads:")
-        self.threads_spin = QDoubleSpinBox()
-        self.threads_spin.setRange(1, max(1, (os.cpu_count() or 2)))
-        self.threads_spin.setDecimals(0)
-        self.threads_spin.setValue(max(1, (os.cpu_count() or 2) - 1))
+        cpu_count = os.cpu_count() or 2
+        self.threads_spin = QSpinBox()
+        self.threads_spin.setRange(1, cpu_count)
+        self.threads_spin.setValue(max(1, cpu_count - 1))
 
         perf_layout.addWidget(fps_label)
         perf_layout.addWidget(self.fps_spin)
@@ -1958,19 +2550,8 @@ class MainWindow(QMainWindow):
         self.status_label.setStyleSheet("color: #666; font-style: italic;")
         layout.addWidget(self.status_label)
         
-        # 连接性能设置控件的信号到自动保存
-        self.connect_performance_signals()
-        
         return group
     
-    def connect_performance_signals(self):
-        """连接性能设置控件的信号到自动保存"""
-        # 性能/导出设置
-        self.fps_spin.valueChanged.connect(self.auto_save_config)
-        self.preset_combo.currentTextChanged.connect(self.auto_save_config)
-        self.crf_spin.valueChanged.connect(self.auto_save_config)
-        self.threads_spin.valueChanged.connect(self.auto_save_config)
-    
     def create_log_panel(self) -> QGroupBox:
         """创建日志面板"""
         group = QGroupBox("处理日志")
@@ -1981,32 +2562,13 @@ class MainWindow(QMainWindow):
         self.log_text = QTextEdit()
         self.log_text.setReadOnly(True)
         self.log_text.setFont(QFont("Consolas", 9))
-        self.log_text.setStyleSheet("""
-            QTextEdit {
-                background-color: #1e1e1e;
-                color: #ffffff;
-                border: 1px solid #555;
-                border-radius: 5px;
-                padding: 10px;
-            }
-        """)
+        self.log_text.document().setMaximumBlockCount(5000)
+        self.log_text.setStyleSheet(_LOG_TEXT_QSS)
         
         # 清空日志按钮
         clear_btn = QPushButton("清空日志")
         clear_btn.clicked.connect(self.clear_log)
-        clear_btn.setStyleSheet("""
-            QPushButton {
-                background-color: #6c757d;
-                color: white;
-                border: none;
-                padding: 5px 15px;
-                border-radius: 3px;
-                font-size: 12px;
-            }
-            QPushButton:hover {
-                background-color: #5a6268;
-            }
-        """)
+        clear_btn.setStyleSheet(_CLEAR_LOG_BUTTON_QSS)
         
         layout.addWidget(self.log_text)
         layout.addWidget(clear_btn)
@@ -2015,90 +2577,79 @@ class MainWindow(QMainWindow):
     
     def clear_log(self):
         """清空日志"""
+        self._log_buffer.clear()
         self.log_text.clear()
         self.log_text.append("日志已清空")
     
     def add_log_message(self, message: str):
-        """添加日志消息"""
-        self.log_text.append(message)
+        """添加日志消息（缓冲后批量写入）"""
+        self._log_buffer.append(message)
+        if not self._log_flush_timer.isActive():
+            self._log_flush_timer.start()
+    
+    def set_status_text(self, text: str):
+        """更新状态文字（与日志一起延迟写入）"""
+        self._pending_status = text
+        if not self._log_flush_timer.isActive():
+            self._log_flush_timer.start()
+    
+    def _on_progress(self, value: int):
+        """记录最新进度，等到下一帧统一刷新进度条"""
+        self._pending_progress = value
+        if not self._progress_timer.isActive():
+            self._progress_timer.start()
+    
+    def _apply_progress(self):
+        """把最新进度写入进度条"""
+        self.progress_bar.setValue(self._pending_progress)
+    
+    def _flush_log(self):
+        """将缓冲的日志一次性写入日志面板，并写入最新的状态文字"""
+        if self._pending_status is not None:
+            self.status_label.setText(self._pending_status)
+            self._pending_status = None
+        if not self._log_buffer:
+            return
+        cursor = self.log_text.textCursor()
+        cursor.movePosition(QTextCursor.End)
+        if not self.log_text.document().isEmpty():
+            cursor.insertText("\n")
+        cursor.insertText("\n".join(self._log_buffer))
+        self._log_buffer.clear()
         # 自动滚动到底部
         scrollbar = self.log_text.verticalScrollBar()
         scrollbar.setValue(scrollbar.maximum())
     
-    def setup_styles(self):
-        """设置样式"""
-        self.setStyleSheet("""
-            QMainWindow {
-                background-color: #f5f5f5;
-            }
-            QGroupBox {
-                font-weight: bold;
-                border: 2px solid #cccccc;
-                border-radius: 8px;
-                margin-top: 10px;
-                padding-top: 10px;
-            }
-            QGroupBox::title {
-                subcontrol-origin: margin;
-                left: 10px;
-                padding: 0 5px 0 5px;
-            }
-            QPushButton {
-                background-color: #0078d4;
-                color: white;
-                border: none;
-                padding: 10px 20px;
-                border-radius: 5px;
-                font-weight: bold;
-                min-height: 20px;
-            }
-            QPushButton:hover {
-                background-color: #106ebe;
-            }
-            QPushButton:pressed {
-                background-color: #005a9e;
-            }
-            QPushButton:disabled {
-                background-color: #cccccc;
-                color: #666666;
-            }
-            QDoubleSpinBox {
-                padding: 5px;
-                border: 1px solid #cccccc;
-                border-radius: 3px;
-                min-width: 100px;
-            }
-            QComboBox {
-                padding: 5px;
-                border: 1px solid #cccccc;
-                border-radius: 3px;
-                min-width: 150px;
-            }
-            QProgressBar {
-                border: 1px solid #cccccc;
-                border-radius: 5px;
-                text-align: center;
-            }
-            QProgressBar::chunk {
-                background-color: #0078d4;
-                border-radius: 4px;
-            }
-        """)
-    
-    def select_image_folder(self):
-        """选择图片文件夹"""
+    def _ask_question(self, title: str, text: str,
+                      default=QMessageBox.StandardButton.NoButton) -> QMessageBox.StandardButton:
+        """弹出是/否确认框并返回用户选择的按钮（复用同一个QMessageBox实例）"""
+        if self._question_box is None:
+            self._question_box = QMessageBox(self)
+            self._question_box.setIcon(QMessageBox.Icon.Question)
+            self._question_box.setStandardButtons(QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No)
+        box = self._question_box
+        box.setWindowTitle(title)
+        box.setText(text)
+        box.setDefaultButton(default)
+        box.exec()
+        return box.standardButton(box.clickedButton())
+    
+    def _pick_folder(self, title: str, attr: str, label: QLabel, cfg_key: str, _checked: bool = False):
+        """选择文件夹并更新对应属性、标签和配置（_checked接收按钮clicked信号的参数）"""
+        # 只列目录、不探测每个目录的自定义图标，网络路径下打开对话框更快
         folder_path = QFileDialog.getExistingDirectory(
-            self, 
-            "选择包含图片的文件夹"
+            self, title, "",
+            QFileDialog.Option.ShowDirsOnly | QFileDialog.Option.DontUseCustomDirectoryIcons
+            | QFileDialog.Option.DontResolveSymlinks
         )
+        if not folder_path:
+            return
         
-        if folder_path:
-            self.selected_image_folder = folder_path
-            self.image_folder_label.setText(f"已选择: {os.path.basename(folder_path)}")
-            self.image_folder_label.setStyleSheet("color: #333; font-style: normal;")
-            
-            # 自动保存配置
-            self.config_manager.update_config(image_folder=folder_path)
+        setattr(self, attr, folder_path)
+        self._set_path_label(label, folder_path)
+        
+        # 自动保存配置
+        self.config_manager.update_config(**{cfg_key: folder_path})
     
     def select_audio_file(self):
         """选择音频文件"""
@@ -2106,35 +2657,19 @@ class MainWindow(QMainWindow):
             self,
             "选择音频文件",
             "",
-            "音频文件 (*.mp3 *.wav *.flac *.aac *.ogg *.m4a *.wma);;所有文件 (*)"
+            "音频文件 (*.mp3 *.wav *.flac *.aac *.ogg *.m4a *.wma);;所有文件 (*)",
+            options=QFileDialog.Option.DontUseCustomDirectoryIcons
         )
         
         if file_path:
             self.selected_audio_file = file_path
-            file_name = os.path.basename(file_path)
-            self.audio_file_label.setText(f"已选择: {file_name}")
-            self.audio_file_label.setStyleSheet("color: #333; font-style: normal;")
+            self._set_path_label(self.audio_file_label, file_path)
             
             # 自动保存配置
             self.config_manager.update_config(audio_file=file_path)
     
-    def select_audio_folder(self):
-        """选择音频文件夹"""
-        folder_path = QFileDialog.getExistingDirectory(
-            self, 
-            "选择音频文件夹"
-        )
-        
-        if folder_path:
-            self.selected_audio_folder = folder_path
-            self.audio_folder_label.setText(f"已选择: {os.path.basename(folder_path)}")
-            self.audio_folder_label.setStyleSheet("color: #333; font-style: normal;")
-            
-            # 自动保存配置
-            self.config_manager.update_config(audio_folder=folder_path)
-    
-    def set_processing_mode(self, mode: str):
-        """设置处理模式"""
+    def set_processing_mode(self, mode: str, _checked: bool = False):
+        """设置处理模式（_checked接收按钮clicked信号的参数）"""
         self.processing_mode = mode
         
         # 更新按钮状态
@@ -2148,123 +2683,26 @@ class MainWindow(QMainWindow):
         # 保存配置
         self.config_manager.update_config(processing_mode=mode)
     
-    def select_video_clip_folder(self):
-        """选择视频片段文件夹"""
-        folder_path = QFileDialog.getExistingDirectory(
-            self, 
-            "选择视频片段文件夹"
-        )
-        
-        if folder_path:
-            self.selected_video_clip_folder = folder_path
-            self.video_clip_folder_label.setText(f"已选择: {os.path.basename(folder_path)}")
-            self.video_clip_folder_label.setStyleSheet("color: #333; font-style: normal;")
-            
-            # 自动保存配置
-            self.config_manager.update_config(video_clip_folder=folder_path)
-    
     def toggle_video_clips(self):
         """切换视频片段插入功能"""
         self.enable_video_clips = self.enable_video_clips_checkbox.isChecked()
         self.video_clip_count_spin.setEnabled(self.enable_video_clips)
         
-        # 更新按钮样式
-        if self.enable_video_clips:
-            self.enable_video_clips_checkbox.setStyleSheet("""
-                QPushButton {
-                    background-color: #28a745;
-                    color: white;
-                    border: none;
-                    padding: 8px 16px;
-                    border-radius: 4px;
-                    font-weight: bold;
-                }
-                QPushButton:hover {
-                    background-color: #218838;
-                }
-            """)
-        else:
-            self.enable_video_clips_checkbox.setStyleSheet("""
-                QPushButton {
-                    background-color: #6c757d;
-                    color: white;
-                    border: none;
-                    padding: 8px 16px;
-                    border-radius: 4px;
-                    font-weight: bold;
-                }
-                QPushButton:hover {
-                    background-color: #5a6268;
-                }
-            """)
-        
         # 保存配置
         self.config_manager.update_config(enable_video_clips=self.enable_video_clips)
     
     def on_scale_mode_changed(self, mode_text: str):
         """处理缩放模式变化"""
-        if "裁剪模式" in mode_text:
-            self.video_clip_scale_mode = "crop"
-        elif "适应模式" in mode_text:
-            self.video_clip_scale_mode = "fit"
-        elif "拉伸模式" in mode_text:
-            self.video_clip_scale_mode = "stretch"
+        self.video_clip_scale_mode = self.SCALE_MODE_BY_LABEL.get(mode_text, self.video_clip_scale_mode)
         
         # 保存配置
         self.config_manager.update_config(video_clip_scale_mode=self.video_clip_scale_mode)
     
-    def select_processed_folder(self):
-        """选择已处理图片文件夹"""
-        folder_path = QFileDialog.getExistingDirectory(
-            self, 
-            "选择已处理图片文件夹"
-        )
-        
-        if folder_path:
-            self.selected_processed_folder = folder_path
-            self.processed_folder_label.setText(f"已选择: {os.path.basename(folder_path)}")
-            self.processed_folder_label.setStyleSheet("color: #333; font-style: normal;")
-            
-            # 自动保存配置
-            self.config_manager.update_config(processed_folder=folder_path)
-    
-    def select_output_folder(self):
-        """选择输出视频文件夹"""
-        folder_path = QFileDialog.getExistingDirectory(
-            self, 
-            "选择输出视频文件夹"
-        )
-        
-        if folder_path:
-            self.selected_output_folder = folder_path
-            self.output_folder_label.setText(f"已选择: {os.path.basename(folder_path)}")
-            self.output_folder_label.setStyleSheet("color: #333; font-style: normal;")
-            
-            # 自动保存配置
-            self.config_manager.update_config(output_folder=folder_path)
-    
-    def select_processed_video_folder(self):
-        """选择已处理视频片段文件夹"""
-        folder_path = QFileDialog.getExistingDirectory(
-            self, 
-            "选择已处理视频片段文件夹"
-        )
-        
-        if folder_path:
-            self.selected_processed_video_folder = folder_path
-            self.processed_video_folder_label.setText(f"已选择: {os.path.basename(folder_path)}")
-            self.processed_video_folder_label.setStyleSheet("color: #333; font-style: normal;")
-            
-            # 自动保存配置
-            self.config_manager.update_config(processed_video_folder=folder_path)
-            
     def reset_config(self):
         """重置配置为默认值"""
-        reply = QMessageBox.question(
-            self, 
+        reply = self._ask_question(
             "确认重置", 
-            "确定要重置所有配置为默认值吗？\n这将清除所有已选择的文件和设置。",
-            QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No
+            "确定要重置所有配置为默认值吗？\n这将清除所有已选择的文件和设置。"
         )
         
         if reply == QMessageBox.StandardButton.Yes:
@@ -2272,54 +2710,25 @@ class MainWindow(QMainWindow):
             self.config_manager.reset_config()
             self.config = self.config_manager.load_config()
             
-            # 重置UI
-            self.selected_image_folder = None
-            self.selected_audio_file = None
-            self.selected_audio_folder = None
-            self.selected_processed_folder = None
-            self.selected_output_folder = None
-            self.selected_video_clip_folder = None
-            self.selected_processed_video_folder = None
-            self.processing_mode = "single"
-            self.enable_video_clips = False
-            self.video_clip_count = 3
-            self.video_clip_scale_mode = "crop"
-            
-            self.image_folder_label.setText("未选择文件夹")
-            self.image_folder_label.setStyleSheet("color: #999; font-style: italic;")
-            self.audio_file_label.setText("未选择音频文件")
-            self.audio_file_label.setStyleSheet("color: #999; font-style: italic;")
-            self.audio_folder_label.setText("未选择音频文件夹")
-            self.audio_folder_label.setStyleSheet("color: #999; font-style: italic;")
-            self.processed_folder_label.setText("未选择已处理文件夹")
-            self.processed_folder_label.setStyleSheet("color: #999; font-style: italic;")
-            self.output_folder_label.setText("未选择输出文件夹")
-            self.output_folder_label.setStyleSheet("color: #999; font-style: italic;")
-            self.video_clip_folder_label.setText("未选择视频片段文件夹")
-            self.video_clip_folder_label.setStyleSheet("color: #999; font-style: italic;")
-            self.processed_video_folder_label.setText("未选择已处理视频片段文件夹")
-            self.processed_video_folder_label.setStyleSheet("color: #999; font-style: italic;")
-            
-            # 重置处理模式按钮
-            self.single_mode_btn.setChecked(True)
-            self.batch_mode_btn.setChecked(False)
-            
-            # 重置视频片段设置
-            self.enable_video_clips_checkbox.setChecked(False)
-            self.video_clip_count_spin.setEnabled(False)
-            self.video_clip_count_spin.setValue(3)
-            self.video_clip_scale_combo.setCurrentText("裁剪模式 (保持比例)")
-            if hasattr(self, 'enable_segmented_processing_checkbox'):
-                self.enable_segmented_processing_checkbox.setChecked(True)
-            self.enable_segmented_processing = True
-            
-            # 重新加载配置到UI
+            # 重新加载配置到UI（所有控件以配置为准，一次更新到位）
             self.load_config_to_ui()
             
             QMessageBox.information(self, "重置完成", "配置已重置为默认值")
     
     def generate_video(self):
         """生成视频"""
+        if self._generating:
+            return
+        self._generating = True
+        try:
+            self._start_generation()
+        finally:
+            # 校验失败或用户取消时没有启动后台任务，恢复为可生成状态
+            if self.worker_thread is None and not self._scanning:
+                self._generating = False
+    
+    def _start_generation(self):
+        """校验输入并按处理模式开始生成"""
         # 输入验证
         if not self.selected_image_folder:
             QMessageBox.warning(self, "警告", "请先选择图片文件夹")
@@ -2350,12 +2759,10 @@ class MainWindow(QMainWindow):
         # 检查文件是否已存在
         if os.path.exists(default_path):
             # 文件已存在，弹窗确认
-            reply = QMessageBox.question(
-                self,
+            reply = self._ask_question(
                 "文件已存在",
                 f"文件 '{default_filename}' 已存在，是否覆盖？\n\n"
                 f"路径: {default_path}",
-                QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No,
                 QMessageBox.StandardButton.No
             )
             
@@ -2365,7 +2772,8 @@ class MainWindow(QMainWindow):
                     self,
                     "保存视频文件",
                     default_path,
-                    "MP4视频文件 (*.mp4);;所有文件 (*)"
+                    "MP4视频文件 (*.mp4);;所有文件 (*)",
+                    options=QFileDialog.Option.DontUseCustomDirectoryIcons
                 )
             else:
                 # 用户选择覆盖，直接使用默认路径
@@ -2380,99 +2788,130 @@ class MainWindow(QMainWindow):
         # 保存输出文件夹到配置
         output_folder = os.path.dirname(output_path)
         self.selected_output_folder = output_folder
-        self.output_folder_label.setText(f"已选择: {os.path.basename(output_folder)}")
-        self.output_folder_label.setStyleSheet("color: #333; font-style: normal;")
+        self._set_path_label(self.output_folder_label, output_folder)
         self.config_manager.update_config(output_folder=output_folder)
         
         # 开始处理单个音频
         self.start_video_generation(self.selected_audio_file, output_path)
     
     def process_batch_audio(self):
-        """处理批量音频文件"""
-        # 获取音频文件夹中的所有音频文件
-        audio_extensions = {'.mp3', '.wav', '.flac', '.aac', '.ogg', '.m4a', '.wma'}
-        audio_files = []
+        """处理批量音频文件：先在后台扫描音频文件夹，扫描完成后再确认"""
+        self.generate_btn.setEnabled(False)
+        self.status_label.setText("正在扫描音频文件夹...")
+        self._scanning = True
         
-        for file in os.listdir(self.selected_audio_folder):
-            if any(file.lower().endswith(ext) for ext in audio_extensions):
-                audio_files.append(os.path.join(self.selected_audio_folder, file))
+        # 保留引用直到下次扫描，避免线程结束前对象被回收
+        self._audio_scanner = AudioFolderScanner(self.selected_audio_folder)
+        self._audio_scanner.scan_finished.connect(self.on_audio_folder_scanned)
+        self._audio_scanner.start()
+    
+    def on_audio_folder_scanned(self, audio_names: list, audio_files: list, error: str):
+        """音频文件夹扫描完成"""
+        self._scanning = False
+        self.generate_btn.setEnabled(True)
+        self.status_label.setText("准备就绪")
+        try:
+            self._confirm_batch(audio_names, audio_files, error)
+        finally:
+            if self.worker_thread is None:
+                self._generating = False
+    
+    def _confirm_batch(self, audio_names: list, audio_files: list, error: str):
+        """确认扫描结果并开始批量处理"""
+        if error:
+            QMessageBox.warning(self, "警告", f"无法读取音频文件夹：{error}")
+            return
         
         if not audio_files:
             QMessageBox.warning(self, "警告", "音频文件夹中没有找到支持的音频文件")
             return
         
-        # 按文件名排序
-        audio_files.sort()
-        
         # 确认批量处理
-        reply = QMessageBox.question(
-            self,
+        count = len(audio_files)
+        reply = self._ask_question(
             "确认批量处理",
-            f"找到 {len(audio_files)} 个音频文件，是否开始批量处理？\n\n"
-            f"音频文件列表:\n" + "\n".join([os.path.basename(f) for f in audio_files[:5]]) + 
-            (f"\n... 还有 {len(audio_files) - 5} 个文件" if len(audio_files) > 5 else ""),
-            QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No
+            f"找到 {count} 个音频文件，是否开始批量处理？\n\n"
+            f"音频文件列表:\n" + "\n".join(audio_names[:5]) + 
+            (f"\n... 还有 {count - 5} 个文件" if count > 5 else "")
         )
         
         if reply != QMessageBox.StandardButton.Yes:
             return
         
         # 开始批量处理
-        self.start_batch_processing(audio_files)
+        self.start_batch_processing(audio_files, audio_names)
     
-    def start_batch_processing(self, audio_files):
+    def start_batch_processing(self, audio_files, audio_names):
         """开始批量处理"""
         self.batch_audio_files = audio_files
+        self.batch_basenames = audio_names
+        stems = [os.path.splitext(name)[0] for name in audio_names]
+        # 输出文件夹现有文件名快照，在内存里解决重名，不再逐个os.path.exists
+        try:
+            with os.scandir(self.selected_output_folder or os.curdir) as entries:
+                existing_outputs = {os.path.normcase(entry.name) for entry in entries}
+        except OSError:
+            existing_outputs = set()
+        
+        # 预先确定每个音频的输出路径：文件已存在时添加序号
+        batch_jobs = []
+        for audio_file, stem in zip(audio_files, stems):
+            output_filename = f"{stem}.mp4"
+            counter = 1
+            while os.path.normcase(output_filename) in existing_outputs:
+                output_filename = f"{stem}_{counter}.mp4"
+                counter += 1
+            existing_outputs.add(os.path.normcase(output_filename))
+            
+            if self.selected_output_folder:
+                output_path = os.path.join(self.selected_output_folder, output_filename)
+            else:
+                output_path = output_filename
+            batch_jobs.append((audio_file, output_path))
+        
+        # 整个批次在同一个工作线程中依次处理
         self.current_batch_index = 0
-        self.process_next_batch_audio()
+        self._batch_stopped = False
+        self.start_video_generation(audio_files[0], batch_jobs[0][1], batch_jobs)
     
-    def process_next_batch_audio(self):
-        """处理下一个批量音频文件"""
-        if self.current_batch_index >= len(self.batch_audio_files):
-            # 批量处理完成
+    def on_batch_item_started(self, index: int):
+        """批量模式开始处理下一个音频"""
+        self.current_batch_index = index
+        self._progress_timer.stop()
+        self.progress_bar.setValue(0)
+        self.add_log_message(f"开始处理第 {index + 1}/{len(self.batch_audio_files)} 个音频: {self.batch_basenames[index]}")
+        self.add_log_message(f"剩余待处理: {len(self.batch_audio_files) - index - 1} 个音频文件")
+    
+    def on_batch_finished(self):
+        """批量处理结束（全部完成或被用户停止）"""
+        self._flush_log()
+        self._generating = False
+        
+        # 恢复UI状态
+        self.generate_btn.setEnabled(True)
+        self.generate_btn.setText("生成视频")
+        self.progress_bar.setVisible(False)
+        
+        if self._batch_stopped:
+            self.status_label.setText("批量处理已停止")
+        else:
             self.add_log_message("=== 批量处理完成 ===")
             self.status_label.setText("批量处理完成！")
             self.status_label.setStyleSheet("color: #28a745; font-weight: bold;")
             QMessageBox.information(self, "批量处理完成", f"已成功处理 {len(self.batch_audio_files)} 个音频文件")
-            
-            # 清理工作线程
-            if self.worker_thread:
-                self.worker_thread.stop()
-                self.worker_thread.deleteLater()
-                self.worker_thread = None
-            
-            # 清理批量处理相关属性
-            if hasattr(self, 'batch_audio_files'):
-                delattr(self, 'batch_audio_files')
-            if hasattr(self, 'current_batch_index'):
-                delattr(self, 'current_batch_index')
-            return
-        
-        current_audio = self.batch_audio_files[self.current_batch_index]
-        audio_basename = os.path.splitext(os.path.basename(current_audio))[0]
-        default_filename = f"{audio_basename}.mp4"
         
-        if self.selected_output_folder:
-            output_path = os.path.join(self.selected_output_folder, default_filename)
-        else:
-            output_path = default_filename
-        
-        # 如果文件已存在，添加序号
-        counter = 1
-        original_output_path = output_path
-        while os.path.exists(output_path):
-            name, ext = os.path.splitext(original_output_path)
-            output_path = f"{name}_{counter}{ext}"
-            counter += 1
-        
-        self.add_log_message(f"开始处理第 {self.current_batch_index + 1}/{len(self.batch_audio_files)} 个音频: {os.path.basename(current_audio)}")
-        self.add_log_message(f"剩余待处理: {len(self.batch_audio_files) - self.current_batch_index - 1} 个音频文件")
+        # 清理工作线程
+        if self.worker_thread:
+            self.worker_thread.stop()
+            self.worker_thread.deleteLater()
+            self.worker_thread = None
         
-        # 开始处理当前音频
-        self.start_video_generation(current_audio, output_path)
+        # 退出批量处理状态
+        self.batch_audio_files = None
+        self.batch_basenames = None
     
-    def start_video_generation(self, audio_file, output_path):
-        """开始视频生成"""
+    def start_video_generation(self, audio_file, output_path, batch_jobs=None):
+        """开始视频生成；传入batch_jobs时由同一个工作线程依次处理整个批次"""
         # 获取参数
         # 取时长范围并确保 min<=max
         dur_min = float(self.duration_min_spin.value())
@@ -2481,17 +2920,10 @@ class MainWindow(QMainWindow):
             dur_min, dur_max = dur_max, dur_min
         animation_effect = self.effect_combo.currentText()
         animation_intensity = self.intensity_spinbox.value()
-        # 解析分辨率
-        selected_res = self.resolution_combo.currentText()
-        if selected_res.startswith("Custom"):
-            target_resolution = (int(self.custom_width_spin.value()), int(self.custom_height_spin.value()))
-        else:
-            try:
-                wh = selected_res.split(" ")[0]
-                w, h = wh.split("x")
-                target_resolution = (int(w), int(h))
-            except Exception:
-                target_resolution = (1920, 1080)
+        # 分辨率：预置选项直接取选项数据，Custom取自定义输入框
+        target_resolution = self.resolution_combo.currentData()
+        if target_resolution is None:
+            target_resolution = (self.custom_width_spin.value(), self.custom_height_spin.value())
         
         # 禁用生成按钮
         self.generate_btn.setEnabled(False)
@@ -2510,47 +2942,53 @@ class MainWindow(QMainWindow):
             output_path,
             animation_intensity,
             target_resolution,
-            int(self.fps_spin.value()),
+            self.fps_spin.value(),
             self.preset_combo.currentText(),
-            int(self.crf_spin.value()),
-            int(self.threads_spin.value()),
+            self.crf_spin.value(),
+            self.threads_spin.value(),
             self.selected_processed_folder,
             self.selected_video_clip_folder,
             self.enable_video_clips,
-            int(self.video_clip_count_spin.value()),
+            self.video_clip_count_spin.value(),
             self.video_clip_scale_mode,
             self.selected_processed_video_folder,
-            self.enable_segmented_processing
+            self.enable_segmented_processing,
+            batch_jobs=batch_jobs
         )
         
         # 连接信号
-        self.worker_thread.progress_updated.connect(self.progress_bar.setValue)
-        self.worker_thread.status_updated.connect(self.status_label.setText)
+        self.worker_thread.progress_updated.connect(self._on_progress)
+        self.worker_thread.status_updated.connect(self.set_status_text)
         self.worker_thread.log_updated.connect(self.add_log_message)
         self.worker_thread.generation_finished.connect(self.on_generation_finished)
+        if batch_jobs:
+            self.worker_thread.batch_item_started.connect(self.on_batch_item_started)
+            self.worker_thread.batch_finished.connect(self.on_batch_finished)
         
         # 启动线程
         self.worker_thread.start()
     
     def on_generation_finished(self, success: bool, message: str):
-        """处理生成完成"""
-        # 恢复UI状态
-        self.generate_btn.setEnabled(True)
-        self.generate_btn.setText("生成视频")
-        self.progress_bar.setVisible(False)
+        """处理生成完成（批量模式下每个音频调用一次）"""
+        self._flush_log()
         
         # 检查是否是批量处理模式
-        is_batch_mode = hasattr(self, 'batch_audio_files') and hasattr(self, 'current_batch_index')
+        is_batch_mode = self.batch_audio_files is not None
+        
+        if not is_batch_mode:
+            # 恢复UI状态（批量模式在整个批次结束时恢复）
+            self._generating = False
+            self.generate_btn.setEnabled(True)
+            self.generate_btn.setText("生成视频")
+            self.progress_bar.setVisible(False)
         
         if success:
             self.status_label.setText("生成完成！")
             self.status_label.setStyleSheet("color: #28a745; font-weight: bold;")
             
             if is_batch_mode:
-                # 批量处理模式，处理下一个文件
+                # 批量处理模式，工作线程会继续处理下一个文件
                 self.add_log_message(f"✓ 第 {self.current_batch_index + 1} 个音频处理完成")
-                self.current_batch_index += 1
-                self.process_next_batch_audio()
             else:
                 # 单个处理模式
                 QMessageBox.information(self, "成功", message)
@@ -2559,39 +2997,26 @@ class MainWindow(QMainWindow):
             self.status_label.setStyleSheet("color: #dc3545; font-weight: bold;")
             
             if is_batch_mode:
-                # 批量处理模式，询问是否继续
-                reply = QMessageBox.question(
-                    self,
+                # 批量处理模式，询问是否继续；工作线程在此期间等待
+                reply = self._ask_question(
                     "批量处理错误",
-                    f"处理第 {self.current_batch_index + 1} 个音频文件时出错：\n{message}\n\n是否继续处理剩余文件？",
-                    QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No
+                    f"处理第 {self.current_batch_index + 1} 个音频文件时出错：\n{message}\n\n是否继续处理剩余文件？"
                 )
                 
-                if reply == QMessageBox.StandardButton.Yes:
+                proceed = reply == QMessageBox.StandardButton.Yes
+                if proceed:
                     self.add_log_message(f"✗ 第 {self.current_batch_index + 1} 个音频处理失败，继续处理下一个")
-                    self.current_batch_index += 1
-                    self.process_next_batch_audio()
                 else:
-                    # 停止批量处理
+                    # 停止批量处理，工作线程随后发送batch_finished
                     self.add_log_message("用户选择停止批量处理")
-                    self.status_label.setText("批量处理已停止")
-                    
-                    # 清理工作线程
-                    if self.worker_thread:
-                        self.worker_thread.stop()
-                        self.worker_thread.deleteLater()
-                        self.worker_thread = None
-                    
-                    # 清理批量处理相关属性
-                    if hasattr(self, 'batch_audio_files'):
-                        delattr(self, 'batch_audio_files')
-                    if hasattr(self, 'current_batch_index'):
-                        delattr(self, 'current_batch_index')
+                    self._batch_stopped = True
+                if self.worker_thread:
+                    self.worker_thread.continue_batch(proceed)
             else:
                 # 单个处理模式
                 QMessageBox.critical(self, "错误", message)
         
-        # 清理工作线程（只在非批量处理模式或批量处理完成时清理）
+        # 清理工作线程（批量模式在整个批次结束时清理）
         if not is_batch_mode:
             if self.worker_thread:
                 self.worker_thread.stop()
@@ -2600,6 +3025,8 @@ class MainWindow(QMainWindow):
 
 
 def main():
+    # 打包为exe时，进程池的子进程需要此调用才能正常启动
+    multiprocessing.freeze_support()
     app = QApplication(sys.argv)
     app.setStyle('Fusion')
     
@@ -45,5 +45,83 @@ def test_animation_effects():
     
     print("\n=== 测试完成 ===")
 
+def test_fade_filter_boundary():
+    """淡出滤镜不应作用到下一片段的第一帧"""
+    import shutil
+    import subprocess
+    from types import SimpleNamespace
+    import pytest
+    from animation_effects import build_fade_filters
+    
+    fps, size = 10, 16
+    clips = [SimpleNamespace(duration=1.0, deferred_fade=('out', 0.5)),
+             SimpleNamespace(duration=1.0, deferred_fade=None)]
+    filters = build_fade_filters(clips)
+    assert filters == ["fade=t=out:st=0.500:d=0.500:enable='gte(t,0.000)*lt(t,1.000)'"]
+    
+    if shutil.which('ffmpeg') is None:
+        pytest.skip("未安装ffmpeg")
+    # 灰度200的纯色视频，经fade滤镜后逐帧取平均亮度
+    result = subprocess.run(
+        ['ffmpeg', '-loglevel', 'error', '-f', 'lavfi', '-i', f'color=c=0xC8C8C8:s={size}x{size}:r={fps}:d=2',
+         '-vf', ','.join(filters + ['format=gray']), '-f', 'rawvideo', '-'],
+        stdout=subprocess.PIPE, check=True)
+    frame_bytes = size * size
+    means = [sum(result.stdout[i:i + frame_bytes]) / frame_bytes
+             for i in range(0, len(result.stdout), frame_bytes)]
+    # 第10帧(t=1.0)是第二个片段的第一帧，应保持原亮度；第9帧处于淡出末段
+    assert means[10] > 150
+    assert means[9] < means[10]
+
+def test_plan_durations():
+    """按帧预算规划图片时长：恰好用完、截断最后一张、不足一帧时停止"""
+    from types import SimpleNamespace
+    import numpy as np
+    from main import VideoGenerationWorker
+    
+    plan = VideoGenerationWorker._plan_durations
+    worker = SimpleNamespace(fps=10, image_duration=1.0)
+    
+    # 预算恰好等于3张图片的总帧数：规划3张，不多出零时长的第4张
+    assert plan(worker, 5, 3.0) == ([1.0, 1.0, 1.0], [1.0, 1.0, 1.0])
+    # 预算落在第3张中间：最后一张截断到剩余帧数
+    assert plan(worker, 5, 2.5)[1] == [1.0, 1.0, 0.5]
+    # 图片不够用完预算：全部按期望时长
+    assert plan(worker, 2, 5.0)[1] == [1.0, 1.0]
+    # 预算不足一帧
+    assert plan(worker, 5, 0.04) == ([], [])
+    
+    # 不足一帧的时长（0.01秒@10fps）出现后，之后的图片不再规划
+    worker = SimpleNamespace(fps=10, image_duration=(0.0, 2.0))
+    original_uniform = np.random.uniform
+    np.random.uniform = lambda low, high, size: np.array([1.0, 0.01, 1.0])
+    try:
+        assert plan(worker, 3, 10.0) == ([1.0], [1.0])
+    finally:
+        np.random.uniform = original_uniform
+
+
+def test_allocate_clips_for_segment():
+    """按时间比例为段落分配片段，单个片段跨越整个段落时复用该片段"""
+    from types import SimpleNamespace
+    import numpy as np
+    from main import VideoGenerationWorker
+    
+    allocate = VideoGenerationWorker.allocate_clips_for_segment
+    worker = SimpleNamespace(_log=lambda message: None)
+    
+    clips = ['a', 'b', 'c']
+    bounds = np.array([0.0, 3.0, 6.0, 9.0])
+    assert allocate(worker, clips, bounds, 0.0, 0.5, 0) == ['a', 'b']
+    assert allocate(worker, clips, bounds, 0.5, 1.0, 1) == ['c']
+    
+    # 段落完全落在一个长片段内部：使用覆盖段落起点的片段
+    clips = ['a', 'b']
+    bounds = np.array([0.0, 9.0, 10.0])
+    assert allocate(worker, clips, bounds, 0.2, 0.5, 0) == ['a']
+    assert allocate(worker, clips, bounds, 0.95, 1.0, 1) == ['b']
+    
+    assert allocate(worker, [], np.array([0.0]), 0.0, 1.0, 0) == []
+
 if __name__ == "__main__":
     test_animation_effects()